@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from reborn_rebalance.pbs.cache import snapshot_fields
+from reborn_rebalance.pbs.catalog import EssentialsCatalog
+from reborn_rebalance.pbs.pack import PackReader, write_pack
+
+
+def _build(args: argparse.Namespace) -> int:
+    input_dir: Path = args.INPUT
+    output: Path = args.OUTPUT
+
+    if not input_dir.is_dir():
+        print(f"{input_dir} doesn't exist")
+        return 1
+
+    catalog = EssentialsCatalog.load_from_toml(input_dir, use_cache=False)
+
+    before = time.perf_counter()
+    write_pack(catalog, input_dir, output)
+    after = time.perf_counter()
+
+    size = output.stat().st_size / 1024 / 1024
+    print(f"Wrote {output} ({size:.2f} MiB) in {after - before:.2f}s")
+    return 0
+
+
+def _verify(args: argparse.Namespace) -> int:
+    pack_path: Path = args.PACK
+    failed = False
+
+    with PackReader(pack_path) as reader:
+        if corrupt := reader.corrupt_sources():
+            failed = True
+            for relative in corrupt:
+                print(f"corrupt: {relative}")
+
+        if args.data is not None:
+            for relative in sorted(reader.diff_against(args.data)):
+                failed = True
+                print(f"out of date: {relative}")
+
+        if not reader.is_compatible:
+            print("entities were packed by a different version of the code, skipping comparison")
+            return int(failed)
+
+        packed = snapshot_fields(EssentialsCatalog(**reader.load_fields()))
+
+        # round-trip the sources and make sure they load back into exactly the same entities.
+        with tempfile.TemporaryDirectory() as dir:
+            reader.unpack_sources(Path(dir))
+            unpacked = snapshot_fields(EssentialsCatalog.load_from_toml(Path(dir), use_cache=False))
+
+    for field_name, value in packed.items():
+        if value != unpacked[field_name]:
+            failed = True
+            print(f"mismatch: {field_name} differs between the entities and the TOML sources")
+
+    if failed:
+        print(f"{pack_path} failed verification")
+        return 1
+
+    print(f"{pack_path} is OK")
+    return 0
+
+
+def _unpack(args: argparse.Namespace) -> int:
+    output_dir: Path = args.OUTPUT
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    with PackReader(args.PACK) as reader:
+        reader.unpack_sources(output_dir)
+        print(f"Unpacked {len(reader.source_files())} files into {output_dir}")
+
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compiles the data directory into a single data pack, or back again"
+    )
+    subparsers = parser.add_subparsers(required=True)
+
+    build_parser = subparsers.add_parser("build", help="Compiles a data directory into a pack")
+    build_parser.add_argument("INPUT", help="The input data directory", type=Path)
+    build_parser.add_argument("OUTPUT", help="The output pack file", type=Path)
+    build_parser.set_defaults(fn=_build)
+
+    verify_parser = subparsers.add_parser(
+        "verify",
+        help=(
+            "Checks the pack is intact and that its TOML sources load back into the packed entities"
+        ),
+    )
+    verify_parser.add_argument("PACK", help="The pack file to verify", type=Path)
+    verify_parser.add_argument(
+        "--data",
+        help="Also check that the pack is up to date with this data directory",
+        type=Path,
+        default=None,
+    )
+    verify_parser.set_defaults(fn=_verify)
+
+    unpack_parser = subparsers.add_parser(
+        "unpack", help="Writes the TOML sources in a pack back out into a data directory"
+    )
+    unpack_parser.add_argument("PACK", help="The pack file to unpack", type=Path)
+    unpack_parser.add_argument("OUTPUT", help="The output data directory", type=Path)
+    unpack_parser.set_defaults(fn=_unpack)
+
+    args = parser.parse_args()
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
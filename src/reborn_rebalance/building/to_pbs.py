@@ -1,8 +1,11 @@
-import shutil
+import argparse
 import sys
 from pathlib import Path
 
-from reborn_rebalance.pbs.catalog import EssentialsCatalog
+from reborn_rebalance import tracing
+from reborn_rebalance.output import OutputManifest
+from reborn_rebalance.pbs.catalog import EssentialsCatalog, print_writer_timings
+from reborn_rebalance.pbs.compiled import compile_to_dat
 
 
 def build_to_pbs() -> int:
@@ -10,32 +13,74 @@ def build_to_pbs() -> int:
     CLI entrypoint for building the data provided into a format consumable by the game.
     """
 
-    try:
-        input_dir = Path(sys.argv[1]).absolute()
-        output_dir = Path(sys.argv[2]).absolute()
-    except IndexError:
-        print(f"usage: {sys.argv[0]} <input data dir> <game dir>")
-        return 1
+    parser = argparse.ArgumentParser(
+        description="Builds the data provided into PBS files for the game"
+    )
+    parser.add_argument("INPUT", help="The input data directory or data pack", type=Path)
+    parser.add_argument("OUTPUT", help="The game directory", type=Path)
+    parser.add_argument(
+        "--compile",
+        help=(
+            "Also compile the supported Data/*.dat files directly, instead of in-game "
+            "(experimental)"
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--no-catalog-cache",
+        help="Always loads the catalog from TOML, ignoring (and not updating) the snapshot cache",
+        action="store_true",
+        default=False,
+    )
+    args = parser.parse_args()
+
+    input_dir: Path = args.INPUT.absolute()
+    output_dir: Path = args.OUTPUT.absolute()
 
     if not input_dir.exists():
         print(f"{input_dir} doesn't exist")
         return 1
 
     output_dir.mkdir(exist_ok=True, parents=True)
-    catalog = EssentialsCatalog.load_from_toml(input_dir)
-    catalog.save_to_essentials(output_dir)
+
+    with tracing.trace_to(None):
+        _build(input_dir, output_dir, compile=args.compile, use_cache=not args.no_catalog_cache)
+
+    return 0
+
+
+def _build(input_dir: Path, output_dir: Path, *, compile: bool, use_cache: bool):
+    if input_dir.is_file():
+        catalog = EssentialsCatalog.load_from_pack(input_dir)
+    else:
+        catalog = EssentialsCatalog.load_from_toml(input_dir, use_cache=use_cache)
+
+    output = OutputManifest.load(output_dir)
+
+    with tracing.span("save_to_essentials", "save", path=str(output_dir)):
+        timings = catalog.save_to_essentials(output_dir, output)
+
+    print_writer_timings(timings)
+
+    if compile:
+        print("Compiling Data/*.dat directly is experimental, recompile in-game if anything breaks")
+        with tracing.span("compile_to_dat", "save"):
+            compile_to_dat(catalog, output_dir, output)
 
     overridden_maps = input_dir / "overwritten_maps"
-    if overridden_maps.exists():
+    if input_dir.is_file():
+        print("Input is a data pack, so overwritten maps won't be copied")
+
+    elif overridden_maps.exists():
         data_dir = output_dir / "Data"
         data_dir.mkdir(exist_ok=True, parents=True)
 
         for map in overridden_maps.glob("**/*.rxdata"):
-            print(f"Copying map {map.stem}")
-            new_path = data_dir / map.name
-            shutil.copy2(map, new_path)
+            if output.copy_file(map, data_dir / map.name):
+                print(f"Copied map {map.stem}")
 
-    return 0
+    output.save()
+    print(f"Output: {output.summary()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,437 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Mapping
+from typing import Any
+
+import attr
+
+from reborn_rebalance.pbs.catalog import EssentialsCatalog
+from reborn_rebalance.pbs.encounters import ENCOUNTER_SLOTS
+from reborn_rebalance.pbs.map import MapMetadata
+from reborn_rebalance.pbs.move import (
+    MoveCategory,
+    MoveFlag,
+    MoveMappingEntry,
+    MoveMappingEntryType,
+    PokemonMove,
+)
+from reborn_rebalance.pbs.pokemon import FormAttributes, PokemonEvolution, PokemonSpecies
+from reborn_rebalance.pbs.type import PokemonType, defensive_profile
+
+# View models for the web pages. Rather than the templates poking at the catalog while they render
+# (looking up forms, evolutionary chains, encounters, TM numbers, ...), everything a page shows is
+# worked out up front in one pass over the catalog, as plain dicts of strings and numbers. The
+# templates then only have to format them.
+#
+# As the view models are plain data, they can be hashed, which is used to skip re-rendering pages
+# whose view model (and templates) haven't changed since they were last written.
+#
+# Careful with key names: Jinja looks up ``foo.bar`` as an attribute first, so keys like ``items``
+# or ``values`` would get the dict method instead.
+
+#: Evolution conditions whose parameter is an item.
+ITEM_EVOLUTIONS = frozenset(
+    {"tradeitem", "item", "itemmale", "itemfemale", "dayholditem", "nightholditem"}
+)
+
+#: The multipliers shown in the type matchup card of a species page, along with their labels.
+MATCHUP_GROUPS = ((4.0, "4×"), (2.0, "2×"), (0.5, "½×"), (0.25, "¼×"), (0.0, "0×"))  # noqa: RUF001
+
+#: The move mapping entry types that show up in the level-up learner table of a move page.
+LEVEL_UP_ENTRY_TYPES = frozenset(
+    {MoveMappingEntryType.LEVEL_UP, MoveMappingEntryType.START, MoveMappingEntryType.EVOLUTION}
+)
+
+
+@attr.s(slots=True, kw_only=True)
+class PageViews:
+    """
+    The view models for every species, move and map page.
+    """
+
+    #: {species internal name: species page view}
+    species: dict[str, dict[str, Any]] = attr.ib(factory=dict)
+
+    #: {move internal name: move page view}, in the order the move pages link to each other.
+    moves: dict[str, dict[str, Any]] = attr.ib(factory=dict)
+
+    #: {map ID: map page view}
+    maps: dict[int, dict[str, Any]] = attr.ib(factory=dict)
+
+
+def view_hash(view: Mapping[str, Any]) -> str:
+    """
+    Hashes the provided view model. Views with the same contents always have the same hash.
+    """
+
+    encoded = json.dumps(view, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _type_view(type: PokemonType) -> dict[str, Any]:
+    return {"css": type.name.lower(), "name": type.localised_name}
+
+
+def _species_ref(species: PokemonSpecies) -> dict[str, Any]:
+    return {
+        "internal_name": species.internal_name,
+        "name": species.name,
+        "dex_number": species.dex_number,
+    }
+
+
+def _map_ref(map: MapMetadata) -> dict[str, Any]:
+    return {"id": map.id, "name": map.name}
+
+
+class _ViewBuilder:
+    """
+    Builds every page view in one go, sharing the lookups that multiple pages need.
+    """
+
+    def __init__(self, catalog: EssentialsCatalog):
+        self.catalog = catalog
+        self._move_rows: dict[str, dict[str, Any] | None] = {}
+        self._matchups: dict[tuple[PokemonType, PokemonType], list[dict[str, Any]]] = {}
+
+    def _move_row(self, internal_name: str) -> dict[str, Any] | None:
+        if internal_name in self._move_rows:
+            return self._move_rows[internal_name]
+
+        move = self.catalog.move_mapping.get(internal_name)
+        row = None
+        if move is not None:
+            row = {
+                "internal_name": move.internal_name,
+                "display_name": move.display_name,
+                "description": move.description,
+                "type": _type_view(move.type),
+                "category": move.category.name.lower(),
+                "category_name": move.category.name.title(),
+                "is_status": move.category == MoveCategory.STATUS,
+                "base_power": move.base_power,
+                "accuracy": move.accuracy,
+            }
+
+        self._move_rows[internal_name] = row
+        return row
+
+    def _learnset_entry(
+        self, attributes: FormAttributes, level: int | str | None, internal_name: str
+    ) -> dict[str, Any]:
+        move = self.catalog.move_mapping.get(internal_name)
+
+        return {
+            "level": level,
+            "internal_name": internal_name,
+            "move": self._move_row(internal_name),
+            "stab": move is not None and attributes.has_stab_on(move),
+        }
+
+    def _evolution_view(self, evo: PokemonEvolution) -> dict[str, Any]:
+        condition = evo.condition.lower()
+        parameter_name: str | None = None
+
+        if condition in ITEM_EVOLUTIONS:
+            parameter_name = self.catalog.item_mapping[evo.parameter].display_name  # type: ignore
+        elif condition == "location":
+            parameter_name = self.catalog.maps[int(evo.parameter)].name  # type: ignore
+        elif condition == "hasmove":
+            parameter_name = self.catalog.move_mapping[evo.parameter].display_name  # type: ignore
+
+        return {
+            "condition": condition,
+            "parameter": evo.parameter,
+            "parameter_name": parameter_name,
+        }
+
+    def _matchup_view(self, primary: PokemonType, secondary: PokemonType) -> list[dict[str, Any]]:
+        # only a couple hundred type pairs actually exist, so share them between forms.
+        if (cached := self._matchups.get((primary, secondary))) is not None:
+            return cached
+
+        profile = defensive_profile(primary, secondary)
+        groups = []
+        for multiplier, label in MATCHUP_GROUPS:
+            types = [
+                _type_view(type)
+                for type, value in profile.items()
+                if value == multiplier and type != PokemonType.QMARKS
+            ]
+
+            if types:
+                groups.append({"multiplier": label, "types": types})
+
+        self._matchups[primary, secondary] = groups
+        return groups
+
+    def _form_view(self, species: PokemonSpecies, attributes: FormAttributes) -> dict[str, Any]:
+        stats = attributes.base_stats
+        abilities = []
+        for name in attributes.raw_abilities:
+            ability = self.catalog.ability_name_mapping[name]
+            abilities.append(
+                {
+                    "internal_name": name,
+                    "display_name": ability.display_name,
+                    "description": ability.description,
+                }
+            )
+
+        level_up_moves = [
+            self._learnset_entry(attributes, "Egg", move) for move in species.raw_egg_moves
+        ]
+        for move in attributes.raw_level_up_moves:
+            match move.at_level:
+                case 0:
+                    level: int | str = "Evolution"
+                case 1:
+                    level = "Start"
+                case _:
+                    level = move.at_level
+
+            level_up_moves.append(self._learnset_entry(attributes, level, move.name))
+
+        return {
+            "form_name": attributes.form_name,
+            "name": attributes.name,
+            "abilities": abilities,
+            "primary_type": _type_view(attributes.primary_type),
+            "secondary_type": _type_view(attributes.secondary_type),
+            "matchups": self._matchup_view(attributes.primary_type, attributes.secondary_type),
+            "pokedex_entry": attributes.pokedex_entry,
+            "stats": {
+                "hp": stats.hp,
+                "atk": stats.atk,
+                "def_": stats.def_,
+                "spa": stats.spa,
+                "spd": stats.spd,
+                "spe": stats.spe,
+                "total": stats.sum(),
+            },
+            "level_up_moves": level_up_moves,
+        }
+
+    def _chain_view(self, species: PokemonSpecies) -> dict[str, Any] | None:
+        chain = self.catalog.evolutionary_chain_for(species)
+        if chain is None:
+            return None
+
+        evolves_from = None
+        if chain.evolves_from is not None:
+            evolves_from = {
+                **_species_ref(chain.evolves_from),
+                "evolution": self._evolution_view(chain.evolves_from_evo),  # type: ignore
+            }
+
+        return {
+            "evolves_from": evolves_from,
+            "evolves_into": [
+                {**_species_ref(into), "evolution": self._evolution_view(evo)}
+                for into, evo in chain.evolves_into
+            ],
+        }
+
+    def species_view(self, species: PokemonSpecies) -> dict[str, Any]:
+        """
+        Builds the view for a single species page.
+        """
+
+        catalog = self.catalog
+
+        tabs = None
+        if forms := catalog.forms.get(species.internal_name):
+            default_form_name = None
+            if forms.default_form == 0:
+                default_form_name = forms.form_mapping.get(0, "Normal")
+
+            tabs = {
+                "default_form_name": default_form_name,
+                "forms": [[idx, name] for idx, name in forms.form_mapping.items() if idx != 0],
+            }
+
+        encounters = []
+        by_map = catalog.encounter_index.encounters_for(species.internal_name)
+        for map_id in sorted(by_map):
+            map_name = catalog.maps[map_id].name
+
+            for ec_type, entry in by_map[map_id].items():
+                encounters.append(
+                    {
+                        "map_id": map_id,
+                        "map_name": map_name,
+                        "type": ec_type,
+                        "chance": entry.chance,
+                        "min_level": entry.min_level,
+                        "max_level": entry.max_level,
+                    }
+                )
+
+        default = species.default_attributes
+        return {
+            **_species_ref(species),
+            "tabs": tabs,
+            "forms": [
+                self._form_view(species, attributes)
+                for _, _, attributes in catalog.all_forms_for(species)
+            ],
+            "chain": self._chain_view(species),
+            "tutor_moves": [
+                self._learnset_entry(default, None, move) for move in species.raw_tutor_moves
+            ],
+            "tms": [
+                self._learnset_entry(default, catalog.tm_id_for(move), move)
+                for move in species.raw_tms
+            ],
+            "encounters": encounters,
+        }
+
+    def _learner_view(self, entry: MoveMappingEntry) -> dict[str, Any]:
+        species = self.catalog.species_mapping[entry.species_name]
+
+        form_name = None
+        if entry.form_id != 0:
+            form_name = self.catalog.get_attribs_for_form(species, entry.form_id).form_name
+
+        return {
+            **_species_ref(species),
+            "form_name": form_name,
+            "learned_at": entry.learned_at,
+            "method": entry.type.name,
+        }
+
+    def move_view(
+        self,
+        move: PokemonMove,
+        entries: list[MoveMappingEntry],
+        prev_move: PokemonMove | None,
+        next_move: PokemonMove | None,
+    ) -> dict[str, Any]:
+        """
+        Builds the view for a single move page.
+        """
+
+        return {
+            "internal_name": move.internal_name,
+            "display_name": move.display_name,
+            "description": move.description,
+            "type": _type_view(move.type),
+            "category": move.category.name.lower(),
+            "category_name": move.category.name.title(),
+            "base_power": move.base_power,
+            "accuracy": move.accuracy,
+            "max_pp": move.max_pp,
+            "final_max_pp": move.final_max_pp,
+            "secondary_effect_chance": move.secondary_effect_chance,
+            "target": move.target_selection.template_name,
+            "flags": [
+                {"name": flag.template_name, "value": flag.value, "set": flag in move.flags}
+                for flag in MoveFlag
+                if flag != MoveFlag.BOMBER_HARRIS
+            ],
+            "tm_number": self.catalog.tm_id_for(move.internal_name),
+            "is_tutor": move in self.catalog.tutor_moves,
+            "prev_move": (
+                {"internal_name": prev_move.internal_name, "display_name": prev_move.display_name}
+                if prev_move is not None
+                else None
+            ),
+            "next_move": (
+                {"internal_name": next_move.internal_name, "display_name": next_move.display_name}
+                if next_move is not None
+                else None
+            ),
+            "lvl_up_learnset": [
+                self._learner_view(it) for it in entries if it.type in LEVEL_UP_ENTRY_TYPES
+            ],
+            "taught_learnset": [
+                self._learner_view(it) for it in entries if it.type not in LEVEL_UP_ENTRY_TYPES
+            ],
+        }
+
+    def _encounter_row(self, ec_type: str, encounter: Any, chance: int) -> dict[str, Any]:
+        species = self.catalog.species_mapping[encounter.name]
+
+        return {
+            **_species_ref(species),
+            "type": ec_type,
+            "min_level": encounter.minimum_level,
+            "max_level": encounter.maximum_level,
+            "chance": chance,
+        }
+
+    def map_view(self, map: MapMetadata) -> dict[str, Any]:
+        """
+        Builds the view for a single map page.
+        """
+
+        catalog = self.catalog
+        chain = catalog.get_map_chain_for(map)
+
+        encounter_tables = None
+        fishing = None
+        if (encounters := catalog.encounters.get(map.id)) is not None:
+            encounter_tables = []
+
+            for ec_type, all_encounters in encounters.encounters.items():
+                if ec_type.endswith("Rod"):
+                    continue
+
+                slots = ENCOUNTER_SLOTS[ec_type]
+                encounter_tables.append(
+                    [
+                        self._encounter_row(ec_type, it, slots[idx])
+                        for idx, it in enumerate(all_encounters)
+                    ]
+                )
+
+            # the fishing encounters all go into one table.
+            if encounters.has_fishing_encounters():
+                fishing = [
+                    self._encounter_row(ec_type, it, ENCOUNTER_SLOTS[ec_type][idx])
+                    for ec_type in ("OldRod", "GoodRod", "SuperRod")
+                    for idx, it in enumerate(encounters.encounters.get(ec_type, []))
+                ]
+
+        return {
+            **_map_ref(map),
+            # the breadcrumbs go from the root map down to (but not including) this one.
+            "parents": [_map_ref(it) for it in reversed(chain[1:])],
+            "child_maps": [_map_ref(catalog.maps[child]) for child in map.child_maps],
+            "encounter_tables": encounter_tables,
+            "fishing_encounters": fishing,
+        }
+
+    def move_views(self) -> dict[str, dict[str, Any]]:
+        built_move_mapping = list(self.catalog.build_move_mapping().items())
+        views: dict[str, dict[str, Any]] = {}
+
+        for idx, (move, entries) in enumerate(built_move_mapping):
+            prev_move: PokemonMove | None = None
+            next_move: PokemonMove | None = None
+
+            if idx > 0:
+                prev_move = built_move_mapping[idx - 1][0]
+
+            if idx < len(built_move_mapping) - 1:
+                next_move = built_move_mapping[idx + 1][0]
+
+            views[move.internal_name] = self.move_view(move, entries, prev_move, next_move)
+
+        return views
+
+
+def build_page_views(catalog: EssentialsCatalog) -> PageViews:
+    """
+    Builds the view models for every species, move and map page in the provided catalog.
+    """
+
+    builder = _ViewBuilder(catalog)
+
+    return PageViews(
+        species={it.internal_name: builder.species_view(it) for it in catalog.species},
+        moves=builder.move_views(),
+        maps={map_id: builder.map_view(map) for map_id, map in catalog.maps.items()},
+    )
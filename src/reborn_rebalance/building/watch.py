@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+import re
+import time
+import traceback
+from collections.abc import Collection, Mapping
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING
+
+import attr
+
+from reborn_rebalance.pbs.cache import FLAT_DATA_FILES, DataManifest
+from reborn_rebalance.pbs.catalog import CACHED_PROPERTY_DEPENDENCIES, EssentialsCatalog
+from reborn_rebalance.pbs.pokemon import PokemonSpecies
+
+if TYPE_CHECKING:
+    from reborn_rebalance.building.web import WebsiteBuilder
+
+# Watch mode for build-web. Rather than rebuilding all ~3,500 pages whenever anything changes, we
+# work out which pages actually read the changed entity and only render those.
+#
+# Pages are tracked at the entity level: changing a species re-renders its own page, the pages of
+# every move it learns (before *and* after the edit, so removed moves drop it too), every map it's
+# encountered on, every trainer using it, and its evolutionary neighbours (which show its name and
+# sprite). Anything that's referenced from basically every page (moves, items, maps, the navbar)
+# just triggers a full rebuild.
+#
+# The walkthroughs and the changelog are written by hand, so what they reference can't be worked
+# out from the catalog. Instead, the walkthrough pages are scanned for the macros that pull in
+# species and trainers, and the changelog is asked which species it has entries for.
+
+#: The names of the single-file pages, see :meth:`.WebsiteBuilder.render_index_pages`.
+INDEX_PAGES = ("changelog", "index", "species", "moves")
+
+# {{ sp("name") }} and {{ trainer_battle_content("name", "class", id) }} in walkthrough pages.
+_WALKTHROUGH_SPECIES = re.compile(r"""\bsp\(\s*["']([^"']+)["']""")
+_WALKTHROUGH_TRAINER = re.compile(r"""\btrainer_battle_content\(\s*["']([^"']+)["']""")
+
+
+@attr.s(kw_only=True)
+class PageSet:
+    """
+    The set of pages that need to be re-rendered after a change.
+    """
+
+    #: If True, the entire site needs rebuilding and everything else is ignored.
+    full: bool = attr.ib(default=False)
+
+    #: The names of the single-file pages (changelog, index, lists) to re-render. See
+    #: :data:`.INDEX_PAGES`.
+    index_pages: set[str] = attr.ib(factory=set)
+
+    #: The (directory) names of the walkthrough chapters to re-render.
+    walkthroughs: set[str] = attr.ib(factory=set)
+
+    #: If True, the static files need copying over again.
+    static: bool = attr.ib(default=False)
+
+    #: The internal names of the species pages to re-render.
+    species: set[str] = attr.ib(factory=set)
+
+    #: The internal names of the move pages to re-render.
+    moves: set[str] = attr.ib(factory=set)
+
+    #: The IDs of the map pages to re-render.
+    maps: set[int] = attr.ib(factory=set)
+
+    #: The names of the trainer pages to re-render.
+    trainers: set[str] = attr.ib(factory=set)
+
+    def is_empty(self) -> bool:
+        return not (
+            self.full
+            or self.index_pages
+            or self.walkthroughs
+            or self.static
+            or self.species
+            or self.moves
+            or self.maps
+            or self.trainers
+        )
+
+    def describe(self) -> str:
+        if self.full:
+            return "full rebuild"
+
+        parts = [
+            f"{len(self.species)} species",
+            f"{len(self.moves)} moves",
+            f"{len(self.maps)} maps",
+            f"{len(self.trainers)} trainers",
+        ]
+
+        if self.index_pages:
+            parts.append(f"index pages ({', '.join(sorted(self.index_pages))})")
+
+        if self.walkthroughs:
+            parts.append(f"{len(self.walkthroughs)} walkthroughs")
+
+        if self.static:
+            parts.append("static files")
+
+        return ", ".join(parts)
+
+
+@attr.s(frozen=True, kw_only=True)
+class HandwrittenReferences:
+    """
+    The catalog entities referenced by the hand-written pages, i.e. the walkthroughs and the
+    changelog.
+    """
+
+    #: The mapping of {species internal name: walkthrough chapters that link to it}.
+    walkthrough_species: Mapping[str, set[str]] = attr.ib()
+
+    #: The mapping of {trainer name: walkthrough chapters that show a battle against them}.
+    walkthrough_trainers: Mapping[str, set[str]] = attr.ib()
+
+    #: The internal names of the species that have changelog entries.
+    changelog_species: Collection[str] = attr.ib()
+
+    @classmethod
+    def scan(cls, builder: WebsiteBuilder) -> HandwrittenReferences:
+        """
+        Scans the walkthrough pages and the changelog of the provided website builder.
+        """
+
+        species: dict[str, set[str]] = {}
+        trainers: dict[str, set[str]] = {}
+
+        if builder.walkthrough_dir.exists():
+            for page in builder.walkthrough_dir.glob("*/page.html"):
+                chapter = page.parent.name
+                text = page.read_text(encoding="utf-8")
+
+                for name in _WALKTHROUGH_SPECIES.findall(text):
+                    species.setdefault(name.upper(), set()).add(chapter)
+
+                for name in _WALKTHROUGH_TRAINER.findall(text):
+                    trainers.setdefault(name, set()).add(chapter)
+
+        return cls(
+            walkthrough_species=species,
+            walkthrough_trainers=trainers,
+            changelog_species=builder.env.globals["changelog"].pokemon.keys(),
+        )
+
+
+def add_species_dependants(
+    catalog: EssentialsCatalog,
+    species: PokemonSpecies,
+    pages: PageSet,
+    references: HandwrittenReferences,
+):
+    """
+    Adds every page that displays data from the provided species to the page set.
+    """
+
+    name = species.internal_name
+    pages.species.add(name)
+    pages.index_pages.add("species")
+
+    if name in references.changelog_species:
+        pages.index_pages.add("changelog")
+
+    pages.walkthroughs.update(references.walkthrough_species.get(name, ()))
+
+    # evolutionary neighbours show this species in their evolution chain.
+    if (pre := catalog.pre_evolutionary_cache.get(name)) is not None:
+        pages.species.add(pre[0].internal_name)
+
+    for evo in species.evolutions:
+        pages.species.add(evo.into_name)
+
+    pages.moves.update(catalog.move_learners.moves_for(name))
+
+    pages.maps.update(catalog.encounter_index.maps_for(name))
+
+    for trainer_name, tr in catalog.trainers.items():
+        if any(poke.internal_name == name for t in tr.all_trainers() for poke in t.pokemon):
+            pages.trainers.add(trainer_name)
+            pages.walkthroughs.update(references.walkthrough_trainers.get(trainer_name, ()))
+
+
+def add_data_file_dependants(
+    catalog: EssentialsCatalog, relative: str, pages: PageSet, references: HandwrittenReferences
+):
+    """
+    Adds every page that displays data from the provided data file (relative to the data
+    directory) to the page set, based on the *current* state of the catalog.
+
+    This should be called both before and after reloading, so that pages which stopped
+    referencing an entity are updated too.
+    """
+
+    path = PurePosixPath(relative)
+    kind = path.parts[0]
+
+    if kind in FLAT_DATA_FILES:
+        pages.full = True
+        return
+
+    if kind == "species":
+        idx = int(path.name.split("-", 1)[0])
+        if idx <= len(catalog.species) and (species := catalog.species[idx - 1]) is not None:
+            add_species_dependants(catalog, species, pages, references)
+
+    elif kind == "forms":
+        # new files aren't known about until after the reload.
+        name = catalog.form_files.get(relative, path.stem.upper())
+        if (species := catalog.species_mapping.get(name)) is not None:
+            add_species_dependants(catalog, species, pages, references)
+
+    elif kind == "encounters":
+        map_id = int(path.name.split("_", 1)[0])
+        pages.maps.add(map_id)
+        pages.species.update(catalog.encounter_index.species_on(map_id))
+
+    elif kind == "trainers":
+        pages.trainers.add(path.stem)
+        pages.walkthroughs.update(references.walkthrough_trainers.get(path.stem, ()))
+
+
+def add_template_dependants(catalog: EssentialsCatalog, relative: PurePosixPath, pages: PageSet):
+    """
+    Adds every page rendered from the provided template file (relative to the templates
+    directory) to the page set.
+    """
+
+    kind = relative.parts[0] if len(relative.parts) > 1 else None
+
+    if kind == "static":
+        pages.static = True
+    elif kind == "species":
+        pages.index_pages.add("species")
+        pages.species.update(catalog.species_mapping.keys())
+    elif kind == "moves":
+        pages.index_pages.add("moves")
+        pages.moves.update(catalog.move_mapping.keys())
+    elif kind == "maps":
+        pages.maps.update(catalog.maps.keys())
+    elif kind == "trainers":
+        pages.trainers.update(catalog.trainers.keys())
+    else:
+        # shared templates (_meta, helpers, etc) are used by everything.
+        pages.full = True
+
+
+def _stat_tree(root: Path) -> dict[Path, tuple[int, int]]:
+    if not root.exists():
+        return {}
+
+    result = {}
+    for file in root.rglob("*"):
+        if file.is_dir():
+            continue
+
+        try:
+            stat = file.stat()
+        except FileNotFoundError:
+            continue
+
+        result[file] = (stat.st_mtime_ns, stat.st_size)
+
+    return result
+
+
+def _changed_stats(old: dict[Path, tuple[int, int]], new: dict[Path, tuple[int, int]]) -> set[Path]:
+    return {path for path in old.keys() | new.keys() if old.get(path) != new.get(path)}
+
+
+def watch_and_rebuild(
+    builder: WebsiteBuilder,
+    *,
+    interval: float = 1.0,
+    single_threaded: bool = False,
+    use_cache: bool = True,
+):
+    """
+    Watches the data and template directories, re-rendering only the affected pages whenever a
+    file changes. Runs until interrupted.
+    """
+
+    input_dir = builder.input_dir
+    template_dir = builder.template_dir
+    extra_dirs = [input_dir / "walkthroughs", input_dir / "web"]
+
+    manifest = DataManifest.build(input_dir)
+    template_stats = _stat_tree(template_dir)
+    extra_stats = {dir: _stat_tree(dir) for dir in extra_dirs}
+
+    # set if a reload fails part way through, as the catalog might be half-updated.
+    catalog_broken = False
+
+    print(f"Watching {input_dir} and {template_dir} for changes, press Ctrl-C to stop")
+
+    try:
+        while True:
+            time.sleep(interval)
+
+            changed_data, new_manifest = manifest.changed_files(input_dir)
+            new_template_stats = _stat_tree(template_dir)
+            new_extra_stats = {dir: _stat_tree(dir) for dir in extra_dirs}
+
+            changed_templates = _changed_stats(template_stats, new_template_stats)
+            changed_extras = {
+                dir: _changed_stats(extra_stats[dir], new_extra_stats[dir]) for dir in extra_dirs
+            }
+
+            if not (changed_data or changed_templates or any(changed_extras.values())):
+                continue
+
+            manifest = new_manifest
+            template_stats = new_template_stats
+            extra_stats = new_extra_stats
+
+            start = time.monotonic()
+            pages = PageSet()
+
+            try:
+                catalog = builder.catalog
+
+                if catalog_broken:
+                    pages.full = True
+                elif changed_data:
+                    references = HandwrittenReferences.scan(builder)
+
+                    for relative in changed_data:
+                        add_data_file_dependants(catalog, relative, pages, references)
+
+                    reloaded = catalog.reload_changed(input_dir, changed_data)
+
+                    # structural changes (like renaming a species) reload the entire catalog,
+                    # which can add or remove pages anywhere.
+                    if reloaded >= CACHED_PROPERTY_DEPENDENCIES.keys():
+                        pages.full = True
+
+                    for relative in changed_data:
+                        add_data_file_dependants(catalog, relative, pages, references)
+
+                for path in changed_templates:
+                    relative = PurePosixPath(path.relative_to(template_dir).as_posix())
+                    add_template_dependants(catalog, relative, pages)
+
+                if changed_walkthroughs := changed_extras[input_dir / "walkthroughs"]:
+                    pages.static = True
+
+                    for path in changed_walkthroughs:
+                        relative = path.relative_to(input_dir / "walkthroughs")
+
+                        # the navbar is on every page.
+                        if relative.name == "navbar.toml":
+                            pages.full = True
+                        elif len(relative.parts) > 1:
+                            pages.walkthroughs.add(relative.parts[0])
+
+                if changed_extras[input_dir / "web"]:
+                    pages.full = True
+
+            except Exception:
+                traceback.print_exc()
+                print("Failed to reload catalog, performing a full reload on the next change")
+                catalog_broken = True
+                continue
+
+            if pages.is_empty():
+                continue
+
+            try:
+                if catalog_broken:
+                    builder.replace_catalog(
+                        EssentialsCatalog.load_from_toml(
+                            input_dir, single_threaded=single_threaded, use_cache=use_cache
+                        )
+                    )
+                    catalog_broken = False
+
+                elif changed_data or pages.full:
+                    builder.refresh_globals()
+
+                print(f"Re-rendering: {pages.describe()}")
+                builder.render_pages(pages)
+            except Exception:
+                traceback.print_exc()
+                print("Failed to rebuild, waiting for further changes")
+                continue
+
+            print(f"Rebuilt in {time.monotonic() - start:.2f}s")
+
+    except KeyboardInterrupt:
+        print("Stopped watching")
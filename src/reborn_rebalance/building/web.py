@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 import argparse
-import shutil
+import concurrent.futures
+import hashlib
+import math
+import os
 import subprocess
 import sys
 import tempfile
+from collections.abc import Collection, Hashable, Iterator
+from contextlib import contextmanager
+from io import BytesIO
 from pathlib import Path
 from typing import Any
 
@@ -12,15 +18,44 @@ import attr
 import jinja2
 import rtoml
 from PIL import Image
+from PIL.Image import Image as ImageKlass
 from tqdm import tqdm
 
+from reborn_rebalance import tracing
+from reborn_rebalance.building.views import PageViews, build_page_views, view_hash
+from reborn_rebalance.building.watch import INDEX_PAGES, PageSet, watch_and_rebuild
+from reborn_rebalance.changelog import Changelog
 from reborn_rebalance.changes import build_changelog
-from reborn_rebalance.map.map import render_map
-from reborn_rebalance.map.tileset import load_all_tilesets
+from reborn_rebalance.map.map import (
+    RpgMakerMap,
+    draw_map,
+    draw_map_strip,
+    load_map,
+    render_map,
+    render_map_strip,
+)
+from reborn_rebalance.map.shared import SharedAtlases
+from reborn_rebalance.map.tileset import RpgMakerTileset, load_all_tilesets
+from reborn_rebalance.output import OutputManifest
 from reborn_rebalance.pbs.catalog import EssentialsCatalog
 from reborn_rebalance.pbs.encounters import ENCOUNTER_SLOTS
 from reborn_rebalance.pbs.map import FIELD_NAMES
-from reborn_rebalance.pbs.move import MoveCategory, MoveFlag, MoveMappingEntryType, PokemonMove
+from reborn_rebalance.pbs.move import MoveCategory, MoveFlag, MoveMappingEntryType
+from reborn_rebalance.pbs.pokemon import PokemonSpecies
+from reborn_rebalance.util import chunks
+
+# Page rendering is sharded across a pool of worker processes during full builds. Every worker
+# builds its own WebsiteBuilder (and Jinja environment) from the same catalog when it starts, then
+# renders batches of pages by key. Each page only depends on the catalog, so the output is
+# identical no matter which worker renders it or in what order.
+
+#: The largest number of pages rendered in a single worker task.
+MAX_PAGES_PER_TASK = 64
+
+#: The page kinds that are rendered from a view model, see ``views.py``. Pages of these kinds are
+#: skipped if neither their view model nor the templates have changed since they were last
+#: rendered.
+VIEW_PAGE_KINDS = ("species", "moves", "maps")
 
 
 @attr.s(slots=True, kw_only=True)
@@ -96,108 +131,196 @@ def load_navbar_walkthroughs(path: Path) -> list[WalkthroughEntry]:
     return entries
 
 
-def crop_form_sprites(catalog: EssentialsCatalog, game_dir: Path, output_dir: Path):
+#: The version of the sprite cropping. Bump this if sprites are cropped differently, so that every
+#: cropped sprite is redone.
+SPRITE_CROP_VERSION = 1
+
+
+def sprite_crop_source(input_file: Path, *extra: object) -> str:
+    """
+    Gets the hash of everything a cropped sprite depends on: the sprite it was cropped out of, and
+    anything else that changes how it's cropped.
+    """
+
+    hasher = hashlib.sha256(f"{SPRITE_CROP_VERSION}:{extra}".encode())
+    hasher.update(input_file.read_bytes())
+    return hasher.hexdigest()
+
+
+def crop_form_sprites(
+    catalog: EssentialsCatalog, game_dir: Path, output_dir: Path, *, manifest: OutputManifest
+):
     """
-    Crops all form sprites from the original files.
+    Crops all form sprites from the original files, skipping any that were already cropped from
+    the same sprite.
 
     :param catalog: the catalog to load from
     :param game_dir: the game dir to load the sprites from
     :param output_dir: the dir to place the cropped form sprites in
+    :param manifest: the manifest for the image cache that ``output_dir`` is inside of
     """
 
-    for species in tqdm(catalog.species, desc="Form Sprites"):
-        try:
-            forms = catalog.forms[species.internal_name.upper()]
-        except KeyError:
-            continue
+    try:
+        for species in tqdm(catalog.species, desc="Form Sprites"):
+            _crop_species_forms(catalog, species, game_dir, output_dir, manifest)
+    finally:
+        manifest.save()
 
-        # comically broken as-is.
-        if species.dex_number == 493:
-            continue
 
-        # weh
-        if not forms.form_mapping:
-            continue
+def _crop_species_forms(
+    catalog: EssentialsCatalog,
+    species: PokemonSpecies,
+    game_dir: Path,
+    output_dir: Path,
+    manifest: OutputManifest,
+):
+    try:
+        forms = catalog.forms[species.internal_name.upper()]
+    except KeyError:
+        return
+
+    # comically broken as-is.
+    if species.dex_number == 493:
+        return
+
+    # weh
+    if not forms.form_mapping:
+        return
 
-        form_count = max(forms.form_mapping.keys()) + 1
+    form_count = max(forms.form_mapping.keys()) + 1
 
-        if species.internal_name == "URSHIFU":
-            # don't remember why I added this special case.
-            form_count += 2
+    if species.internal_name == "URSHIFU":
+        # don't remember why I added this special case.
+        form_count += 2
 
-        elif forms.has_dynamax_form:
-            # dynamax forms add an extra 4 tiles, so imagemagick will crop it but we discard it.
-            form_count += 1
+    elif forms.has_dynamax_form:
+        # dynamax forms add an extra 4 tiles, so imagemagick will crop it but we discard it.
+        form_count += 1
 
-        input_file = game_dir / "Graphics" / "Battlers" / f"{species.dex_number:03d}.png"
-        input_file = input_file.absolute()
+    input_file = game_dir / "Graphics" / "Battlers" / f"{species.dex_number:03d}.png"
+    input_file = input_file.absolute()
+    source = sprite_crop_source(input_file, form_count)
 
-        # could do a PIL native version. but yegh.
-        with tempfile.TemporaryDirectory() as dir:
-            path = str(Path(dir) / "%02d.png")
-            subprocess.check_call(["magick", input_file, "-crop", f"2x{form_count * 2}@", path])
+    # {output path: index of the cropped tile}
+    # front sprite is just (idx * 4), shiny is the one after.
+    # eg normal form has 00 + 01, second form has 04 + 05, etc.
+    outputs: dict[Path, int] = {}
+    for idx, name in forms.form_mapping.items():
+        outputs[output_dir / f"battler_{species.dex_number:04d}_{name}.png"] = idx * 4
+        outputs[output_dir / f"battler_{species.dex_number:04d}_{name}_shiny.png"] = 1 + idx * 4
 
-            for idx, name in forms.form_mapping.items():
-                # front sprite is just (idx * 4).
-                # eg normal form has 00 + 01, second form has 04 + 05, etc.
-                front_sprite = idx * 4
-                shiny_sprite = 1 + (idx * 4)
+    if all(manifest.is_unchanged(path, source) for path in outputs):
+        return
 
-                regular_path = Path(dir) / f"{front_sprite:02d}.png"
-                regular_output_path = output_dir / f"battler_{species.dex_number:04d}_{name}.png"
-                shutil.copyfile(regular_path, regular_output_path)
+    # could do a PIL native version. but yegh.
+    with tempfile.TemporaryDirectory() as dir:
+        path = str(Path(dir) / "%02d.png")
+        subprocess.check_call(["magick", input_file, "-crop", f"2x{form_count * 2}@", path])
 
-                shiny_path = Path(dir) / f"{shiny_sprite:02d}.png"
-                shiny_output_path = (
-                    output_dir / f"battler_{species.dex_number:04d}_{name}_shiny.png"
-                )
-                shutil.copyfile(shiny_path, shiny_output_path)
+        for output_path, tile in outputs.items():
+            data = (Path(dir) / f"{tile:02d}.png").read_bytes()
+            manifest.write_bytes(output_path, data, source)
 
 
-def crop_regular_sprites(catalog: EssentialsCatalog, original_dir: Path, output_path: Path):
+def _crop_sprite(image: ImageKlass, box: tuple[int, int, int, int]) -> bytes:
+    size = (box[2] - box[0], box[3] - box[1])
+    with Image.new(mode="RGBA", size=size, color=None) as output:  # type: ignore
+        output.paste(image.crop(box))
+        return _png_bytes(output, compress_level=9)
+
+
+def crop_regular_sprites(
+    catalog: EssentialsCatalog, original_dir: Path, output_path: Path, *, manifest: OutputManifest
+):
     """
-    Crops all regular sprites for all species.
+    Crops all regular sprites for all species, skipping any that were already cropped from the
+    same sprite.
 
     :param catalog: the catalog, containing all the species
     :param original_dir: the root directory of the original game
     :param output_path: where to write the cropped sprites
+    :param manifest: the manifest for the image cache that ``output_path`` is inside of
     """
 
-    for species in tqdm(catalog.species, desc="Species Sprites"):
-        idx = species.dex_number
+    try:
+        for species in tqdm(catalog.species, desc="Species Sprites"):
+            idx = species.dex_number
+
+            # (input sprite, {output file: crop box})
+            crops = [
+                (
+                    original_dir / "Graphics" / "Icons" / f"icon{idx:03d}.png",
+                    {
+                        f"{idx:04d}.png": (0, 0, 64, 64),
+                        f"{idx:04d}_shiny.png": (128, 0, 192, 64),
+                    },
+                ),
+                (
+                    original_dir / "Graphics" / "Battlers" / f"{idx:03d}.png",
+                    {
+                        f"battler_{idx:04d}.png": (0, 0, 192, 192),
+                        f"battler_{idx:04d}_shiny.png": (192, 0, 384, 192),
+                    },
+                ),
+            ]
+
+            for input_file, boxes in crops:
+                source = sprite_crop_source(input_file)
+                if all(manifest.is_unchanged(output_path / it, source) for it in boxes):
+                    continue
+
+                with Image.open(input_file) as image:
+                    image.load()
+
+                    for name, box in boxes.items():
+                        manifest.write_bytes(output_path / name, _crop_sprite(image, box), source)
+    finally:
+        manifest.save()
+
+
+#: The version of the map renderer. Bump this if maps render differently, so that every cached
+#: render is redone.
+MAP_RENDER_VERSION = 1
+
+
+def map_render_source(rpg_map: RpgMakerMap, tileset: RpgMakerTileset) -> str:
+    """
+    Gets the hash of everything a rendered map depends on: its tile table, its tileset ID, and the
+    images of the tileset.
+    """
+
+    tiles = rpg_map.tiles.data
+    hasher = hashlib.sha256(f"{MAP_RENDER_VERSION}:{rpg_map.tileset_id}:{tiles.shape}".encode())
+    hasher.update(tiles.tobytes())
+    hasher.update(tileset.fingerprint.encode("utf-8"))
+    return hasher.hexdigest()
 
-        input_mini_sprite = original_dir / "Graphics" / "Icons" / f"icon{idx:03d}.png"
 
-        with Image.open(input_mini_sprite) as input_1, Image.open(input_mini_sprite) as input_2:
-            input_1.load()
-            input_2.load()
+@attr.s(frozen=True, slots=True, kw_only=True)
+class _MapRenderJob:
+    #: The path to the map file.
+    map_path: Path = attr.ib()
 
-            output_normal = Image.new(mode="RGBA", size=(64, 64), color=None)  # type: ignore
-            cropped_normal = input_1.crop((0, 0, 64, 64))
-            output_normal.paste(cropped_normal)
+    #: The hash of everything the render depends on, see :func:`.map_render_source`.
+    source: str = attr.ib()
 
-            output_shiny = Image.new(mode="RGBA", size=(64, 64), color=None)  # type: ignore
-            cropped_shiny = input_2.crop((128, 0, 192, 64))
-            output_shiny.paste(cropped_shiny)
+    #: The ID of the map's tileset.
+    tileset_id: int = attr.ib()
 
-            output_normal.save(output_path / f"{idx:04d}.png", compress_level=9)
-            output_shiny.save(output_path / f"{idx:04d}_shiny.png", compress_level=9)
+    #: The number of tiles in the map, i.e. how long it takes to render.
+    tile_count: int = attr.ib()
 
-        inp_battler = original_dir / "Graphics" / "Battlers" / f"{idx:03d}.png"
-        with Image.open(inp_battler) as input_1, Image.open(inp_battler) as input_2:
-            input_1.load()
-            input_2.load()
+    #: If the map itself needs rendering.
+    needs_map: bool = attr.ib()
 
-            output_normal = Image.new(mode="RGBA", size=(192, 192), color=None)  # type: ignore
-            cropped_normal = input_1.crop((0, 0, 192, 192))
-            output_normal.paste(cropped_normal)
+    #: If the animation strip of the map needs rendering.
+    needs_strip: bool = attr.ib()
 
-            output_shiny = Image.new(mode="RGBA", size=(192, 192), color=None)  # type: ignore
-            cropped_shiny = input_2.crop((192, 0, 384, 192))
-            output_shiny.paste(cropped_shiny)
 
-            output_normal.save(output_path / f"battler_{idx:04d}.png", compress_level=9)
-            output_shiny.save(output_path / f"battler_{idx:04d}_shiny.png", compress_level=9)
+def _png_bytes(image: ImageKlass, **options: Any) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", **options)
+    return buffer.getvalue()
 
 
 def render_all_maps(
@@ -205,21 +328,736 @@ def render_all_maps(
     game_dir: Path,
     data_dir: Path,
     output_dir: Path,
+    *,
+    manifest: OutputManifest,
+    animation_strips: bool = False,
+    workers: int = 1,
 ):
-    tilesets = load_all_tilesets(game_dir)
+    """
+    Renders every map in the catalog into the provided directory, skipping any that were already
+    rendered from the same tiles and tileset images.
 
-    for map_id in tqdm(catalog.maps.keys(), desc="Map Rendering"):
+    :param manifest: The manifest for the image cache that ``output_dir`` is inside of.
+    :param animation_strips: If True, every animation frame of maps with animated autotiles is
+                             also rendered into a single ``_frames`` image.
+    """
+
+    # the images are only needed for the maps that actually changed.
+    tilesets = load_all_tilesets(game_dir, load_images=False)
+
+    jobs: list[_MapRenderJob] = []
+
+    for map_id in catalog.maps:
         map_name = f"Map{map_id:03d}.rxdata"
         map_path = data_dir / "overwritten_maps" / map_name
         if not map_path.exists():
             map_path = game_dir / "Data" / map_name
 
-        output_path = (output_dir / map_path.name).with_suffix(".png")
-        if output_path.exists():
+        rpg_map = load_map(map_path)
+        tileset = tilesets.tilesets[rpg_map.tileset_id]
+        if tileset is None:
+            print(f"can't render map {map_id}, tileset {rpg_map.tileset_id} is missing")
             continue
 
-        with render_map(tilesets, map_path) as output:
-            output.save(output_path)
+        source = map_render_source(rpg_map, tileset)
+        output_path = (output_dir / map_path.name).with_suffix(".png")
+        strip_path = output_path.with_name(f"{output_path.stem}_frames.png")
+
+        needs_map = not manifest.is_unchanged(output_path, source)
+        needs_strip = (
+            animation_strips
+            and not manifest.is_unchanged(strip_path, source)
+            and tileset.animation_frames > 1
+        )
+
+        if needs_map or needs_strip:
+            job = _MapRenderJob(
+                map_path=map_path,
+                source=source,
+                tileset_id=rpg_map.tileset_id,
+                tile_count=rpg_map.width * rpg_map.height,
+                needs_map=needs_map,
+                needs_strip=needs_strip,
+            )
+            jobs.append(job)
+
+    if not jobs:
+        return
+
+    def save(job: _MapRenderJob, rendered: bytes | None, strip: bytes | None):
+        output_path = (output_dir / job.map_path.name).with_suffix(".png")
+        if rendered is not None:
+            manifest.write_bytes(output_path, rendered, job.source)
+
+        if strip is not None:
+            strip_path = output_path.with_name(f"{output_path.stem}_frames.png")
+            manifest.write_bytes(strip_path, strip, job.source)
+
+    try:
+        if workers <= 1:
+            # one tileset at a time, so that only a single tileset's images and atlases are ever
+            # in memory. the sort is stable, so maps are still in order within a tileset.
+            jobs.sort(key=lambda it: it.tileset_id)
+
+            for idx, job in enumerate(tqdm(jobs, desc="Map Rendering")):
+                rendered = strip = None
+                if job.needs_map:
+                    with render_map(tilesets, job.map_path) as image:
+                        rendered = _png_bytes(image)
+
+                if job.needs_strip:
+                    strip_image = render_map_strip(tilesets, job.map_path)
+                    if strip_image is not None:
+                        with strip_image:
+                            strip = _png_bytes(strip_image)
+
+                save(job, rendered, strip)
+
+                if idx + 1 == len(jobs) or jobs[idx + 1].tileset_id != job.tileset_id:
+                    tileset = tilesets.tilesets[job.tileset_id]
+                    assert tileset
+                    tileset.close()
+
+            return
+
+        # largest maps first. otherwise, one worker ends up stuck on a huge map right at the end
+        # while all the others are idle.
+        jobs.sort(key=lambda it: it.tile_count, reverse=True)
+
+        with tempfile.TemporaryDirectory(prefix="atlases-") as atlas_dir:
+            atlases = SharedAtlases.export(
+                tilesets,
+                Path(atlas_dir),
+                tileset_ids={it.tileset_id for it in jobs},
+                animations=animation_strips,
+            )
+
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(workers, len(jobs)),
+                initializer=_init_map_worker,
+                initargs=(atlases,),
+            ) as pool:
+                futures = {pool.submit(_render_map_task, job): job for job in jobs}
+
+                try:
+                    with tqdm(total=len(jobs), desc="Map Rendering") as progress:
+                        for future in concurrent.futures.as_completed(futures):
+                            save(futures[future], *future.result())
+                            progress.update(1)
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+
+                    raise
+    finally:
+        # so that a failed or interrupted run doesn't redo everything that did get rendered.
+        manifest.save()
+
+
+#: The tileset atlases for the current map rendering worker, see :func:`.render_all_maps`.
+_worker_atlases: SharedAtlases | None = None
+
+
+def _init_map_worker(atlases: SharedAtlases):
+    global _worker_atlases
+    _worker_atlases = atlases
+
+
+def _render_map_task(job: _MapRenderJob) -> tuple[bytes | None, bytes | None]:
+    """
+    Renders a single map inside a worker.
+
+    :return: A tuple of (the rendered map, the rendered animation strip) as PNG data, each None if
+             it wasn't rendered.
+    """
+
+    assert _worker_atlases is not None, "map worker wasn't initialised"
+
+    rpg_map = load_map(job.map_path)
+    rendered = strip = None
+
+    if job.needs_map:
+        with draw_map(rpg_map, _worker_atlases.atlas(rpg_map.tileset_id)) as image:
+            rendered = _png_bytes(image)
+
+    frames = _worker_atlases.animation_frames[rpg_map.tileset_id]
+    if job.needs_strip and frames > 1:
+        atlases = [_worker_atlases.atlas(rpg_map.tileset_id, it) for it in range(frames)]
+        with draw_map_strip(rpg_map, atlases) as image:
+            strip = _png_bytes(image)
+
+    return rendered, strip
+
+
+class WebsiteBuilder:
+    """
+    Renders the documentation website from a loaded catalog.
+
+    Every page type has its own render method, so that watch mode can re-render just the pages
+    affected by a change rather than the whole site.
+    """
+
+    def __init__(
+        self,
+        *,
+        catalog: EssentialsCatalog,
+        input_dir: Path,
+        template_dir: Path,
+        output_dir: Path,
+        pokesprites: Path,
+        maps_dir: Path,
+        workers: int = 1,
+        skip_unchanged: bool = True,
+        cache_dir: Path | None = None,
+        changelog: Changelog | None = None,
+    ):
+        self.catalog = catalog
+        self.input_dir = input_dir
+        self.template_dir = template_dir
+        self.output_dir = output_dir
+        self.pokesprites = pokesprites
+        self.maps_dir = maps_dir
+
+        #: The number of worker processes used for rendering pages in full builds. If this is 1,
+        #: everything is rendered in this process.
+        self.workers = workers
+        self._pool: concurrent.futures.Executor | None = None
+
+        #: If True, pages whose view models haven't changed since the last build aren't rendered
+        #: again, and files whose content hasn't changed aren't rewritten.
+        self.skip_unchanged = skip_unchanged
+        self.cache_dir = cache_dir
+        self.output = OutputManifest.load(output_dir, cache_dir, enabled=skip_unchanged)
+        self._views: PageViews | None = None
+
+        self.walkthrough_dir = input_dir / "walkthroughs"
+        self.walkthru_entries: list[WalkthroughEntry] = []
+
+        # move pages link to the previous and next move, so keep track of them to know which pages
+        # need re-rendering when the order changes.
+        self._move_neighbours: dict[str, tuple[str | None, str | None]] = {}
+
+        search_paths = [template_dir]
+        if self.walkthrough_dir.exists():
+            search_paths.append(self.walkthrough_dir)
+
+        loader = jinja2.FileSystemLoader(searchpath=search_paths)
+        self.env = jinja2.Environment(loader=loader, undefined=jinja2.StrictUndefined)
+        self.env.globals["catalog"] = catalog
+        self.env.globals["MoveCategory"] = MoveCategory
+        self.env.globals["ENCOUNTER_SLOTS"] = ENCOUNTER_SLOTS
+        self.env.globals["FIELD_NAMES"] = FIELD_NAMES
+        self.env.globals["MoveMappingEntryType"] = MoveMappingEntryType
+        self.env.globals["MoveFlag"] = MoveFlag
+
+        self.refresh_globals(changelog)
+
+    def refresh_globals(self, changelog: Changelog | None = None):
+        """
+        Rebuilds the template globals that are derived from the catalog or the navbar files. This
+        needs to be called whenever the catalog is reloaded.
+
+        :param changelog: The already built changelog for the current catalog, if there is one.
+                          Building it checks every entry against the catalog and prints warnings,
+                          so render workers are given the parent's one instead.
+        """
+
+        if changelog is None:
+            changelog = build_changelog(self.catalog)
+
+        self.env.globals["changelog"] = changelog
+        self.env.globals["navbar_maps"] = load_navbar_maps(
+            self.catalog, self.input_dir / "web" / "navbar_maps.toml"
+        )
+
+        self.walkthru_entries = []
+        if self.walkthrough_dir.exists():
+            self.walkthru_entries = load_navbar_walkthroughs(self.walkthrough_dir / "navbar.toml")
+
+        self.env.globals["navbar_walkthroughs"] = self.walkthru_entries
+        self._views = None
+
+        # imported macro modules are cached along with a *copy* of the globals, so drop every
+        # loaded template to make sure nothing keeps referencing the old values.
+        if self.env.cache is not None:
+            self.env.cache.clear()
+
+    def replace_catalog(self, catalog: EssentialsCatalog):
+        """
+        Replaces the catalog used for rendering, e.g. after a full reload.
+        """
+
+        self.catalog = catalog
+        self.env.globals["catalog"] = catalog
+        self.refresh_globals()
+
+    @property
+    def views(self) -> PageViews:
+        """
+        The view models for the species, move and map pages. These are built the first time
+        they're needed after the catalog is (re)loaded.
+        """
+
+        if self._views is None:
+            with tracing.span("build_page_views", "web"):
+                self._views = build_page_views(self.catalog)
+
+        return self._views
+
+    def _save_output_manifest(self):
+        self.output.save()
+        print(f"Output: {self.output.summary()}")
+        self.output.written = self.output.skipped = 0
+
+    def _templates_fingerprint(self) -> str:
+        # the navbar is on every page, so it counts as part of the templates.
+        hasher = hashlib.sha256()
+        for path in sorted(self.template_dir.rglob("*.html")):
+            hasher.update(path.relative_to(self.template_dir).as_posix().encode("utf-8"))
+            hasher.update(path.read_bytes())
+
+        hasher.update(repr(self.env.globals["navbar_maps"]).encode("utf-8"))
+        hasher.update(repr(self.env.globals["navbar_walkthroughs"]).encode("utf-8"))
+        return hasher.hexdigest()
+
+    def page_path(self, kind: str, view: dict[str, Any]) -> Path:
+        """
+        Gets the output path for the page of the provided kind with the provided view model.
+        """
+
+        match kind:
+            case "species":
+                name = view["internal_name"].lower()
+                return (self.output_dir / "species" / "specific" / name).with_suffix(".html")
+            case "moves":
+                name = view["internal_name"].lower()
+                return (self.output_dir / "moves" / name).with_suffix(".html")
+            case "maps":
+                return self.output_dir / "maps" / f"{view['id']:03d}.html"
+            case _:
+                raise ValueError(f"unknown view page kind {kind}")
+
+    def _render_views(self, kind: str, views: list[dict[str, Any]], *, desc: str, quiet: bool):
+        """
+        Renders the pages for the provided view models, skipping any that are unchanged.
+        """
+
+        if not self.skip_unchanged:
+            self._render_many(kind, views, desc=desc, quiet=quiet)  # type: ignore
+            return
+
+        fingerprint = self._templates_fingerprint()
+        pending: list[tuple[Path, str]] = []
+        to_render: list[Hashable] = []
+
+        for view in views:
+            path = self.page_path(kind, view)
+            digest = view_hash({"templates": fingerprint, "view": view})
+
+            if self.output.is_unchanged(path, digest):
+                self.output.skipped += 1
+                continue
+
+            pending.append((path, digest))
+            to_render.append(view)  # type: ignore
+
+        self._render_many(kind, to_render, desc=desc, quiet=quiet)
+
+        # only recorded once everything rendered, so failed pages are retried next time.
+        for path, digest in pending:
+            self.output.set_source(path, digest)
+
+    def build_all(self):
+        """
+        Renders the entire website.
+        """
+
+        with self._render_pool():
+            with tracing.span("render_index_pages", "web"):
+                self.render_index_pages()
+
+            with tracing.span("render_species_pages", "web"):
+                self.render_species_pages(self.catalog.species)
+
+            with tracing.span("render_move_pages", "web"):
+                self.render_move_pages()
+
+            with tracing.span("render_map_pages", "web"):
+                self.render_map_pages(self.catalog.maps.keys())
+
+            with tracing.span("render_trainer_pages", "web"):
+                self.render_trainer_pages(self.catalog.trainers.keys())
+
+            with tracing.span("render_walkthrough_pages", "web"):
+                self.render_walkthrough_pages()
+
+        with tracing.span("copy_static_files", "web"):
+            self.copy_static_files()
+
+        self._save_output_manifest()
+
+    @contextmanager
+    def _render_pool(self) -> Iterator[None]:
+        # the pool only lives for a single build, so the workers never have a stale catalog after
+        # a reload in watch mode.
+        if self.workers <= 1:
+            yield
+            return
+
+        options = {
+            "catalog": self.catalog,
+            "input_dir": self.input_dir,
+            "template_dir": self.template_dir,
+            "output_dir": self.output_dir,
+            "pokesprites": self.pokesprites,
+            "maps_dir": self.maps_dir,
+            "skip_unchanged": self.skip_unchanged,
+            "cache_dir": self.cache_dir,
+            "changelog": self.env.globals["changelog"],
+        }
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_render_worker, initargs=(options,)
+        ) as pool:
+            self._pool = pool
+
+            try:
+                yield
+            finally:
+                self._pool = None
+
+    def _render_many(self, kind: str, keys: list[Hashable], *, desc: str, quiet: bool):
+        """
+        Renders the pages of the provided kind with the provided keys (or view models), either in
+        this process or across the worker pool if a full build is running.
+        """
+
+        if self._pool is None or len(keys) < 2:
+            for key in tqdm(keys, desc=desc, disable=quiet):
+                self.render_page(kind, key)
+
+            return
+
+        chunk_size = max(1, min(MAX_PAGES_PER_TASK, math.ceil(len(keys) / (self.workers * 4))))
+        trace = tracing.is_enabled()
+        futures = [
+            self._pool.submit(_render_shard, kind, shard, trace)
+            for shard in chunks(keys, chunk_size)
+        ]
+
+        try:
+            with tqdm(total=len(keys), desc=desc, disable=quiet) as progress:
+                for future in concurrent.futures.as_completed(futures):
+                    count, events, updates = future.result()
+                    tracing.add_events(events)
+                    self.output.merge(updates)
+                    progress.update(count)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+
+            raise
+
+    def render_page(self, kind: str, key: Any):
+        """
+        Renders a single page.
+
+        :param kind: One of ``species``, ``moves``, ``maps``, ``trainers`` or ``walkthroughs``.
+        :param key: The view model of the page for species, moves and maps; otherwise the trainer
+                    name or walkthrough chapter index of the page.
+        """
+
+        match kind:
+            case "species":
+                self._render_species_page(key)
+            case "moves":
+                self._render_move_page(key)
+            case "maps":
+                self._render_map_page(key)
+            case "trainers":
+                self._render_trainer_page(key)  # type: ignore
+            case "walkthroughs":
+                self._render_walkthrough_page(key)  # type: ignore
+            case _:
+                raise ValueError(f"unknown page kind {kind}")
+
+    def render_index_pages(self, only: Collection[str] = INDEX_PAGES):
+        """
+        Renders the single-file pages, i.e. the changelog, the index, and the list pages.
+
+        :param only: The names of the pages to render, from :data:`.INDEX_PAGES`.
+        """
+
+        output_dir = self.output_dir
+
+        if "changelog" in only:
+            self.output.write_text(
+                output_dir / "changelog.html",
+                self.env.get_template("changelog/page.html").render(),
+            )
+
+        if "index" in only:
+            self.output.write_text(
+                output_dir / "index.html", self.env.get_template("index.html").render()
+            )
+
+        if "species" in only:
+            (output_dir / "species").mkdir(exist_ok=True, parents=True)
+            table = self.catalog.stat_table
+            species_bst = dict(zip(table.species.tolist(), table.species_bst.tolist(), strict=True))
+            self.output.write_text(
+                output_dir / "species" / "index.html",
+                self.env.get_template("species/list.html").render(
+                    species_definitions=self.catalog.species, species_bst=species_bst
+                ),
+            )
+
+        if "moves" in only:
+            moves_by_name = sorted(self.catalog.moves, key=lambda it: it.display_name)
+            moves_left = moves_by_name[: len(moves_by_name) // 2]
+            moves_right = moves_by_name[len(moves_by_name) // 2 :]
+            (output_dir / "moves").mkdir(exist_ok=True, parents=True)
+            self.output.write_text(
+                output_dir / "moves" / "index.html",
+                self.env.get_template("moves/list.html").render(left=moves_left, right=moves_right),
+            )
+
+    def render_species_pages(self, species_list: Collection[PokemonSpecies]):
+        """
+        Renders the individual pages for the provided species.
+        """
+
+        (self.output_dir / "species" / "specific").mkdir(exist_ok=True, parents=True)
+        views = self.views.species
+        self._render_views(
+            "species",
+            [views[species.internal_name] for species in species_list],
+            desc="Species Page Rendering",
+            quiet=_quiet(species_list),
+        )
+
+    def _render_species_page(self, view: dict[str, Any]):
+        path = self.page_path("species", view)
+
+        try:
+            with tracing.span("render_page", "web", page=view["internal_name"]):
+                template = self.env.get_template("species/single.html")
+                self.output.write_text(path, template.render(species=view))
+        except Exception:
+            print("Error rendering", view["internal_name"], file=sys.stderr)
+            raise
+
+    def render_move_pages(self, only: Collection[str] | None = None):
+        """
+        Renders the individual pages for every move that is learnt by at least one species.
+
+        :param only: If provided, only the moves with these internal names (plus any moves whose
+                     neighbours have changed since the last render) are rendered.
+        """
+
+        (self.output_dir / "moves").mkdir(exist_ok=True, parents=True)
+
+        to_render: list[dict[str, Any]] = []
+        for name, view in self.views.moves.items():
+            neighbours = (
+                view["prev_move"]["internal_name"] if view["prev_move"] else None,
+                view["next_move"]["internal_name"] if view["next_move"] else None,
+            )
+            previous_neighbours = self._move_neighbours.get(name)
+            self._move_neighbours[name] = neighbours
+
+            if only is not None and name not in only and previous_neighbours == neighbours:
+                continue
+
+            to_render.append(view)
+
+        self._render_views("moves", to_render, desc="Move Page Rendering", quiet=only is not None)
+
+    def _render_move_page(self, view: dict[str, Any]):
+        path = self.page_path("moves", view)
+
+        with tracing.span("render_page", "web", page=view["internal_name"]):
+            template = self.env.get_template("moves/single.html")
+            self.output.write_text(path, template.render(move=view))
+
+    def render_map_pages(self, map_ids: Collection[int]):
+        """
+        Renders the individual pages for the provided map IDs.
+        """
+
+        (self.output_dir / "maps").mkdir(exist_ok=True, parents=True)
+        views = self.views.maps
+        self._render_views(
+            "maps",
+            [views[map_id] for map_id in map_ids],
+            desc="Map Page Rendering",
+            quiet=_quiet(map_ids),
+        )
+
+    def _render_map_page(self, view: dict[str, Any]):
+        path = self.page_path("maps", view)
+
+        with tracing.span("render_page", "web", page=view["id"]):
+            template = self.env.get_template("maps/single.html")
+            self.output.write_text(path, template.render(map=view))
+
+    def render_trainer_pages(self, names: Collection[str]):
+        """
+        Renders the individual pages for the provided trainer names. Pages for trainers that no
+        longer exist are deleted.
+        """
+
+        (self.output_dir / "trainers").mkdir(exist_ok=True, parents=True)
+        self._render_many(
+            "trainers", list(names), desc="Trainer Page Rendering", quiet=_quiet(names)
+        )
+
+    def _render_trainer_page(self, name: str):
+        path = (self.output_dir / "trainers" / name).with_suffix(".html")
+
+        tr = self.catalog.trainers.get(name)
+        if tr is None:
+            self.output.remove(path)
+            return
+
+        try:
+            with tracing.span("render_page", "web", page=tr.trainer_name):
+                template = self.env.get_template("trainers/single.html")
+                self.output.write_text(path, template.render(trainers=tr))
+        except:
+            print("Error rendering", tr.trainer_name, file=sys.stderr)
+            raise
+
+    def render_walkthrough_pages(self, only: Collection[str] | None = None):
+        """
+        Renders every walkthrough page, and copies over their static files.
+
+        :param only: If provided, only the walkthrough chapters with these (directory) names are
+                     rendered.
+        """
+
+        (self.output_dir / "walkthroughs").mkdir(exist_ok=True, parents=True)
+        walkthru_statics = []
+        to_render: list[Hashable] = []
+        wdir = self.walkthrough_dir
+
+        flattened_entries = [chap for e in self.walkthru_entries for chap in e.chapters]
+        for n, entry in enumerate(flattened_entries):
+            wpath = wdir / entry[0]
+            if not (wpath / "page.html").exists():
+                continue
+
+            if only is not None and entry[0] not in only:
+                continue
+
+            if (wdir_static := wpath / "static").exists():
+                walkthru_statics.append(wdir_static)
+
+            to_render.append(n)
+
+        self._render_many("walkthroughs", to_render, desc="Walkthru Page Rendering", quiet=False)
+
+        for static_dir in walkthru_statics:
+            output = self.output_dir / "static" / static_dir.parent.name
+            self.output.copy_tree(static_dir, output)
+
+    def _render_walkthrough_page(self, n: int):
+        flattened_entries = [chap for e in self.walkthru_entries for chap in e.chapters]
+        entry = flattened_entries[n]
+        wpath = self.walkthrough_dir / entry[0]
+
+        extra_env = {}
+
+        if n > 0:
+            prev_entry = flattened_entries[n - 1]
+            extra_env["LEFTLINK_ID"], extra_env["LEFTLINK_NAME"] = prev_entry
+
+        extra_env["NAME"], extra_env["TITLE"] = entry
+
+        if n < len(flattened_entries):
+            next_entry = flattened_entries[n + 1]
+            extra_env["RIGHTLINK_ID"], extra_env["RIGHTLINK_NAME"] = next_entry
+
+        template = self.env.get_template(f"{wpath.name}/page.html")
+        output = (self.output_dir / "walkthroughs" / wpath.name).with_suffix(".html")
+        self.output.write_text(output, template.render(**extra_env))
+
+    def render_pages(self, pages: PageSet):
+        """
+        Re-renders only the pages in the provided page set.
+        """
+
+        if pages.full:
+            self.build_all()
+            return
+
+        if pages.index_pages:
+            self.render_index_pages(pages.index_pages)
+
+        species_mapping = self.catalog.species_mapping
+        self.render_species_pages(
+            [species_mapping[name] for name in sorted(pages.species) if name in species_mapping]
+        )
+
+        if pages.moves:
+            self.render_move_pages(pages.moves)
+
+        self.render_map_pages([it for it in sorted(pages.maps) if it in self.catalog.maps])
+        self.render_trainer_pages(sorted(pages.trainers))
+
+        if pages.walkthroughs:
+            self.render_walkthrough_pages(pages.walkthroughs)
+
+        if pages.static:
+            self.copy_static_files()
+
+        self._save_output_manifest()
+
+    def copy_static_files(self):
+        """
+        Makes sure the sprites and static data are all in the output directory. Files that haven't
+        changed since they were last copied are left alone.
+        """
+
+        output_dir = self.output_dir
+        self.output.copy_tree(self.template_dir / "static", output_dir / "static")
+        self.output.copy_tree(self.pokesprites, output_dir / "sprites")
+        self.output.copy_tree(self.maps_dir, output_dir / "static" / "maps")
+
+
+#: The builder for the current worker process, see :meth:`.WebsiteBuilder._render_pool`.
+_worker_builder: WebsiteBuilder | None = None
+
+
+def _init_render_worker(options: dict[str, Any]):
+    global _worker_builder
+    _worker_builder = WebsiteBuilder(**options)
+
+
+def _render_shard(
+    kind: str, keys: list[Hashable], trace: bool
+) -> tuple[int, list[tracing.SpanEvent], tuple[Any, ...]]:
+    """
+    Renders a batch of pages inside a worker.
+
+    :return: A tuple of (number of pages rendered, trace events, output manifest updates).
+    """
+
+    assert _worker_builder is not None, "render worker wasn't initialised"
+
+    with (
+        tracing.collect(trace) as events,
+        tracing.span(f"render_shard:{kind}", "web", pages=len(keys)),
+    ):
+        for key in keys:
+            _worker_builder.render_page(kind, key)
+
+    return len(keys), events, _worker_builder.output.take_updates()
+
+
+def _quiet(items: Collection[Any]) -> bool:
+    # don't spam progress bars for the handful of pages a watch-mode rebuild touches.
+    return len(items) < 50
 
 
 def main():
@@ -232,6 +1070,49 @@ def main():
         default=False,
     )
 
+    parser.add_argument(
+        "--workers",
+        help=(
+            "The number of processes to render pages and maps with. Defaults to the number of CPUs"
+        ),
+        type=int,
+        default=None,
+    )
+
+    parser.add_argument(
+        "--no-catalog-cache",
+        help="Always loads the catalog from TOML, ignoring (and not updating) the snapshot cache",
+        action="store_true",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--no-page-cache",
+        help=(
+            "Always re-renders and rewrites every page (and map and cropped sprite, with "
+            "--render-maps and --crop-*-sprites), rather than skipping the pages and files that "
+            "haven't changed since the last build"
+        ),
+        action="store_true",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--watch",
+        help=(
+            "After building, keeps running and re-renders only the affected pages whenever the "
+            "data or template files change"
+        ),
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--watch-interval",
+        help="How often to check for changes in watch mode, in seconds",
+        type=float,
+        default=1.0,
+    )
+
     parser.add_argument(
         "--game-dir", help="The game directory to load sprites from.", type=Path, default=None
     )
@@ -244,8 +1125,8 @@ def main():
     parser.add_argument(
         "--crop-regular-sprites",
         help=(
-            "Generates cropped input battler sprites before building. Only needs to be done if "
-            "battler sprites changed"
+            "Generates cropped input battler sprites before building. Only sprites cropped "
+            "out of a changed battler sprite are redone"
         ),
         action="store_true",
         default=False,
@@ -253,18 +1134,40 @@ def main():
     parser.add_argument(
         "--crop-form-sprites",
         help=(
-            "Generates cropped form battler sprites before building. Only needs to be done if "
-            "battler sprites changed"
+            "Generates cropped form battler sprites before building. Only sprites cropped "
+            "out of a changed battler sprite are redone"
         ),
         action="store_true",
         default=False,
     )
     parser.add_argument(
         "--render-maps",
-        help="Generates rendered map files (WIP). Only needs to be done if maps changed",
+        help=(
+            "Generates rendered map files (WIP). Maps are only re-rendered if their tiles or "
+            "tileset images changed since they were last rendered"
+        ),
         action="store_true",
         default=False,
     )
+    parser.add_argument(
+        "--render-map-strips",
+        help=(
+            "When rendering maps, also renders every animation frame of maps with animated "
+            "autotiles into a single strip image"
+        ),
+        action="store_true",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--trace",
+        help=(
+            "Writes a Chrome trace of the build to this file, for chrome://tracing or Perfetto. "
+            f"Defaults to the {tracing.TRACE_ENV_VAR} environment variable"
+        ),
+        type=Path,
+        default=None,
+    )
 
     parser.add_argument(
         "INPUT", help="The input data directory", type=Path, default=Path.cwd() / "data"
@@ -295,172 +1198,75 @@ def main():
 
     output_dir.mkdir(exist_ok=True, parents=True)
 
-    catalog = EssentialsCatalog.load_from_toml(
-        input_dir, single_threaded=args.force_single_threaded
-    )
-
-    game_dir: Path | None = args.game_dir
-    image_cache_location: Path = args.image_cache_location
-
-    pokesprites = image_cache_location / "mons"
-    pokesprites.mkdir(exist_ok=True, parents=True)
-
-    maps_dir = image_cache_location / "rendered_maps"
-    maps_dir.mkdir(exist_ok=True, parents=True)
-
-    if args.crop_regular_sprites:
-        if game_dir is None:
-            parser.error("--game-dir must be provided for image processing")
-
-        crop_regular_sprites(catalog, game_dir, pokesprites)
-
-    if args.crop_form_sprites:
-        if game_dir is None:
-            parser.error("--game-dir must be provided for image processing")
-
-        crop_form_sprites(catalog, game_dir, pokesprites)
-
-    if args.render_maps:
-        if game_dir is None:
-            parser.error("--game-dir must be provided for image processing")
-
-        render_all_maps(catalog, game_dir, args.INPUT, maps_dir)
-
-    changelog = build_changelog(catalog)
-
-    walkthru_statics = []
-    search_paths = [template_dir]
-    if (wdir := input_dir / "walkthroughs").exists():
-        search_paths.append(wdir)
-
-    loader = jinja2.FileSystemLoader(searchpath=search_paths)
-    env = jinja2.Environment(loader=loader, undefined=jinja2.StrictUndefined)
-    env.globals["catalog"] = catalog
-    env.globals["changelog"] = changelog
-    env.globals["MoveCategory"] = MoveCategory
-    env.globals["ENCOUNTER_SLOTS"] = ENCOUNTER_SLOTS
-    env.globals["FIELD_NAMES"] = FIELD_NAMES
-    env.globals["navbar_maps"] = load_navbar_maps(catalog, input_dir / "web" / "navbar_maps.toml")
-    env.globals["MoveMappingEntryType"] = MoveMappingEntryType
-    env.globals["MoveFlag"] = MoveFlag
-
-    walkthru_entries: list[WalkthroughEntry] = []
-    if wdir.exists():
-        walkthru_entries = load_navbar_walkthroughs(wdir / "navbar.toml")
-
-    env.globals["navbar_walkthroughs"] = walkthru_entries
-
-    # build single-file templates
-    with (output_dir / "changelog.html").open(mode="w", encoding="utf-8") as f:
-        f.write(env.get_template("changelog/page.html").render())
-
-    with (output_dir / "index.html").open(mode="w", encoding="utf-8") as f:
-        f.write(env.get_template("index.html").render())
-
-    (output_dir / "species").mkdir(exist_ok=True, parents=True)
-    (output_dir / "species" / "specific").mkdir(exist_ok=True, parents=True)
-    with (output_dir / "species" / "index.html").open(mode="w", encoding="utf-8") as f:
-        f.write(env.get_template("species/list.html").render(species_definitions=catalog.species))
-
-    # build the looped templates
-    specific_mon_template = env.get_template("species/single.html")
-    for species in tqdm(catalog.species, desc="Species Page Rendering"):
-        path = output_dir / "species" / "specific" / species.internal_name.lower()
-        path = path.with_suffix(".html")
-
-        try:
-            path.write_text(specific_mon_template.render(species=species))
-        except Exception:
-            print("Error rendering", species.internal_name, file=sys.stderr)
-            raise
-
-    (output_dir / "moves").mkdir(exist_ok=True, parents=True)
-    built_move_mapping = list(catalog.build_move_mapping().items())
-    move_template = env.get_template("moves/single.html")
-    for idx, (move, entries) in tqdm(
-        enumerate(built_move_mapping), desc="Move Page Rendering", total=len(built_move_mapping)
-    ):
-        lvl_up_learnset = [e for e in entries if e.type.value <= 2]
-        taught_learnset = [e for e in entries if e.type.value >= 3]
-
-        prev_move: PokemonMove | None = None
-        next_move: PokemonMove | None = None
-        
-        if idx > 0:
-            prev_move = built_move_mapping[idx - 1][0]
-        
-        if idx < len(built_move_mapping) - 1:
-            next_move = built_move_mapping[idx + 1][0]
-        
-        path = (output_dir / "moves" / move.internal_name.lower()).with_suffix(".html")
-        path.write_text(move_template.render(
-            move=move, 
-            lvl_up_learnset=lvl_up_learnset,
-            taught_learnset=taught_learnset,
-            prev_move=prev_move,
-            next_move=next_move,
-        ))
-
-    moves_by_name = sorted(catalog.moves, key=lambda it: it.display_name)
-    moves_left = moves_by_name[:len(moves_by_name)//2]
-    moves_right = moves_by_name[len(moves_by_name)//2:]
-    (output_dir / "moves" / "index.html").write_text(
-        env.get_template("moves/list.html").render(left=moves_left, right=moves_right)
-    )
-
-    (output_dir / "maps").mkdir(exist_ok=True, parents=True)
-    maps_template = env.get_template("maps/single.html")
-    for map in tqdm(catalog.maps.values(), desc="Map Page Rendering"):
-        path = output_dir / "maps" / f"{map.id:03d}.html"
-        path.write_text(maps_template.render(map=map))
-
-    (output_dir / "trainers").mkdir(exist_ok=True, parents=True)
-    trainer_template = env.get_template("trainers/single.html")
-    for tr in tqdm(catalog.trainers.values(), desc="Trainer Page Rendering"):
-        path = (output_dir / "trainers" / tr.trainer_name).with_suffix(".html")
-        try:
-            path.write_text(trainer_template.render(trainers=tr))
-        except:
-            print("Error rendering", tr.trainer_name, file=sys.stderr)
-            raise
-
-    (output_dir / "walkthroughs").mkdir(exist_ok=True, parents=True)
-
-    flattened_entries = [chap for e in walkthru_entries for chap in e.chapters]
-    for n, entry in tqdm(
-        enumerate(flattened_entries), desc="Walkthru Page Rendering", total=len(flattened_entries)
-    ):
-        wpath = wdir / entry[0]
-        if not (wpath / "page.html").exists():
-            continue
-
-        extra_env = {}
-
-        if n > 0:
-            prev_entry = flattened_entries[n - 1]
-            extra_env["LEFTLINK_ID"], extra_env["LEFTLINK_NAME"] = prev_entry
-
-        extra_env["NAME"], extra_env["TITLE"] = entry
-
-        if n < len(flattened_entries):
-            next_entry = flattened_entries[n + 1]
-            extra_env["RIGHTLINK_ID"], extra_env["RIGHTLINK_NAME"] = next_entry
-
-        if (wdir_static := wpath / "static").exists():
-            walkthru_statics.append(wdir_static)
-
-        template = env.get_template(f"{wpath.name}/page.html")
-        output = (output_dir / "walkthroughs" / wpath.name).with_suffix(".html")
-        output.write_text(template.render(**extra_env))
-
-    # now make sure the sprites and static data are all there
-    shutil.copytree(template_dir / "static", output_dir / "static", dirs_exist_ok=True)
-    shutil.copytree(pokesprites, output_dir / "sprites", dirs_exist_ok=True)
-    shutil.copytree(maps_dir, output_dir / "static" / "maps", dirs_exist_ok=True)
-
-    for static_dir in walkthru_statics:
-        output = output_dir / "static" / static_dir.parent.name
-        shutil.copytree(static_dir, output, dirs_exist_ok=True)
+    workers = 1 if args.force_single_threaded else (args.workers or os.cpu_count() or 1)
+
+    # watch mode runs forever, so only the initial build is traced.
+    with tracing.trace_to(args.trace):
+        catalog = EssentialsCatalog.load_from_toml(
+            input_dir,
+            single_threaded=args.force_single_threaded,
+            use_cache=not args.no_catalog_cache,
+        )
+
+        game_dir: Path | None = args.game_dir
+        image_cache_location: Path = args.image_cache_location
+
+        pokesprites = image_cache_location / "mons"
+        pokesprites.mkdir(exist_ok=True, parents=True)
+
+        maps_dir = image_cache_location / "rendered_maps"
+        maps_dir.mkdir(exist_ok=True, parents=True)
+
+        # one manifest for everything in the image cache, kept alongside it.
+        image_cache = OutputManifest.load(
+            image_cache_location, image_cache_location, enabled=not args.no_page_cache
+        )
+
+        if args.crop_regular_sprites:
+            if game_dir is None:
+                parser.error("--game-dir must be provided for image processing")
+
+            crop_regular_sprites(catalog, game_dir, pokesprites, manifest=image_cache)
+
+        if args.crop_form_sprites:
+            if game_dir is None:
+                parser.error("--game-dir must be provided for image processing")
+
+            crop_form_sprites(catalog, game_dir, pokesprites, manifest=image_cache)
+
+        if args.render_maps:
+            if game_dir is None:
+                parser.error("--game-dir must be provided for image processing")
+
+            render_all_maps(
+                catalog,
+                game_dir,
+                args.INPUT,
+                maps_dir,
+                manifest=image_cache,
+                animation_strips=args.render_map_strips,
+                workers=workers,
+            )
+
+        builder = WebsiteBuilder(
+            catalog=catalog,
+            input_dir=input_dir,
+            template_dir=template_dir,
+            output_dir=output_dir,
+            pokesprites=pokesprites,
+            maps_dir=maps_dir,
+            workers=workers,
+            skip_unchanged=not args.no_page_cache,
+        )
+        builder.build_all()
+
+    if args.watch:
+        watch_and_rebuild(
+            builder,
+            interval=args.watch_interval,
+            single_threaded=args.force_single_threaded,
+            use_cache=not args.no_catalog_cache,
+        )
 
 
 if __name__ == "__main__":
@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import textwrap
 from collections import defaultdict
-from collections.abc import KeysView
+from collections.abc import Collection, KeysView
 from typing import Self
 
 import attr
 
 from reborn_rebalance.pbs.catalog import EssentialsCatalog
+from reborn_rebalance.pbs.learners import LEVEL_UP_METHODS
+from reborn_rebalance.pbs.move import MoveMappingEntryType
 from reborn_rebalance.pbs.type import PokemonType
 
 
@@ -48,6 +50,15 @@ class PokemonChangeSet(BaseChangeSet):
     A changelog for a single Pokémon. This class shouldn't be created directly.
     """
 
+    def _check_learnset(
+        self, move_name: str, methods: Collection[MoveMappingEntryType], learns: bool
+    ):
+        # the changelog is written by hand, so catch entries that don't match the actual data.
+        learners = self._log.catalog.move_learners
+        if learners.learns(self._name, move_name, methods=methods) != learns:
+            action = "adds" if learns else "removes"
+            print(f"warning: changelog {action} {move_name} for {self._name}, but the data doesn't")
+
     def add_base_stat_change(self, stat: str, from_: int, to: int) -> Self:
         """
         Adds a new base stat change addittion to this Pokémon.
@@ -70,6 +81,7 @@ class PokemonChangeSet(BaseChangeSet):
         """
 
         assert move_name in self._log.catalog.move_mapping, f"no such move {move_name}"
+        self._check_learnset(move_name, LEVEL_UP_METHODS, learns=False)
         # no level property signifies removal.
         self._add_change({"key": "move", "type": "level", "move": move_name})
         return self
@@ -80,6 +92,7 @@ class PokemonChangeSet(BaseChangeSet):
         """
 
         assert move_name in self._log.catalog.move_mapping, f"no such move {move_name}"
+        self._check_learnset(move_name, LEVEL_UP_METHODS, learns=True)
         self._add_change({"key": "move", "type": "level", "level": level, "move": move_name})
         return self
 
@@ -96,6 +109,9 @@ class PokemonChangeSet(BaseChangeSet):
         Adds a TM to this Pokémon's learnset.
         """
 
+        move_name = self._log.catalog.tm_move_for(tm).internal_name
+        self._check_learnset(move_name, {MoveMappingEntryType.TM}, learns=True)
+
         self._add_change({"key": "move", "type": "tm", "action": "add", "number": tm})
         return self
 
@@ -104,6 +120,9 @@ class PokemonChangeSet(BaseChangeSet):
         Removes a TM from this Pokémon's learnset.
         """
 
+        move_name = self._log.catalog.tm_move_for(tm).internal_name
+        self._check_learnset(move_name, {MoveMappingEntryType.TM}, learns=False)
+
         self._add_change({"key": "move", "type": "tm", "action": "remove", "number": tm})
         return self
 
@@ -112,6 +131,8 @@ class PokemonChangeSet(BaseChangeSet):
         Adds a tutor move to this Pokémon's learnset.
         """
 
+        self._check_learnset(name, {MoveMappingEntryType.TUTOR}, learns=True)
+
         self._add_change({"key": "move", "type": "tutor", "action": "add", "move": name})
         return self
 
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from pathlib import Path
+
+import attr
+import numpy as np
+import numpy.typing as npt
+from PIL import Image
+from PIL.Image import Image as ImageKlass
+
+# Batched map rendering. Pasting every tile one at a time through PIL means a Python loop over
+# every tile of every layer, which for the bigger maps is tens of thousands of pastes.
+#
+# Instead, the tileset (and every pattern of its autotiles) is cut into an atlas of 32x32 RGBA
+# tiles once, indexed by the raw tile IDs the maps use. Each layer is then built by gathering every
+# tile it uses out of the atlas with one fancy index, and blended onto the map with a single paste
+# (per strip of rows, to keep the memory use down). Tiles that aren't drawn are fully transparent,
+# which leaves whatever is underneath untouched, so this is pixel-identical to pasting tile by
+# tile.
+
+#: The width and height of a single tile, in pixels.
+TILE_SIZE = 32
+
+#: The number of tiles in each row of a tileset image.
+TILESET_WIDTH = 8
+
+#: The number of tile rows to build and paste at once.
+STRIP_ROWS = 16
+
+#: The number of autotiles in a tileset.
+AUTOTILE_COUNT = 7
+
+#: The number of different patterns (edges, corners, etc) that each autotile has.
+AUTOTILE_PATTERNS = 48
+
+#: The first raw tile ID that's a regular tile, rather than an autotile (or nothing).
+FIRST_TILE_ID = (AUTOTILE_COUNT + 1) * AUTOTILE_PATTERNS
+
+# autotile graphics are 3x4 tiles, split into 6x8 quarter tiles of 16x16. every pattern is made
+# out of four quarter tiles: top left, top right, bottom left, bottom right. this is the same
+# table the game's tilemap uses (one-indexed, like theirs).
+# fmt: off
+_AUTOTILE_QUARTERS = np.array(
+    [
+        [27, 28, 33, 34], [5, 28, 33, 34], [27, 6, 33, 34], [5, 6, 33, 34],
+        [27, 28, 33, 12], [5, 28, 33, 12], [27, 6, 33, 12], [5, 6, 33, 12],
+        [27, 28, 11, 34], [5, 28, 11, 34], [27, 6, 11, 34], [5, 6, 11, 34],
+        [27, 28, 11, 12], [5, 28, 11, 12], [27, 6, 11, 12], [5, 6, 11, 12],
+        [25, 26, 31, 32], [25, 6, 31, 32], [25, 26, 31, 12], [25, 6, 31, 12],
+        [15, 16, 21, 22], [15, 16, 21, 12], [15, 16, 11, 22], [15, 16, 11, 12],
+        [29, 30, 35, 36], [29, 30, 11, 36], [5, 30, 35, 36], [5, 30, 11, 36],
+        [39, 40, 45, 46], [5, 40, 45, 46], [39, 6, 45, 46], [5, 6, 45, 46],
+        [25, 30, 31, 36], [15, 16, 45, 46], [13, 14, 19, 20], [13, 14, 19, 12],
+        [17, 18, 23, 24], [17, 18, 11, 24], [41, 42, 47, 48], [5, 42, 47, 48],
+        [37, 38, 43, 44], [37, 6, 43, 44], [13, 18, 19, 24], [13, 14, 43, 44],
+        [37, 42, 43, 48], [17, 18, 47, 48], [13, 18, 43, 48], [1, 2, 7, 8],
+    ],
+    dtype=np.intp,
+) - 1
+# fmt: on
+
+_QUARTER_SIZE = TILE_SIZE // 2
+
+
+def autotile_frame_count(image: npt.NDArray[np.uint8]) -> int:
+    """
+    Gets the number of animation frames in an autotile graphic, as an RGBA ``(height, width, 4)``
+    array. Single tile autotiles (only 32 pixels high) are one tile per frame, and everything else
+    is one 96x128 block per frame.
+    """
+
+    height, width = image.shape[:2]
+    if height == TILE_SIZE:
+        return max(width // TILE_SIZE, 1)
+
+    return max(width // (TILE_SIZE * 3), 1)
+
+
+def expand_autotile(image: npt.NDArray[np.uint8]) -> npt.NDArray[np.uint8]:
+    """
+    Expands an autotile graphic, as an RGBA ``(height, width, 4)`` array, into every one of its
+    patterns for every animation frame.
+
+    :return: An array of shape ``(frames, 48, 32, 32, 4)``.
+    """
+
+    frames = autotile_frame_count(image)
+
+    if image.shape[0] == TILE_SIZE:
+        # the same tile for every pattern.
+        tiles = np.zeros((frames, TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8)
+        for frame in range(frames):
+            part = image[:, frame * TILE_SIZE : (frame + 1) * TILE_SIZE]
+            tiles[frame, :, : part.shape[1]] = part
+
+        return np.repeat(tiles[:, np.newaxis], AUTOTILE_PATTERNS, axis=1)
+
+    # pad out to a whole number of 96x128 frames, same as tiles.
+    block_width, block_height = TILE_SIZE * 3, TILE_SIZE * 4
+    padded = np.zeros((block_height, frames * block_width, 4), dtype=np.uint8)
+    height, width = min(image.shape[0], block_height), min(image.shape[1], frames * block_width)
+    padded[:height, :width] = image[:height, :width]
+
+    # (frames, 48 quarters, 16, 16, 4), with quarters left to right then top to bottom.
+    quarters = (
+        padded.reshape(8, _QUARTER_SIZE, frames, 6, _QUARTER_SIZE, 4)
+        .transpose(2, 0, 3, 1, 4, 5)
+        .reshape(frames, 48, _QUARTER_SIZE, _QUARTER_SIZE, 4)
+    )
+
+    # (frames, patterns, 4 quarters, ...) -> (frames, patterns, 2, 2, ...) -> whole tiles
+    patterns = quarters[:, _AUTOTILE_QUARTERS]
+    patterns = patterns.reshape(frames, AUTOTILE_PATTERNS, 2, 2, _QUARTER_SIZE, _QUARTER_SIZE, 4)
+    return (
+        patterns.transpose(0, 1, 2, 4, 3, 5, 6)
+        .reshape(frames, AUTOTILE_PATTERNS, TILE_SIZE, TILE_SIZE, 4)
+        .copy()
+    )
+
+
+def _put_autotiles(tiles: npt.NDArray[np.uint8], autotiles: Sequence[npt.NDArray[np.uint8] | None]):
+    for idx, patterns in enumerate(autotiles[:AUTOTILE_COUNT]):
+        if patterns is not None:
+            start = (idx + 1) * AUTOTILE_PATTERNS
+            tiles[start : start + AUTOTILE_PATTERNS] = patterns
+
+
+def _empty_tiles(tiles: npt.NDArray[np.uint8]) -> npt.NDArray[np.bool_]:
+    alpha = tiles[..., 3].reshape(len(tiles), -1)
+    return (alpha == 0).all(axis=1)
+
+
+@attr.s(frozen=True, slots=True, kw_only=True)
+class TileAtlas:
+    """
+    A tileset image and its autotiles cut into 32x32 RGBA tiles.
+
+    Every raw tile ID is its own entry, i.e. autotile patterns come first and the tile at position
+    ``n`` of the tileset (left to right, then top to bottom) is entry ``384 + n``. Everything
+    before the first autotile is fully transparent, so entry 0 can be used for tiles that aren't
+    drawn.
+    """
+
+    #: The tiles, of shape ``(entries, 32, 32, 4)``.
+    tiles: npt.NDArray[np.uint8] = attr.ib(eq=False)
+
+    #: If each entry is fully transparent, i.e. drawing it does nothing.
+    empty: npt.NDArray[np.bool_] = attr.ib(eq=False)
+
+    @classmethod
+    def from_image(
+        cls,
+        image: npt.NDArray[np.uint8],
+        autotiles: Sequence[npt.NDArray[np.uint8] | None] = (),
+    ) -> TileAtlas:
+        """
+        Builds an atlas from a tileset image, as an RGBA ``(height, width, 4)`` array. Parts of
+        tiles outside of the image are transparent, same as cropping outside of it is.
+
+        :param autotiles: The patterns for each autotile of the tileset, as ``(48, 32, 32, 4)``
+                          arrays (i.e. a single frame of :func:`.expand_autotile`). Missing
+                          autotiles aren't drawn.
+        """
+
+        rows = -(-image.shape[0] // TILE_SIZE)
+        padded = np.zeros((rows * TILE_SIZE, TILESET_WIDTH * TILE_SIZE, 4), dtype=np.uint8)
+
+        height, width = image.shape[0], min(image.shape[1], TILESET_WIDTH * TILE_SIZE)
+        padded[:height, :width] = image[:, :width]
+
+        tiles = np.zeros(
+            (FIRST_TILE_ID + rows * TILESET_WIDTH, TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8
+        )
+        tiles[FIRST_TILE_ID:] = (
+            padded.reshape(rows, TILE_SIZE, TILESET_WIDTH, TILE_SIZE, 4)
+            .transpose(0, 2, 1, 3, 4)
+            .reshape(rows * TILESET_WIDTH, TILE_SIZE, TILE_SIZE, 4)
+        )
+
+        _put_autotiles(tiles, autotiles)
+        return cls(tiles=tiles, empty=_empty_tiles(tiles))
+
+    @classmethod
+    def load(cls, path: Path) -> TileAtlas:
+        """
+        Loads an atlas saved with :meth:`.save`, memory-mapped (read-only) rather than read into
+        memory, so that every process using it shares the same pages.
+        """
+
+        return cls(
+            tiles=np.load(path.with_suffix(".tiles.npy"), mmap_mode="r"),
+            empty=np.load(path.with_suffix(".empty.npy"), mmap_mode="r"),
+        )
+
+    def save(self, path: Path):
+        """
+        Saves this atlas next to the provided path (as ``.tiles.npy`` and ``.empty.npy`` files),
+        for loading with :meth:`.load`.
+        """
+
+        np.save(path.with_suffix(".tiles.npy"), self.tiles)
+        np.save(path.with_suffix(".empty.npy"), self.empty)
+
+    def with_autotiles(self, autotiles: Sequence[npt.NDArray[np.uint8] | None]) -> TileAtlas:
+        """
+        Copies this atlas with different autotile patterns, e.g. for another animation frame.
+
+        :param autotiles: The same as for :meth:`.from_image`.
+        """
+
+        tiles = np.array(self.tiles)
+        tiles[AUTOTILE_PATTERNS:FIRST_TILE_ID] = 0
+        _put_autotiles(tiles, autotiles)
+
+        empty = np.array(self.empty)
+        empty[:FIRST_TILE_ID] = _empty_tiles(tiles[:FIRST_TILE_ID])
+        return TileAtlas(tiles=tiles, empty=empty)
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+    def indexes(self, tiles: npt.NDArray[np.integer]) -> npt.NDArray[np.intp]:
+        """
+        Converts an array of raw tileset IDs into entries in this atlas. Anything outside of the
+        tileset image becomes the transparent entry.
+        """
+
+        indexes = tiles.astype(np.intp)
+        indexes[indexes >= len(self.tiles)] = 0
+        return indexes
+
+    def composite(self, image: ImageKlass, grid: npt.NDArray[np.intp]):
+        """
+        Draws a single layer onto an RGBA image in-place.
+
+        :param image: The image to draw onto, of size ``(columns * 32, rows * 32)``.
+        :param grid: The atlas entry for every tile in the layer, of shape ``(rows, columns)``.
+        """
+
+        rows, columns = grid.shape
+
+        for start in range(0, rows, STRIP_ROWS):
+            strip = grid[start : start + STRIP_ROWS]
+            if self.empty[strip].all():
+                continue
+
+            # (rows, columns, 32, 32, 4) -> (rows * 32, columns * 32, 4)
+            pixels = self.tiles[strip].transpose(0, 2, 1, 3, 4)
+            pixels = pixels.reshape(len(strip) * TILE_SIZE, columns * TILE_SIZE, 4)
+
+            # use the layer itself as the mask to correctly blend alpha, like a single tile.
+            with Image.fromarray(pixels) as layer:
+                image.paste(layer, (0, start * TILE_SIZE), layer)
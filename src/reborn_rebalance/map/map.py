@@ -2,12 +2,16 @@ import enum
 import math
 import re
 import sys
+from collections.abc import Sequence
 from pathlib import Path
 
 import attr
+import numpy as np
+import numpy.typing as npt
 from PIL import Image
 from PIL.Image import Image as ImageKlass
 
+from reborn_rebalance.map.compositor import TileAtlas
 from reborn_rebalance.map.tileset import AllTilesets, load_all_tilesets
 from reborn_rebalance.scripts.unmarshal import RgssTable, unmarshal
 
@@ -61,18 +65,20 @@ class RpgMakerMap:
     def tiles_per_layer(self) -> int:
         return math.prod(self.dimensions)
 
+    def layer_tiles(self, layer: MapLayer) -> npt.NDArray[np.uint16]:
+        """
+        Gets the raw tileset tiles for an entire layer, as a ``(height, width)`` array.
+        """
+
+        # serialised in three layers, bottom to top, then in rows of tiles, then Y down.
+        return self.tiles.data[int(layer)]
+
     def get_tile_idx(self, layer: MapLayer, x: int, y: int) -> int:
         """
         Gets the raw tileset tile (i.e., not normalised within bounds) for the specified tile.
         """
 
-        # serialised in three layers, bottom to top.
-        offset = int(layer) * self.tiles_per_layer
-        # serialised in rows of tiles, then Y down.
-        offset += self.width * y
-        offset += x
-
-        return self.tiles.raw_data[offset]
+        return int(self.tiles.data[int(layer), y, x])
 
 
 def load_map(map_path: Path) -> RpgMakerMap:
@@ -106,41 +112,69 @@ def load_map(map_path: Path) -> RpgMakerMap:
     )
 
 
+def draw_map(rpg_map: RpgMakerMap, atlas: TileAtlas) -> ImageKlass:
+    """
+    Draws an already loaded RPG Maker XP map using the provided atlas of its tileset.
+    """
+
+    image = Image.new(mode="RGBA", size=(rpg_map.width * 32, rpg_map.height * 32))
+
+    # layers are drawn bottom to top, each one blended over the ones below using its alpha.
+    for layer in MapLayer:
+        atlas.composite(image, atlas.indexes(rpg_map.layer_tiles(layer)))
+
+    return image
+
+
+def draw_map_strip(rpg_map: RpgMakerMap, atlases: Sequence[TileAtlas]) -> ImageKlass:
+    """
+    Draws an already loaded RPG Maker XP map once for every provided atlas (i.e. every animation
+    frame), left to right.
+    """
+
+    width = rpg_map.width * 32
+    strip = Image.new(mode="RGBA", size=(width * len(atlases), rpg_map.height * 32))
+
+    for frame, atlas in enumerate(atlases):
+        with draw_map(rpg_map, atlas) as image:
+            strip.paste(image, (width * frame, 0))
+
+    return strip
+
+
 def render_map(
     tilesets: AllTilesets,
     map_path: Path,
 ) -> ImageKlass:
     """
-    Renders an RPG Maker XP map to an image.
+    Renders an RPG Maker XP map to an image, with the first animation frame of any autotiles.
     """
 
     rpg_map = load_map(map_path)
     tileset = tilesets.tilesets[rpg_map.tileset_id]
     assert tileset
-    image = Image.new(mode="RGBA", size=(rpg_map.width * 32, rpg_map.height * 32))
 
-    for layer in (0, 1, 2):
-        layer = MapLayer(layer)
+    return draw_map(rpg_map, tileset.tile_atlas)
 
-        for xpos in range(rpg_map.width):
-            for ypos in range(rpg_map.height):
-                tile_idx = rpg_map.get_tile_idx(layer, xpos, ypos)
 
-                tile_image = tileset.get_tile_image(tile_idx)
-
-                if tile_image is None:
-                    continue
+def render_map_strip(
+    tilesets: AllTilesets,
+    map_path: Path,
+) -> ImageKlass | None:
+    """
+    Renders every animation frame of an RPG Maker XP map (i.e. of its animated autotiles) to a
+    single image, left to right. Returns None if the map isn't animated.
+    """
 
-                pasted_x = xpos * 32
-                pasted_y = ypos * 32
+    rpg_map = load_map(map_path)
+    tileset = tilesets.tilesets[rpg_map.tileset_id]
+    assert tileset
 
-                # PIL my behated
-                # use the tile image as the mask to correctly blend alpha for higher layers
-                image.paste(
-                    tile_image, (pasted_x, pasted_y, pasted_x + 32, pasted_y + 32), tile_image
-                )
+    frames = tileset.animation_frames
+    if frames <= 1:
+        return None
 
-    return image
+    return draw_map_strip(rpg_map, [tileset.animation_atlas(it) for it in range(frames)])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from collections.abc import Collection, Mapping
+from pathlib import Path
+
+import attr
+import numpy as np
+import numpy.typing as npt
+from typing_extensions import override
+
+from reborn_rebalance.map.compositor import TileAtlas
+from reborn_rebalance.map.tileset import AllTilesets
+
+# Tile atlases shared between map rendering processes. Decoding a tileset (and expanding its
+# autotiles) is the slowest part of rendering a map, and every worker would otherwise have to do
+# it again for every tileset it comes across.
+#
+# Instead, the parent process decodes every tileset once and saves the atlases as plain .npy
+# files, which the workers memory-map. The OS page cache then holds a single copy of each atlas
+# no matter how many workers are using it.
+
+
+@attr.s(frozen=True, kw_only=True)
+class SharedAtlases:
+    """
+    The atlases for every tileset, saved to a directory for memory-mapping from other processes.
+    """
+
+    #: The directory the atlases are saved in.
+    directory: Path = attr.ib()
+
+    #: The number of animation frames for each tileset ID.
+    animation_frames: Mapping[int, int] = attr.ib()
+
+    # loaded per process, so never pickled.
+    _atlases: dict[int, TileAtlas] = attr.ib(init=False, factory=dict, eq=False)
+    _autotiles: dict[int, npt.NDArray[np.uint8]] = attr.ib(init=False, factory=dict, eq=False)
+
+    @classmethod
+    def export(
+        cls,
+        tilesets: AllTilesets,
+        directory: Path,
+        *,
+        tileset_ids: Collection[int] | None = None,
+        animations: bool = False,
+    ) -> SharedAtlases:
+        """
+        Decodes every tileset and saves their atlases into the provided directory.
+
+        :param tileset_ids: If provided, only the tilesets with these IDs are saved.
+        :param animations: If True, the autotile patterns for every animation frame are saved
+                           too, for :meth:`.atlas` with frames other than the first.
+        """
+
+        frames: dict[int, int] = {}
+
+        for tileset in tilesets.tilesets:
+            if tileset is None:
+                continue
+
+            if tileset_ids is not None and tileset.numeric_id not in tileset_ids:
+                continue
+
+            path = directory / f"tileset_{tileset.numeric_id}"
+            tileset.tile_atlas.save(path)
+            frames[tileset.numeric_id] = tileset.animation_frames
+
+            if animations and tileset.animation_frames > 1:
+                patterns = np.stack(
+                    [tileset.autotile_frame(it) for it in range(tileset.animation_frames)]
+                )
+                np.save(path.with_suffix(".autotiles.npy"), patterns)
+
+            # the decoded atlas now lives on disk, no point keeping it (and the image) around.
+            tileset.close()
+
+        return cls(directory=directory, animation_frames=frames)
+
+    @override
+    def __getstate__(self):
+        return {"directory": self.directory, "animation_frames": self.animation_frames}
+
+    def __setstate__(self, state: dict[str, object]):
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+
+        object.__setattr__(self, "_atlases", {})
+        object.__setattr__(self, "_autotiles", {})
+
+    def atlas(self, tileset_id: int, frame: int = 0) -> TileAtlas:
+        """
+        Gets the atlas for the provided tileset ID and animation frame of its autotiles.
+        """
+
+        try:
+            atlas = self._atlases[tileset_id]
+        except KeyError:
+            atlas = TileAtlas.load(self.directory / f"tileset_{tileset_id}")
+            self._atlases[tileset_id] = atlas
+
+        frame %= self.animation_frames[tileset_id]
+        if frame == 0:
+            return atlas
+
+        try:
+            patterns = self._autotiles[tileset_id]
+        except KeyError:
+            path = (self.directory / f"tileset_{tileset_id}").with_suffix(".autotiles.npy")
+            patterns = np.load(path, mmap_mode="r")
+            self._autotiles[tileset_id] = patterns
+
+        return atlas.with_autotiles(patterns[frame])
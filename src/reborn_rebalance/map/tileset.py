@@ -1,14 +1,25 @@
+import hashlib
+import math
 import traceback
-from collections.abc import Mapping
+from collections.abc import Iterable, Mapping
 from functools import cached_property
 from pathlib import Path
 from types import MappingProxyType
 
 import attr
+import numpy as np
+import numpy.typing as npt
 from PIL import Image
 from PIL.Image import Image as ImageKlass
 from rubymarshal.classes import RubyObject, RubyString
 
+from reborn_rebalance.map.compositor import (
+    AUTOTILE_COUNT,
+    AUTOTILE_PATTERNS,
+    TILE_SIZE,
+    TileAtlas,
+    expand_autotile,
+)
 from reborn_rebalance.scripts.unmarshal import RgssTable, unmarshal
 
 #: The number of *extra tiles* in this tileset. These are the tiles corresponding to the
@@ -33,6 +44,10 @@ class RpgMakerTileset:
 
         return name.decode(encoding="utf-8")  # type: ignore
 
+    @staticmethod
+    def _decode_autotiles(names: Iterable[bytes | str]) -> tuple[str, ...]:
+        return tuple(RpgMakerTileset._decode_tileset(it) for it in names)
+
     #: The numeric ID for this tileset.
     numeric_id: int = attr.ib()
 
@@ -42,24 +57,105 @@ class RpgMakerTileset:
     #: The *filename* of this tileset, e.g. ``Outskirts``.
     filename: str = attr.ib(converter=_decode_tileset)
 
-    #: The terrain tags for this tileset.
-    raw_terrain_tags: list[int] = attr.ib()
+    #: The terrain tags for this tileset, one per tile (including the autotiles).
+    raw_terrain_tags: npt.NDArray[np.uint16] = attr.ib(eq=False)
+
+    #: The *filenames* of the autotiles for this tileset. Unused autotiles are empty.
+    autotile_names: tuple[str, ...] = attr.ib(default=(), converter=_decode_autotiles)
+
+    #: The path to the image file for this tileset, once found.
+    image_path: Path | None = attr.ib(init=False, default=None)
+
+    #: The paths to the image files for each autotile, once found. Missing autotiles are None.
+    autotile_paths: tuple[Path | None, ...] = attr.ib(init=False, default=())
 
     #: The list of tile images for this tileset.
     tileset_image: ImageKlass = attr.ib(init=False, default=None)
 
+    #: The autotile images for this tileset, as RGBA arrays. Missing autotiles are None.
+    autotile_images: tuple[npt.NDArray[np.uint8] | None, ...] = attr.ib(
+        init=False, default=(), eq=False
+    )
+
     _tileset_cache: dict[int, ImageKlass] = attr.ib(init=False, factory=dict)
 
-    def load_image(self, tilesets_path: Path):
+    def find_images(self, tilesets_path: Path, autotiles_path: Path):
+        """
+        Finds the image files for this tileset and its autotiles, without loading them. Raises
+        :class:`FileNotFoundError` if the tileset image doesn't exist.
+        """
+
         image_path = (tilesets_path / self.filename).with_suffix(".png")
         if not image_path.exists():
             # fucking windows
             image_path = image_path.with_suffix(".PNG")
 
+        if not image_path.exists():
+            raise FileNotFoundError(image_path)
+
+        autotile_paths: list[Path | None] = []
+        for name in self.autotile_names[:AUTOTILE_COUNT]:
+            if not name:
+                autotile_paths.append(None)
+                continue
+
+            autotile_path = (autotiles_path / name).with_suffix(".png")
+            if not autotile_path.exists():
+                autotile_path = autotile_path.with_suffix(".PNG")
+
+            if not autotile_path.exists():
+                print(f"couldn't find autotile {name} for tileset {self.numeric_id} {self.name}")
+                autotile_paths.append(None)
+            else:
+                autotile_paths.append(autotile_path)
+
         # lol!
-        object.__setattr__(self, "tileset_image", Image.open(image_path))
+        object.__setattr__(self, "image_path", image_path)
+        object.__setattr__(self, "autotile_paths", tuple(autotile_paths))
+
+    def load_images(self):
+        """
+        Loads the tileset image and the autotile images, if they aren't already loaded. Anything
+        that needs the images calls this itself.
+        """
+
+        if self.tileset_image is not None:
+            return
+
+        assert self.image_path is not None, "tileset images haven't been found"
+
+        object.__setattr__(self, "tileset_image", Image.open(self.image_path))
         self.tileset_image.load()
 
+        images: list[npt.NDArray[np.uint8] | None] = []
+        for path in self.autotile_paths:
+            if path is None:
+                images.append(None)
+                continue
+
+            with Image.open(path) as image:
+                images.append(np.asarray(image.convert("RGBA")))
+
+        object.__setattr__(self, "autotile_images", tuple(images))
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """
+        The SHA-256 of the tileset image file and every autotile image file, for telling when
+        anything rendered with this tileset is out of date. Doesn't need the images to be loaded.
+        """
+
+        assert self.image_path is not None, "tileset images haven't been found"
+
+        hasher = hashlib.sha256(self.image_path.read_bytes())
+        for path in self.autotile_paths:
+            # the separator keeps a missing autotile from looking like an empty one.
+            hasher.update(b"\0")
+            if path is not None:
+                hasher.update(path.read_bytes())
+
+        return hasher.hexdigest()
+
     @property
     def tile_count(self) -> int:
         """
@@ -69,8 +165,108 @@ class RpgMakerTileset:
         return len(self.raw_terrain_tags) - 384
 
     def close(self):
-        self.tileset_image.close()
+        if self.tileset_image is not None:
+            self.tileset_image.close()
+
         self._tileset_cache.clear()
+        object.__setattr__(self, "tileset_image", None)
+        object.__setattr__(self, "autotile_images", ())
+
+        for name in ("tile_atlas", "autotile_patterns"):
+            self.__dict__.pop(name, None)
+
+    @cached_property
+    def autotile_patterns(self) -> tuple[npt.NDArray[np.uint8] | None, ...]:
+        """
+        Every pattern of every autotile in this tileset, as ``(frames, 48, 32, 32, 4)`` arrays.
+        Missing autotiles are None.
+        """
+
+        self.load_images()
+        return tuple(
+            expand_autotile(image) if image is not None else None for image in self.autotile_images
+        )
+
+    @property
+    def animation_frames(self) -> int:
+        """
+        The number of animation frames before every autotile in this tileset loops back around.
+        """
+
+        frames = 1
+        for patterns in self.autotile_patterns:
+            if patterns is not None:
+                frames = math.lcm(frames, len(patterns))
+
+        return frames
+
+    def autotile_frame(self, frame: int) -> npt.NDArray[np.uint8]:
+        """
+        Gets the patterns of every autotile for the provided animation frame, as a
+        ``(7, 48, 32, 32, 4)`` array. Missing autotiles are transparent.
+        """
+
+        frame_patterns = np.zeros(
+            (AUTOTILE_COUNT, AUTOTILE_PATTERNS, TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8
+        )
+
+        # each autotile loops on its own.
+        for idx, patterns in enumerate(self.autotile_patterns[:AUTOTILE_COUNT]):
+            if patterns is not None:
+                frame_patterns[idx] = patterns[frame % len(patterns)]
+
+        return frame_patterns
+
+    def animation_atlas(self, frame: int) -> TileAtlas:
+        """
+        Gets the atlas of 32x32 RGBA tiles for the provided animation frame of the autotiles.
+        """
+
+        if frame % self.animation_frames == 0:
+            return self.tile_atlas
+
+        return self.tile_atlas.with_autotiles(list(self.autotile_frame(frame)))
+
+    @cached_property
+    def tile_atlas(self) -> TileAtlas:
+        """
+        The tileset image and the first frame of its autotiles cut into an atlas of 32x32 RGBA
+        tiles.
+        """
+
+        self.load_images()
+        return TileAtlas.from_image(
+            np.asarray(self.tileset_image.convert("RGBA")), list(self.autotile_frame(0))
+        )
+
+    def atlas_indexes(self, tiles: npt.NDArray[np.integer]) -> npt.NDArray[np.intp]:
+        """
+        Converts an array of raw tileset IDs into entries in :attr:`.tile_atlas`.
+        """
+
+        return self.tile_atlas.indexes(tiles)
+
+    def autotile_strip(self, autotile: int) -> ImageKlass | None:
+        """
+        Gets every pattern of the provided autotile (0-6) as a single image, with one 8x6 grid of
+        patterns (in tile ID order) per animation frame, left to right. Returns None if the
+        autotile is missing.
+        """
+
+        if autotile >= len(self.autotile_patterns):
+            return None
+
+        patterns = self.autotile_patterns[autotile]
+        if patterns is None:
+            return None
+
+        frames = len(patterns)
+        grid = (
+            patterns.reshape(frames, 6, 8, TILE_SIZE, TILE_SIZE, 4)
+            .transpose(1, 3, 0, 2, 4, 5)
+            .reshape(6 * TILE_SIZE, frames * 8 * TILE_SIZE, 4)
+        )
+        return Image.fromarray(grid)
 
     def get_tile_image(self, index: int) -> ImageKlass | None:
         """
@@ -78,17 +274,18 @@ class RpgMakerTileset:
         """
 
         # extremely un-process safe.
-        # todo: autotile handling
-        if index >= 384:
-            index -= 384
-        else:
-            return None
-
         try:
             return self._tileset_cache[index]
         except KeyError:
             pass
 
+        self.load_images()
+
+        if index < EXTRA_TILE_COUNT:
+            return self._get_autotile_image(index)
+
+        index -= EXTRA_TILE_COUNT
+
         # tilesets are 32x32, 8 tiles wide, unlimited verticality.
         col = index // 8
         row = index % 8
@@ -97,9 +294,23 @@ class RpgMakerTileset:
         row_pos = row * 32
 
         cropped = self.tileset_image.crop((row_pos, col_pos, row_pos + 32, col_pos + 32))
-        self._tileset_cache[index] = cropped
+        self._tileset_cache[index + EXTRA_TILE_COUNT] = cropped
         return cropped
 
+    def _get_autotile_image(self, index: int) -> ImageKlass | None:
+        # the first 48 IDs are nothing, then it's 48 patterns per autotile.
+        autotile, pattern = divmod(index, AUTOTILE_PATTERNS)
+        if autotile == 0 or autotile > len(self.autotile_patterns):
+            return None
+
+        patterns = self.autotile_patterns[autotile - 1]
+        if patterns is None:
+            return None
+
+        image = Image.fromarray(patterns[0, pattern])
+        self._tileset_cache[index] = image
+        return image
+
 
 @attr.s(kw_only=True)
 class AllTilesets:
@@ -119,15 +330,17 @@ class AllTilesets:
         return MappingProxyType({it.name: it for it in self.tilesets if it is not None})
 
 
-def load_all_tilesets(root_game_path: Path) -> AllTilesets:
+def load_all_tilesets(root_game_path: Path, *, load_images: bool = True) -> AllTilesets:
     """
     Loads tileset data from the provided root game path (i.e. the one with the ``mkxp-z``
     executable.)
-    """
 
-    # TODO: figure out how the fuck to load auto tiles so there's not massive holes
+    :param load_images: If False, the images are only found, and need loading with
+                        :meth:`.RpgMakerTileset.load_images` before they're used.
+    """
 
     images_path = root_game_path / "Graphics" / "Tilesets"
+    autotiles_path = root_game_path / "Graphics" / "Autotiles"
 
     try:
         tilesets_path = root_game_path / "Data" / "tilesets.rxdata"
@@ -151,19 +364,27 @@ def load_all_tilesets(root_game_path: Path) -> AllTilesets:
             continue
 
         terrain_tags_tbl: RgssTable = subobject.attributes["@terrain_tags"]
-        terrain_tags = terrain_tags_tbl.raw_data
+        terrain_tags = terrain_tags_tbl.flat
 
         assert len(terrain_tags) == terrain_tags_tbl.x, "unexpectedly 2d tileset"
 
         tileset = RpgMakerTileset(
-            numeric_id=id, name=name, filename=tileset_name, raw_terrain_tags=terrain_tags
+            numeric_id=id,
+            name=name,
+            filename=tileset_name,
+            raw_terrain_tags=terrain_tags,
+            autotile_names=subobject.attributes.get("@autotile_names") or (),
         )
         try:
-            tileset.load_image(images_path)
+            tileset.find_images(images_path, autotiles_path)
         except FileNotFoundError:
             print(f"couldn't load tileset {id} {name}")
             traceback.print_exc()
-        else:
-            tilesets[tileset.numeric_id] = tileset
+            continue
+
+        if load_images:
+            tileset.load_images()
+
+        tilesets[tileset.numeric_id] = tileset
 
     return AllTilesets(tilesets=tilesets)
@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any
+
+import attr
+
+from reborn_rebalance.pbs.cache import default_cache_dir
+
+# Skipping unchanged output files. Both build-web and into-pbs write thousands of files that are
+# almost always identical to the last build, and rewriting them anyway bumps their mtimes, which
+# makes rsync/CDN deploys re-upload everything and makes the game think the PBS files need
+# recompiling.
+#
+# The manifest records the content hash of every file written to an output directory, along with
+# the size and mtime it had afterwards. A file is only written if its new content hashes
+# differently, or if the file on disk doesn't match the manifest anymore (i.e. something else
+# touched it). Checking the latter only needs a stat, so a no-op build never reads its old output.
+#
+# Entries can also have a "source" hash for whatever the file was generated from (a page's view
+# model, or the stamp of a copied file), so that generating the content can be skipped entirely.
+
+#: The version of the manifest format. Bump this if the entries change.
+MANIFEST_VERSION = 1
+
+
+@attr.s(slots=True, kw_only=True)
+class OutputEntry:
+    """
+    The recorded state of a single output file.
+    """
+
+    #: The SHA-256 of the file's content.
+    hash: str = attr.ib()
+
+    #: The size of the file when it was written.
+    size: int = attr.ib()
+
+    #: The mtime of the file when it was written, in nanoseconds.
+    mtime_ns: int = attr.ib()
+
+    #: The hash of whatever the file was generated from, if any.
+    source: str | None = attr.ib(default=None)
+
+    def matches(self, stat: os.stat_result) -> bool:
+        """
+        Checks if the provided stat result matches this entry, i.e. the file hasn't been changed
+        since it was written.
+        """
+
+        return stat.st_size == self.size and stat.st_mtime_ns == self.mtime_ns
+
+
+def _stamp(stat: os.stat_result) -> str:
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class OutputManifest:
+    """
+    Writes files into an output directory, skipping any whose content hasn't changed since the
+    last build.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        manifest_path: Path | None,
+        entries: dict[str, OutputEntry] | None = None,
+    ):
+        self.output_dir = output_dir
+
+        #: Where this manifest is saved to. If None, everything is always written and nothing is
+        #: saved.
+        self.manifest_path = manifest_path
+
+        self._entries: dict[str, OutputEntry] = entries or {}
+        self._updated: dict[str, OutputEntry | None] = {}
+
+        #: The number of files written, and the number skipped because they were unchanged.
+        self.written = 0
+        self.skipped = 0
+
+    @classmethod
+    def load(
+        cls, output_dir: Path, cache_dir: Path | None = None, *, enabled: bool = True
+    ) -> OutputManifest:
+        """
+        Loads the manifest for the provided output directory from the cache directory (defaulting
+        to ``.cache`` in the working directory).
+
+        :param enabled: If False, every file is always written and the manifest is never saved.
+        """
+
+        if not enabled:
+            return cls(output_dir, None)
+
+        output_key = hashlib.sha256(str(output_dir.absolute()).encode("utf-8")).hexdigest()
+        manifest_path = (cache_dir or default_cache_dir()) / "output" / f"{output_key[:16]}.json"
+
+        try:
+            raw = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(output_dir, manifest_path)
+
+        if raw.get("version") != MANIFEST_VERSION:
+            return cls(output_dir, manifest_path)
+
+        entries = {
+            key: OutputEntry(hash=hash, size=size, mtime_ns=mtime_ns, source=source)
+            for key, (hash, size, mtime_ns, source) in raw["entries"].items()
+        }
+        return cls(output_dir, manifest_path, entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.manifest_path is not None
+
+    def _key(self, path: Path) -> str:
+        return path.absolute().relative_to(self.output_dir.absolute()).as_posix()
+
+    def _current_entry(self, path: Path) -> OutputEntry | None:
+        # the entry for the provided path, if the file on disk still matches it.
+        if not self.enabled or (entry := self._entries.get(self._key(path))) is None:
+            return None
+
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+
+        return entry if entry.matches(stat) else None
+
+    def _record(self, path: Path, hash: str, source: str | None):
+        if not self.enabled:
+            return
+
+        stat = path.stat()
+        entry = OutputEntry(hash=hash, size=stat.st_size, mtime_ns=stat.st_mtime_ns, source=source)
+        key = self._key(path)
+        self._entries[key] = entry
+        self._updated[key] = entry
+
+    def is_unchanged(self, path: Path, source: str) -> bool:
+        """
+        Checks if the provided file was generated from the same source last time, and hasn't been
+        changed since.
+        """
+
+        entry = self._current_entry(path)
+        return entry is not None and entry.source == source
+
+    def set_source(self, path: Path, source: str):
+        """
+        Sets the source hash for a file that was just written.
+        """
+
+        if (entry := self._entries.get(self._key(path))) is not None:
+            entry.source = source
+            self._updated[self._key(path)] = entry
+
+    def write_bytes(self, path: Path, data: bytes, source: str | None = None) -> bool:
+        """
+        Writes the provided data to the provided path, unless the file already has that content.
+
+        :return: True if the file was written.
+        """
+
+        hash = hashlib.sha256(data).hexdigest()
+        entry = self._current_entry(path)
+
+        if entry is not None and entry.hash == hash:
+            self.skipped += 1
+
+            if source is not None and entry.source != source:
+                entry.source = source
+                self._updated[self._key(path)] = entry
+
+            return False
+
+        # write to a temporary file first, so a crash never leaves a half-written file that the
+        # manifest thinks is fine.
+        temp_path = path.with_name(f".{path.name}.tmp")
+        temp_path.write_bytes(data)
+        temp_path.replace(path)
+
+        self.written += 1
+        self._record(path, hash, source)
+        return True
+
+    def write_text(self, path: Path, text: str, source: str | None = None) -> bool:
+        """
+        Like :meth:`.write_bytes`, but for UTF-8 text.
+        """
+
+        return self.write_bytes(path, text.encode("utf-8"), source)
+
+    def replace_with(self, staged: Path, path: Path) -> bool:
+        """
+        Moves the provided staged file over the provided path, unless the path already has the
+        same content, in which case the staged file is deleted.
+
+        :return: True if the file was replaced.
+        """
+
+        hash = hashlib.sha256(staged.read_bytes()).hexdigest()
+        entry = self._current_entry(path)
+
+        if entry is not None and entry.hash == hash:
+            staged.unlink()
+            self.skipped += 1
+            return False
+
+        os.replace(staged, path)
+        self.written += 1
+        self._record(path, hash, None)
+        return True
+
+    def copy_file(self, source: Path, path: Path) -> bool:
+        """
+        Copies the provided file to the provided path, unless the source file is unchanged since
+        it was last copied.
+
+        :return: True if the file was written.
+        """
+
+        stamp = _stamp(source.stat())
+        if self.is_unchanged(path, stamp):
+            self.skipped += 1
+            return False
+
+        if not self.enabled:
+            shutil.copy2(source, path)
+            self.written += 1
+            return True
+
+        return self.write_bytes(path, source.read_bytes(), stamp)
+
+    def copy_tree(self, source_dir: Path, output_dir: Path):
+        """
+        Copies every file in the provided directory into the provided output directory, like
+        :func:`shutil.copytree` with ``dirs_exist_ok``, skipping unchanged files.
+        """
+
+        for dirpath, _, filenames in os.walk(source_dir):
+            relative = Path(dirpath).relative_to(source_dir)
+            (output_dir / relative).mkdir(parents=True, exist_ok=True)
+
+            for filename in filenames:
+                self.copy_file(Path(dirpath) / filename, output_dir / relative / filename)
+
+    def remove(self, path: Path):
+        """
+        Deletes the provided file, if it exists.
+        """
+
+        path.unlink(missing_ok=True)
+
+        if self.enabled and self._entries.pop(self._key(path), None) is not None:
+            self._updated[self._key(path)] = None
+
+    def take_updates(self) -> tuple[dict[str, tuple[Any, ...] | None], int, int]:
+        """
+        Gets (and forgets) every entry changed since the last call, along with the written and
+        skipped counts, for sending back from a worker process to be merged with :meth:`.merge`.
+        """
+
+        updates = (
+            {
+                key: attr.astuple(entry) if entry is not None else None
+                for key, entry in self._updated.items()
+            },
+            self.written,
+            self.skipped,
+        )
+
+        self._updated = {}
+        self.written = self.skipped = 0
+        return updates
+
+    def merge(self, updates: tuple[dict[str, tuple[Any, ...] | None], int, int]):
+        """
+        Merges the updates from another copy of this manifest, e.g. one in a worker process.
+        """
+
+        entries, written, skipped = updates
+        self.written += written
+        self.skipped += skipped
+
+        for key, value in entries.items():
+            if value is None:
+                self._entries.pop(key, None)
+            else:
+                hash, size, mtime_ns, source = value
+                self._entries[key] = OutputEntry(
+                    hash=hash, size=size, mtime_ns=mtime_ns, source=source
+                )
+
+    def save(self):
+        """
+        Saves this manifest to the cache directory.
+        """
+
+        if self.manifest_path is None:
+            return
+
+        raw = {
+            "version": MANIFEST_VERSION,
+            "entries": {key: attr.astuple(entry) for key, entry in self._entries.items()},
+        }
+
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.manifest_path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(raw, separators=(",", ":")), encoding="utf-8")
+        temp_path.replace(self.manifest_path)
+
+    def summary(self) -> str:
+        return f"{self.written} file(s) written, {self.skipped} unchanged"
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import attr
+
+if TYPE_CHECKING:
+    from reborn_rebalance.pbs.catalog import EssentialsCatalog
+
+# The snapshot cache. Loading the catalog from TOML means parsing ~2,500 files and then pushing
+# every single one of them through cattrs, which is *slow*. Nearly every run has the same input
+# data as the previous one, so we just pickle the finished (sorted + validated) catalog and reuse
+# it for as long as none of the input files have changed.
+#
+# The snapshot file is two pickles back to back: a small header containing the file manifest, then
+# the actual catalog data. This means checking if the snapshot is stale doesn't need to unpickle
+# the (much larger) catalog.
+
+#: Bump this whenever the snapshot layout changes.
+SNAPSHOT_VERSION = 2
+
+#: The name of the directory inside the cache directory that holds the snapshots, one per data
+#: directory.
+SNAPSHOT_DIRECTORY = "catalog"
+
+#: The single-file TOML inputs in the data directory.
+FLAT_DATA_FILES = (
+    "moves.toml",
+    "items.toml",
+    "tms.toml",
+    "abilities.toml",
+    "maps.toml",
+    "trainer_types.toml",
+)
+
+
+def default_cache_dir() -> Path:
+    """
+    Gets the default cache directory. Like the sprite cache, this lives in the working directory.
+    """
+
+    return Path.cwd() / ".cache"
+
+
+def user_cache_dir() -> Path:
+    """
+    Gets the per-user cache directory for this package, for things that only depend on the
+    installed code rather than on the data being worked on.
+    """
+
+    if (local := os.environ.get("LOCALAPPDATA")) is not None:
+        return Path(local) / "reborn-rebalance"
+
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    return (Path(xdg) if xdg else Path.home() / ".cache") / "reborn-rebalance"
+
+
+def catalog_input_files(path: Path) -> list[Path]:
+    """
+    Gets every file in the provided ``data`` directory that
+    :meth:`.EssentialsCatalog.load_from_toml` reads, in a stable order.
+    """
+
+    files = [path / name for name in FLAT_DATA_FILES]
+
+    # species files are read regardless of extension, so mirror that here.
+    files.extend(sorted(f for f in (path / "species").rglob("*") if not f.is_dir()))
+
+    for subdir in ("forms", "encounters", "trainers"):
+        files.extend(sorted((path / subdir).rglob("*.toml")))
+
+    return files
+
+
+def _hash_file(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def code_fingerprint() -> str:
+    """
+    Hashes the source of the ``pbs`` package, so that changes to the data classes (which would make
+    old pickles structurally wrong) invalidate the snapshot.
+    """
+
+    hasher = hashlib.sha256()
+
+    for source in sorted(Path(__file__).parent.rglob("*.py")):
+        hasher.update(source.name.encode("utf-8"))
+        hasher.update(source.read_bytes())
+
+    return hasher.hexdigest()
+
+
+@attr.s(frozen=True, slots=True, kw_only=True)
+class FileStamp:
+    """
+    The recorded state of a single input file.
+    """
+
+    #: The modification time of this file, in nanoseconds.
+    mtime_ns: int = attr.ib()
+
+    #: The size of this file, in bytes.
+    size: int = attr.ib()
+
+    #: The SHA-256 hash of the contents of this file.
+    digest: str = attr.ib()
+
+    @classmethod
+    def for_path(cls, path: Path, stat: os.stat_result | None = None) -> FileStamp:
+        """
+        Stamps the provided file.
+        """
+
+        stat = stat or path.stat()
+        return cls(mtime_ns=stat.st_mtime_ns, size=stat.st_size, digest=_hash_file(path))
+
+
+@attr.s(slots=True, kw_only=True)
+class DataManifest:
+    """
+    A manifest of {relative path: stamp} for every input file in a data directory.
+    """
+
+    #: The mapping of POSIX-style path (relative to the data directory) to the file stamp.
+    files: dict[str, FileStamp] = attr.ib(factory=dict)
+
+    @classmethod
+    def build(cls, path: Path, files: Iterable[Path] | None = None) -> DataManifest:
+        """
+        Builds a brand new manifest for the provided data directory, hashing every file.
+        """
+
+        if files is None:
+            files = catalog_input_files(path)
+
+        return cls(files={f.relative_to(path).as_posix(): FileStamp.for_path(f) for f in files})
+
+    def changed_files(self, path: Path) -> tuple[set[str], DataManifest]:
+        """
+        Compares this manifest against the current state of the provided data directory.
+
+        Files are first compared by modification time and size; only files that differ there get
+        hashed. This means that merely touching a file (e.g. via a ``git checkout``) won't cause a
+        reload.
+
+        :return: A tuple of (changed relative paths, refreshed manifest). Changed paths include
+                 added and removed files.
+        """
+
+        changed: set[str] = set()
+        refreshed: dict[str, FileStamp] = {}
+
+        for file in catalog_input_files(path):
+            key = file.relative_to(path).as_posix()
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                # deleted between listing and stat-ing it, so it'll be picked up as a deletion.
+                continue
+
+            previous = self.files.get(key)
+
+            if previous is None:
+                changed.add(key)
+                refreshed[key] = FileStamp.for_path(file, stat)
+                continue
+
+            if previous.mtime_ns == stat.st_mtime_ns and previous.size == stat.st_size:
+                refreshed[key] = previous
+                continue
+
+            stamp = FileStamp.for_path(file, stat)
+            refreshed[key] = stamp
+
+            if stamp.digest != previous.digest:
+                changed.add(key)
+
+        # anything left over in the old manifest has been deleted.
+        changed.update(self.files.keys() - refreshed.keys())
+
+        return changed, DataManifest(files=refreshed)
+
+
+@attr.s(frozen=True, slots=True, kw_only=True)
+class SnapshotHeader:
+    """
+    The header of a snapshot file, used to check if it's still usable.
+    """
+
+    #: The snapshot layout version. See :data:`.SNAPSHOT_VERSION`.
+    version: int = attr.ib()
+
+    #: The fingerprint of the code that created this snapshot.
+    code_fingerprint: str = attr.ib()
+
+    #: The resolved path of the data directory this snapshot was built from.
+    data_dir: str = attr.ib()
+
+    #: The manifest of input files this snapshot was built from.
+    manifest: DataManifest = attr.ib()
+
+
+class CatalogSnapshotCache:
+    """
+    Reads and writes the catalog snapshot for a single data directory from a cache directory.
+
+    Every data directory gets its own snapshot (keyed on its resolved path), so that switching
+    between data directories doesn't throw away the snapshot for the other one, or worse, patch
+    it with the wrong files.
+    """
+
+    def __init__(self, cache_dir: Path, data_dir: Path):
+        self.cache_dir = cache_dir
+        self.data_dir = data_dir.resolve()
+
+        key = hashlib.sha256(str(self.data_dir).encode("utf-8")).hexdigest()
+        self.snapshot_path = cache_dir / SNAPSHOT_DIRECTORY / f"{key[:16]}.snapshot"
+
+    def read_header(self) -> SnapshotHeader | None:
+        """
+        Reads the header of the current snapshot, or returns None if there's no usable snapshot.
+        """
+
+        try:
+            with self.snapshot_path.open(mode="rb") as f:
+                header = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"warning: ignoring unreadable catalog snapshot ({e!r})")
+            return None
+
+        if not isinstance(header, SnapshotHeader):
+            return None
+
+        if header.version != SNAPSHOT_VERSION:
+            return None
+
+        if header.code_fingerprint != code_fingerprint():
+            return None
+
+        # in case of a hash collision.
+        if header.data_dir != str(self.data_dir):
+            return None
+
+        return header
+
+    def load(self) -> tuple[dict[str, Any], DataManifest, set[str]] | None:
+        """
+        Loads the catalog fields from the snapshot, along with the set of input files that have
+        changed since it was written.
+
+        :return: A tuple of (catalog fields, refreshed manifest, changed relative paths), or None
+                 if there's no usable snapshot.
+        """
+
+        header = self.read_header()
+        if header is None:
+            return None
+
+        changed, manifest = header.manifest.changed_files(self.data_dir)
+        if changed:
+            print(f"Catalog snapshot is stale ({len(changed)} changed file(s))")
+
+        with self.snapshot_path.open(mode="rb") as f:
+            pickle.load(f)  # skip the header
+            fields: dict[str, Any] = pickle.load(f)
+
+        # if only mtimes changed, write the new stamps so we don't rehash next time.
+        if not changed and manifest != header.manifest:
+            self.save_fields(fields, manifest)
+
+        return fields, manifest, changed
+
+    def save_fields(self, fields: dict[str, Any], manifest: DataManifest):
+        """
+        Writes the provided catalog fields to the snapshot file.
+        """
+
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        header = SnapshotHeader(
+            version=SNAPSHOT_VERSION,
+            code_fingerprint=code_fingerprint(),
+            data_dir=str(self.data_dir),
+            manifest=manifest,
+        )
+
+        # write then rename, so a crash or a concurrent run never sees a half-written snapshot.
+        temp_path = self.snapshot_path.with_suffix(f".tmp{os.getpid()}")
+        with temp_path.open(mode="wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(fields, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        temp_path.replace(self.snapshot_path)
+
+    def save(self, catalog: EssentialsCatalog, manifest: DataManifest):
+        """
+        Writes a snapshot of the provided catalog.
+
+        The manifest should be built *before* loading the catalog, so that any files edited
+        mid-load make the snapshot stale rather than silently recording the new hash.
+        """
+
+        self.save_fields(snapshot_fields(catalog), manifest)
+
+
+def snapshot_fields(catalog: EssentialsCatalog) -> dict[str, Any]:
+    """
+    Gets the constructor fields of the provided catalog. Cached properties are not included.
+    """
+
+    return {field.name: getattr(catalog, field.name) for field in attr.fields(type(catalog))}
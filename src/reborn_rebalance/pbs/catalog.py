@@ -1,30 +1,47 @@
 import concurrent.futures
+import os
+import tempfile
 import time
 import types
-from collections import defaultdict
-from collections.abc import Callable, Mapping, MutableMapping
+from collections.abc import Callable, Collection, Iterable, Mapping
 from functools import cached_property, partial
 from pathlib import Path
-from typing import Self, TypeVar
+from typing import Any, Self
 
 import attr
 
+from reborn_rebalance import tracing
+from reborn_rebalance.output import OutputManifest
 from reborn_rebalance.pbs.ability import PokemonAbility
-from reborn_rebalance.pbs.encounters import ENCOUNTER_SLOTS, MapEncounters
+from reborn_rebalance.pbs.cache import CatalogSnapshotCache, DataManifest, default_cache_dir
+from reborn_rebalance.pbs.encounter_index import EncounterIndex, ExpandedEncounterEntry
+from reborn_rebalance.pbs.encounters import MapEncounters
 from reborn_rebalance.pbs.form import PokemonForms, save_forms_to_ruby
 from reborn_rebalance.pbs.item import PokemonItem
+from reborn_rebalance.pbs.lazy import (
+    LazyFormsMapping,
+    LazyPreEvolutionMapping,
+    LazySpeciesList,
+    LazySpeciesMapping,
+    scan_form_name,
+)
+from reborn_rebalance.pbs.learners import MoveLearnerIndex
+from reborn_rebalance.pbs.loading import load_catalog_fields, print_phase_timings
+from reborn_rebalance.pbs.lookup import LookupIndex
 from reborn_rebalance.pbs.map import MapMetadata, parse_rpg_maker_mapinfo
 from reborn_rebalance.pbs.move import (
     MoveMappingEntry,
-    MoveMappingEntryType,
     PokemonMove,
 )
+from reborn_rebalance.pbs.pack import PackReader
 from reborn_rebalance.pbs.pokemon import (
     FormAttributes,
     PokemonEvolution,
     PokemonSpecies,
 )
 from reborn_rebalance.pbs.serialisation import (
+    encounter_toml_files,
+    form_toml_files,
     load_abilities_from_pbs,
     load_abilities_from_toml,
     load_all_forms,
@@ -38,6 +55,10 @@ from reborn_rebalance.pbs.serialisation import (
     load_map_metadata_from_toml,
     load_moves_from_pbs,
     load_moves_from_toml,
+    load_single_encounter,
+    load_single_form,
+    load_single_species_toml,
+    load_single_trainer_file_toml,
     load_tms_from_pbs,
     load_tms_from_toml,
     load_trainer_types_from_pbs,
@@ -62,27 +83,42 @@ from reborn_rebalance.pbs.serialisation import (
     save_trainer_types_to_toml,
     save_trainers_to_pbs,
     save_trainers_to_toml,
+    trainer_toml_files,
 )
+from reborn_rebalance.pbs.stats import StatTable
 from reborn_rebalance.pbs.tm import TechnicalMachine, tm_number_for
 from reborn_rebalance.pbs.trainer import TrainerCatalog, TrainerType
 
-LoadWithPrintT = TypeVar("LoadWithPrintT")
-
-
-def load_with_print(type_: str, fn: Callable[[], LoadWithPrintT]) -> LoadWithPrintT:
-    """
-    Loads the provided object, printing the time taken.
-    """
-
-    start = time.perf_counter()
-    print(f"LOAD: {type_}...")
-
-    result = fn()
-
-    end = time.perf_counter()
-    print(f"Loaded {type_} in {end - start:.2f}s")
-
-    return result
+#: The mapping of {single-file TOML input: (catalog field, loader function)}.
+FLAT_FILE_LOADERS: dict[str, tuple[str, Callable[[Path], Any]]] = {
+    "moves.toml": ("moves", load_moves_from_toml),
+    "items.toml": ("items", load_items_from_toml),
+    "tms.toml": ("tms", load_tms_from_toml),
+    "abilities.toml": ("abilities", load_abilities_from_toml),
+    "maps.toml": ("maps", load_map_metadata_from_toml),
+    "trainer_types.toml": ("trainer_types", load_trainer_types_from_toml),
+}
+
+#: The mapping of {catalog field: cached properties derived from that field}. Used to invalidate
+#: only the indexes that are affected by a reload.
+CACHED_PROPERTY_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+    "species": ("species_mapping", "tutor_moves", "pre_evolutionary_cache", "stat_table"),
+    "forms": ("stat_table",),
+    "moves": ("move_index", "move_mapping"),
+    "items": ("item_index", "item_mapping"),
+    # re-sorting the TMs changes the order of every learnset, so the learner index is rebuilt.
+    "tms": ("regular_tm_mapping", "tm_name_mapping", "move_learners"),
+    "abilities": ("ability_index", "ability_name_mapping"),
+    "maps": (),
+    # the encounter index is patched in place for just the changed maps instead.
+    "encounters": (),
+    "trainer_types": ("trainer_type_index",),
+    "trainers": (),
+}
+
+#: If more than this many files change, just do a full (parallel) load instead of an incremental
+#: reload.
+INCREMENTAL_RELOAD_LIMIT = 250
 
 
 @attr.s(frozen=True, slots=True, kw_only=True)
@@ -100,39 +136,17 @@ class EvolutionaryChain:
     evolves_into: list[tuple[PokemonSpecies, PokemonEvolution]] = attr.ib()
 
 
-@attr.s(frozen=False, slots=True)
-class ExpandedEncounterEntry:
-    """
-    An expanded encounter entry for usage with templates.
-    """
-
-    #: The name of the Pokémon this entry is for.
-    poke_name: str = attr.ib()
-
-    #: The percentage chance this entry is for.
-    chance: int = attr.ib()
-
-    min_level: int = attr.ib()
-    max_level: int = attr.ib()
-
-    def update(self, chance: int, min_level: int, max_level: int):
-        self.chance += chance
-        assert self.chance <= 100, "eeeh?"
-
-        self.min_level = min(min_level, self.min_level)
-        self.max_level = max(max_level, self.max_level)
-
-
 @attr.s(slots=False, kw_only=True)
 class EssentialsCatalog:
     """
     Super-object that contains references to all of the data in the game.
     """
 
-    #: The list of all known species.
+    #: The list of all known species. In lazy catalogs, this is a :class:`.LazySpeciesList`.
     species: list[PokemonSpecies] = attr.ib()
 
-    #: The mapping of all known {internal name -> list of forms}.
+    #: The mapping of all known {internal name -> list of forms}. In lazy catalogs, this is a
+    #: :class:`.LazyFormsMapping`.
     forms: dict[str, PokemonForms] = attr.ib()
 
     #: The list of all known moves.
@@ -159,13 +173,31 @@ class EssentialsCatalog:
     #: The mapping of trainer name -> list of trainers.
     trainers: dict[str, TrainerCatalog] = attr.ib()
 
+    #: The mapping of {forms file path, relative to the data directory: internal name of the
+    #: forms it defines}. Used to find the forms that a deleted or renamed file defined, as that
+    #: isn't always the file name.
+    form_files: dict[str, str] = attr.ib(factory=dict)
+
     @cached_property
     def species_mapping(self) -> Mapping[str, PokemonSpecies]:
+        # don't load every single species just to look one of them up.
+        if isinstance(self.species, LazySpeciesList):
+            return LazySpeciesMapping(self.species)
+
         return types.MappingProxyType({it.internal_name: it for it in self.species})
 
+    @cached_property
+    def move_index(self) -> LookupIndex[PokemonMove]:
+        return LookupIndex(
+            self.moves,
+            name=lambda it: it.internal_name,
+            display_name=lambda it: it.display_name,
+            id=lambda it: it.id,
+        )
+
     @cached_property
     def move_mapping(self) -> Mapping[str, PokemonMove]:
-        return types.MappingProxyType({it.internal_name: it for it in self.moves})
+        return self.move_index.by_name
 
     @cached_property
     def regular_tm_mapping(self) -> Mapping[int, TechnicalMachine]:
@@ -181,14 +213,42 @@ class EssentialsCatalog:
     def tm_name_mapping(self) -> Mapping[str, TechnicalMachine]:
         return types.MappingProxyType({it.move: it for it in self.tms})
 
+    @cached_property
+    def ability_index(self) -> LookupIndex[PokemonAbility]:
+        return LookupIndex(
+            self.abilities,
+            name=lambda it: it.name,
+            display_name=lambda it: it.display_name,
+            id=lambda it: it.id,
+        )
+
     @cached_property
     def ability_name_mapping(self) -> Mapping[str, PokemonAbility]:
-        return types.MappingProxyType({it.name: it for it in self.abilities})
+        return self.ability_index.by_name
+
+    @cached_property
+    def item_index(self) -> LookupIndex[PokemonItem]:
+        return LookupIndex(
+            self.items,
+            name=lambda it: it.internal_name,
+            display_name=lambda it: it.display_name,
+            id=lambda it: it.id,
+        )
 
     @cached_property
     def item_mapping(self) -> Mapping[str, PokemonItem]:
-        return types.MappingProxyType({it.internal_name: it for it in self.items})
-    
+        return self.item_index.by_name
+
+    @cached_property
+    def trainer_type_index(self) -> LookupIndex[TrainerType]:
+        # trainer types don't have a display name as such, the prefix is the closest thing.
+        return LookupIndex(
+            self.trainer_types.values(),
+            name=lambda it: it.internal_name,
+            display_name=lambda it: it.name_prefix,
+            id=lambda it: it.id,
+        )
+
     @cached_property
     def tutor_moves(self) -> set[PokemonMove]:
         """
@@ -203,12 +263,34 @@ class EssentialsCatalog:
 
         return items
 
+    @cached_property
+    def move_learners(self) -> MoveLearnerIndex:
+        """
+        The index of which species learn which moves. This is kept up to date by
+        :meth:`.reload_changed`, rather than being rebuilt.
+        """
+
+        with tracing.span("build_move_learners", "index"):
+            return MoveLearnerIndex.build(self)
+
+    @cached_property
+    def stat_table(self) -> StatTable:
+        """
+        The columnar table of stats for every species and form.
+        """
+
+        with tracing.span("build_stat_table", "index"):
+            return StatTable.build(self)
+
     @cached_property
     def pre_evolutionary_cache(self) -> Mapping[str, tuple[PokemonSpecies, PokemonEvolution]]:
         """
         Gets a mapping of (species -> (pre-evo species, pre-evolution)).
         """
 
+        if isinstance(self.species, LazySpeciesList):
+            return LazyPreEvolutionMapping(self.species)
+
         # luckily, there's no cases of multiple species evolving into one pokemon.
         d = {}
 
@@ -219,24 +301,27 @@ class EssentialsCatalog:
         return types.MappingProxyType(d)
 
     @cached_property
-    def species_to_encounter_map(self) -> Mapping[str, set[int]]:
+    def encounter_index(self) -> EncounterIndex:
         """
-        A mapping of {species internal name: [map ID]} to avoid searching all maps repeatedly.
+        The index of which species can be encountered where. This is kept up to date by
+        :meth:`.reload_changed`, rather than being rebuilt.
         """
 
-        mapping = defaultdict(set)
-
-        for map_id, info in self.encounters.items():
-            for all_entries in info.encounters.values():
-                for entry in all_entries:
-                    mapping[entry.name].add(map_id)
-
-        return types.MappingProxyType(mapping)
+        with tracing.span("build_encounter_index", "index"):
+            return EncounterIndex.build(self.encounters)
 
     def __attrs_post_init__(self):
+        self._link_child_maps()
+
+    def _link_child_maps(self):
         # apply children maps in a single pass.
         # if we didn't do this, we'd have to iterate over all maps to find backrefs on the parent_id
         # attribute, for every single map.
+        # the sets are cleared first so that relinking (or linking maps loaded from a snapshot)
+        # always produces the same iteration order as a fresh load.
+        for map in self.maps.values():
+            map.child_maps.clear()
+
         for map in self.maps.values():
             if map.parent_id == 0:  # root map, skip
                 continue
@@ -401,20 +486,27 @@ class EssentialsCatalog:
         trainer_types = load_trainer_types_from_toml(trainer_types_path)
 
         encounters_path = path / "encounters"
-        encounters = load_encounters_from_toml(encounters_path, singlethread=True)
+        encounters = load_encounters_from_toml(encounters_path)
 
         trainers_path = path / "trainers"
-        trainers = load_trainers_from_toml(trainers_path, singlethread=True)
+        trainers = load_trainers_from_toml(trainers_path)
 
         if skip_species:
             species = []
             forms = {}
+            form_files = {}
         else:
             species_dir = path / "species"
             forms_path = path / "forms"
 
-            species = load_all_species_from_toml(species_dir, singlethreaded=True)
-            forms = load_all_forms(forms_path, singlethreaded=True)
+            species = load_all_species_from_toml(species_dir)
+            forms = {}
+            form_files = {}
+
+            for file in form_toml_files(forms_path):
+                loaded = load_single_form(file)
+                forms[loaded.internal_name] = loaded
+                form_files[file.relative_to(path).as_posix()] = loaded.internal_name
 
         instance = cls(
             species=species,
@@ -427,6 +519,7 @@ class EssentialsCatalog:
             encounters=encounters,
             trainer_types=trainer_types,
             trainers=trainers,
+            form_files=form_files,
         )
 
         instance._sort()
@@ -443,84 +536,380 @@ class EssentialsCatalog:
         *,
         skip_species: bool = False,
         single_threaded: bool = False,
+        use_cache: bool = True,
+        cache_dir: Path | None = None,
+        lazy: bool = False,
     ) -> Self:
         """
         Loads all objects from toml files in the provided ``data`` directory.
+
+        If ``use_cache`` is True, then the catalog snapshot for this data directory in
+        ``cache_dir`` (defaulting to ``.cache`` in the working directory) will be used if none of
+        the input files have changed, and will be rewritten after a full load otherwise.
+
+        If ``lazy`` is True, then species and forms are only loaded when they're first accessed,
+        and nothing is validated up front. Call :meth:`.validate` to check the entire catalog.
+        Lazy loads never use the snapshot cache.
         """
 
-        if single_threaded:
-            return cls.load_from_toml_st(path, skip_species=skip_species)
+        if lazy:
+            return cls._load_lazy(path)
 
-        # processpoolexecutor over threadpoolexecutor cos this is mostly cpu bound tomli stuff
+        # the snapshot always contains species, so don't bother with it for partial loads.
+        if skip_species or not use_cache:
+            return cls._load_from_toml_uncached(
+                path, skip_species=skip_species, single_threaded=single_threaded
+            )
+
+        cache = CatalogSnapshotCache(cache_dir or default_cache_dir(), path)
 
         before = time.perf_counter()
-        with concurrent.futures.ProcessPoolExecutor() as executor:
-            moves_file = path / "moves.toml"
-            load_moves = partial(load_moves_from_toml, moves_file)
-            moves_fut = executor.submit(load_with_print, "moves", load_moves)
-
-            items_path = path / "items.toml"
-            load_items = partial(load_items_from_toml, items_path)
-            items_fut = executor.submit(load_with_print, "items", load_items)
-
-            tm_path = path / "tms.toml"
-            load_tms = partial(load_tms_from_toml, tm_path)
-            tms_fut = executor.submit(load_with_print, "tms", load_tms)
-
-            ability_path = path / "abilities.toml"
-            load_abilities = partial(load_abilities_from_toml, ability_path)
-            abilities_fut = executor.submit(load_with_print, "abilities", load_abilities)
-
-            map_metadata_path = path / "maps.toml"
-            load_map_metadata = partial(load_map_metadata_from_toml, map_metadata_path)
-            map_metadata_fut = executor.submit(load_with_print, "map metadata", load_map_metadata)
-
-            trainer_types_path = path / "trainer_types.toml"
-            load_trainer_types = partial(load_trainer_types_from_toml, trainer_types_path)
-            trainer_types_fut = executor.submit(
-                load_with_print, "trainer types", load_trainer_types
-            )
+        with tracing.span("load_snapshot", "cache"):
+            cached = cache.load()
+
+        if cached is not None:
+            fields, manifest, changed = cached
+
+            if len(changed) <= INCREMENTAL_RELOAD_LIMIT:
+                instance = cls(**fields)
+
+                if changed:
+                    instance.reload_changed(path, changed)
+
+                    with tracing.span("save_snapshot", "cache"):
+                        cache.save(instance, manifest)
+
+                after = time.perf_counter()
+                print(
+                    f"Loaded catalog from snapshot in {after - before:.2f}s "
+                    f"({len(changed)} file(s) reloaded)"
+                )
+                return instance
+
+        with tracing.span("build_manifest", "cache"):
+            manifest = DataManifest.build(path)
+
+        instance = cls._load_from_toml_uncached(path, single_threaded=single_threaded)
+
+        with tracing.span("save_snapshot", "cache"):
+            cache.save(instance, manifest)
+
+        return instance
+
+    @classmethod
+    def _load_lazy(
+        cls, path: Path, on_load: Callable[[PokemonSpecies], None] | None = None
+    ) -> Self:
+        before = time.perf_counter()
+
+        fields, _ = load_catalog_fields(path, skip_species=True)
+        instance = cls(**fields)
+        instance.species = LazySpeciesList.from_directory(  # type: ignore
+            path / "species", on_load=on_load or instance._sort_species
+        )
+        form_names = [(scan_form_name(file), file) for file in form_toml_files(path / "forms")]
+        instance.forms = LazyFormsMapping(form_names)  # type: ignore
+        instance.form_files = {file.relative_to(path).as_posix(): name for name, file in form_names}
 
         after = time.perf_counter()
-        print(f"Loaded all non-species data in {after - before:.2f}s")
+        print(f"Loaded lazy catalog in {after - before:.2f}s")
+        return instance
 
-        species_dir = path / "species"
-        forms_path = path / "forms"
+    @classmethod
+    def load_from_pack(cls, path: Path) -> Self:
+        """
+        Loads all objects from a data pack created by ``pack-data``.
+
+        The entities in a pack are already sorted and validated. If the pack was made by a
+        different version of the code, the raw TOML files embedded in it are loaded instead.
+        """
 
         before = time.perf_counter()
-        if skip_species:
-            species = []
-            forms = {}
-        else:
-            species = load_all_species_from_toml(species_dir)
-            forms = load_all_forms(forms_path)
 
-        encounters_path = path / "encounters"
-        trainers_path = path / "trainers"
-        encounters = load_encounters_from_toml(encounters_path)
-        trainers = load_trainers_from_toml(trainers_path)
+        with PackReader(path) as reader:
+            if reader.is_compatible:
+                instance = cls(**reader.load_fields())
+                after = time.perf_counter()
+                print(f"Loaded catalog from pack in {after - before:.2f}s")
+                return instance
+
+            print("Data pack was made by a different version, loading its TOML sources instead")
+            with tempfile.TemporaryDirectory() as dir:
+                reader.unpack_sources(Path(dir))
+                return cls.load_from_toml(Path(dir), use_cache=False)
+
+    @classmethod
+    def _load_from_toml_uncached(
+        cls,
+        path: Path,
+        *,
+        skip_species: bool = False,
+        single_threaded: bool = False,
+    ) -> Self:
+        if single_threaded:
+            return cls.load_from_toml_st(path, skip_species=skip_species)
+
+        # processpoolexecutor over threadpoolexecutor cos this is mostly cpu bound tomli stuff
+        before = time.perf_counter()
+        with tracing.span("load_catalog_fields", "load", path=str(path)):
+            fields, timings = load_catalog_fields(path, skip_species=skip_species)
         after = time.perf_counter()
 
-        print(f"Loaded species, forms, encounters, and trainers in {after - before:.2f}s")
+        print(f"Loaded all catalog data in {after - before:.2f}s")
+        print_phase_timings(timings)
 
-        instance = cls(
-            species=species,
-            forms=forms,
-            moves=moves_fut.result(),
-            items=items_fut.result(),
-            tms=tms_fut.result(),
-            abilities=abilities_fut.result(),
-            maps=map_metadata_fut.result(),
-            encounters=encounters,
-            trainer_types=trainer_types_fut.result(),
-            trainers=trainers,
-        )
+        instance = cls(**fields)
 
         instance._sort()
         instance._validate()
         print("loaded and validated catalog")
         return instance
 
+    def reload_changed(self, path: Path, changed: Iterable[Path | str]) -> set[str]:
+        """
+        Reloads only the entities defined in the provided changed files, in-place.
+
+        Paths can either be absolute or relative to the provided ``data`` directory. Paths that no
+        longer exist are treated as deletions. Only the cached indexes derived from the changed
+        fields are invalidated, and only the affected entities are re-sorted and re-validated.
+
+        Changes to the structure of the catalog rather than to the entities in it (removing a
+        species, adding one past the end of the Pokédex, or changing the internal name of one)
+        can't be patched in, and reload the entire catalog instead.
+
+        :return: The set of catalog fields that were modified. This is every field if the entire
+                 catalog was reloaded.
+        """
+
+        with tracing.span("reload_changed", "load") as trace:
+            root = path.absolute()
+            changed_fields: set[str] = set()
+            changed_species: list[PokemonSpecies] = []
+            changed_forms: list[str] = []
+            removed_species: dict[int, str | None] = {}
+            changed_maps: set[int] = set()
+
+            # fields that gained a new key, which is on the end rather than in file order.
+            reordered_fields: set[str] = set()
+
+            # deletions first, so that renames (delete + add) work. the rest go in path order so
+            # that new species are appended in Pokédex order.
+            relative_paths = sorted(
+                {(root / it).absolute().relative_to(root) for it in changed},
+                key=lambda it: ((root / it).exists(), it),
+            )
+            trace.set(files=len(relative_paths))
+
+            for relative in relative_paths:
+                full_path = root / relative
+                exists = full_path.exists()
+                kind = relative.parts[0]
+
+                if kind in FLAT_FILE_LOADERS:
+                    field_name, loader = FLAT_FILE_LOADERS[kind]
+                    setattr(self, field_name, loader(full_path))
+                    changed_fields.add(field_name)
+
+                elif kind == "species":
+                    idx = int(full_path.name.split("-", 1)[0])
+
+                    if not exists:
+                        # re-added below if this was a rename of the file.
+                        if idx <= len(self.species):
+                            old = self.species[idx - 1]
+                            removed_species[idx] = old.internal_name if old is not None else None
+                            self.species[idx - 1] = None  # type: ignore
+                    else:
+                        idx, species = load_single_species_toml(full_path)
+
+                        if idx == len(self.species) + 1:
+                            self.species.append(species)
+                        elif idx > len(self.species):
+                            return self._reload_all(path, f"species #{idx} was added out of order")
+                        else:
+                            if (old := self.species[idx - 1]) is not None:
+                                old_name = old.internal_name
+                            else:
+                                old_name = removed_species.get(idx)
+
+                            # other species, forms and trainers all refer to it by name.
+                            if old_name is not None and old_name != species.internal_name:
+                                return self._reload_all(path, f"species {old_name} was renamed")
+
+                            self.species[idx - 1] = species
+
+                        changed_species.append(species)
+
+                    changed_fields.add("species")
+
+                elif kind == "forms":
+                    if full_path.suffix != ".toml":
+                        continue
+
+                    # the file name isn't necessarily the internal name, so look it up.
+                    file_key = relative.as_posix()
+                    old_name = self.form_files.pop(file_key, None)
+
+                    if not exists:
+                        if old_name is None:
+                            return self._reload_all(path, f"unknown forms file {file_key} removed")
+
+                        self.forms.pop(old_name, None)
+                        changed_forms.append(old_name)
+                    else:
+                        forms = load_single_form(full_path)
+
+                        if old_name is not None and old_name != forms.internal_name:
+                            self.forms.pop(old_name, None)
+                            changed_forms.append(old_name)
+
+                        if forms.internal_name not in self.forms:
+                            reordered_fields.add("forms")
+
+                        self.forms[forms.internal_name] = forms
+                        self.form_files[file_key] = forms.internal_name
+                        changed_forms.append(forms.internal_name)
+
+                    changed_fields.add("forms")
+
+                elif kind == "encounters":
+                    if full_path.suffix != ".toml":
+                        continue
+
+                    if not exists:
+                        map_id = int(full_path.name.split("_", 1)[0])
+                        self.encounters.pop(map_id, None)
+                    else:
+                        map_id, encounter = load_single_encounter(full_path)
+
+                        if map_id not in self.encounters:
+                            reordered_fields.add("encounters")
+
+                        self.encounters[map_id] = encounter
+
+                    changed_maps.add(map_id)
+
+                    changed_fields.add("encounters")
+
+                elif kind == "trainers":
+                    if full_path.suffix != ".toml":
+                        continue
+
+                    if not exists:
+                        self.trainers.pop(full_path.stem, None)
+                    else:
+                        name, mapping = load_single_trainer_file_toml(full_path)
+
+                        if name not in self.trainers:
+                            reordered_fields.add("trainers")
+
+                        self.trainers[name] = TrainerCatalog(trainer_name=name, trainers=mapping)
+
+                    changed_fields.add("trainers")
+
+            for idx in removed_species:
+                if self.species[idx - 1] is None:
+                    return self._reload_all(path, f"species #{idx} was removed")
+
+            for field_name in reordered_fields:
+                if not self._restore_file_order(root, field_name):
+                    return self._reload_all(path, f"couldn't put the {field_name} back in order")
+
+            for field_name in changed_fields:
+                for property_name in CACHED_PROPERTY_DEPENDENCIES[field_name]:
+                    self.__dict__.pop(property_name, None)
+
+            if "maps" in changed_fields:
+                self._link_child_maps()
+
+            # changes to any of the lookup tables means everything needs re-checking.
+            if changed_fields & {"moves", "tms", "abilities"}:
+                self._sort()
+                self._validate()
+            else:
+                for species in changed_species:
+                    self._sort_species(species)
+                    self._validate_species(species)
+
+                    # forms are validated against their root species.
+                    if species.internal_name in self.forms:
+                        changed_forms.append(species.internal_name)
+
+                for form_key in changed_forms:
+                    if (forms := self.forms.get(form_key)) is not None:
+                        self._validate_forms(form_key, forms)
+
+            # only update the learner index if it's been built (and survived the invalidation).
+            if (learners := self.__dict__.get("move_learners")) is not None:
+                self._update_move_learners(learners, changed_species, changed_forms)
+
+            if (encounter_index := self.__dict__.get("encounter_index")) is not None:
+                for map_id in changed_maps:
+                    encounter_index.update_map(map_id, self.encounters.get(map_id))
+
+            print(f"Reloaded {len(relative_paths)} file(s) ({', '.join(sorted(changed_fields))})")
+            return changed_fields
+
+    def _restore_file_order(self, root: Path, field_name: str) -> bool:
+        # a fresh load adds entries in the order the files are listed, so new entries go there
+        # too rather than on the end.
+        mapping = getattr(self, field_name)
+
+        if field_name == "forms":
+            order = [
+                self.form_files.get(file.relative_to(root).as_posix())
+                for file in form_toml_files(root / "forms")
+            ]
+        elif field_name == "encounters":
+            files = encounter_toml_files(root / "encounters")
+            order = [int(file.name.split("_", 1)[0]) for file in files]
+        else:
+            order = [file.stem for file in trainer_toml_files(root / "trainers")]
+
+        # lazy forms can't be reordered without loading all of them.
+        if not isinstance(mapping, dict) or set(order) != mapping.keys():
+            return False
+
+        items = [(key, mapping[key]) for key in order]
+        mapping.clear()
+        mapping.update(items)
+        return True
+
+    def _reload_all(self, path: Path, reason: str) -> set[str]:
+        print(f"Reloading the entire catalog, as {reason}")
+
+        if isinstance(self.species, LazySpeciesList):
+            # species loaded later on still need sorting against this catalog.
+            reloaded = self._load_lazy(path, on_load=self._sort_species)
+        else:
+            reloaded = self._load_from_toml_uncached(path)
+
+        fields = attr.fields(type(self))
+        for field in fields:
+            setattr(self, field.name, getattr(reloaded, field.name))
+
+        # every single index is out of date now.
+        for name, value in vars(type(self)).items():
+            if isinstance(value, cached_property):
+                self.__dict__.pop(name, None)
+
+        return {field.name for field in fields}
+
+    def _update_move_learners(
+        self,
+        learners: MoveLearnerIndex,
+        changed_species: list[PokemonSpecies],
+        changed_forms: list[str],
+    ):
+        with tracing.span("update_move_learners", "index"):
+            updated = {species.internal_name: species for species in changed_species}
+            for form_key in changed_forms:
+                if (species := self.species_mapping.get(form_key)) is not None:
+                    updated[form_key] = species
+
+            for species in updated.values():
+                learners.update_species(self, species)
+
     def save_to_toml(self, path: Path):
         """
         Serialises all objects within this catalog to toml format.
@@ -558,111 +947,215 @@ class EssentialsCatalog:
         trainers_path.mkdir(parents=True, exist_ok=True)
         save_trainers_to_toml(trainers_path, self.trainers)
 
-    def save_to_essentials(self, output_dir: Path):
+    def essentials_writers(
+        self, output_dir: Path, tm_learnsets: Mapping[str, Collection[str]] | None = None
+    ) -> dict[str, Callable[[], None]]:
         """
-        Saves this catalog into the format ready for Essentials ingestion.
+        Gets the writer for every file that :meth:`.save_to_essentials` creates, keyed by the path
+        of the file relative to the output directory.
+
+        None of the writers modify the catalog or depend on each other, so they can be called in
+        any order (or all at once).
+
+        :param tm_learnsets: The TM learnsets from :meth:`.tm_learnsets`. Calculated if not
+                             provided.
         """
 
-        pbs_dir = output_dir / "PBS"
-        pbs_dir.mkdir(parents=True, exist_ok=True)
+        if tm_learnsets is None:
+            tm_learnsets = self.tm_learnsets()
 
+        pbs_dir = output_dir / "PBS"
         scripts_dir = output_dir / "Scripts"
-        scripts_dir.mkdir(parents=True, exist_ok=True)
 
-        pokemon_txt = pbs_dir / "pokemon.txt"
-        save_all_species_to_pbs(pokemon_txt, self.species)
+        return {
+            "PBS/pokemon.txt": partial(
+                save_all_species_to_pbs, pbs_dir / "pokemon.txt", self.species
+            ),
+            "PBS/moves.txt": partial(save_moves_to_pbs, pbs_dir / "moves.txt", self.moves),
+            "PBS/items.txt": partial(save_items_to_pbs, pbs_dir / "items.txt", self.items),
+            "PBS/tm.txt": partial(save_tms_to_pbs, pbs_dir / "tm.txt", self.tms, tm_learnsets),
+            "PBS/abilities.txt": partial(
+                save_abilities_to_pbs, pbs_dir / "abilities.txt", self.abilities
+            ),
+            "PBS/encounters.txt": partial(
+                save_encounters_to_pbs, pbs_dir / "encounters.txt", self.encounters
+            ),
+            "PBS/metadata.txt": partial(
+                save_map_metadata_to_pbs, pbs_dir / "metadata.txt", self.maps
+            ),
+            "PBS/trainertypes.txt": partial(
+                save_trainer_types_to_pbs, pbs_dir / "trainertypes.txt", self.trainer_types
+            ),
+            "PBS/trainers.txt": partial(
+                save_trainers_to_pbs, pbs_dir / "trainers.txt", self.trainers
+            ),
+            "Scripts/MultipleForms.rb": partial(
+                save_forms_to_ruby, scripts_dir / "MultipleForms.rb", self.forms
+            ),
+        }
 
-        moves_txt = pbs_dir / "moves.txt"
-        save_moves_to_pbs(moves_txt, self.moves)
+    def tm_learnsets(self) -> dict[str, list[str]]:
+        """
+        Gets the Pokémon that can learn each TM and tutor move, from the species learnsets, as
+        {move: sorted species names}. Every TM is included, even if nothing learns it.
+        """
 
-        items_txt = pbs_dir / "items.txt"
-        save_items_to_pbs(items_txt, self.items)
+        learnsets: dict[str, set[str]] = {tm.move: set() for tm in self.tms}
 
         for poke in self.species:
             for tm in poke.raw_tms:
-                self.tm_name_mapping[tm].pokemon.add(poke.internal_name)
+                learnsets[tm].add(poke.internal_name)
 
             for tm in poke.raw_tutor_moves:
-                self.tm_name_mapping[tm].pokemon.add(poke.internal_name)
+                learnsets[tm].add(poke.internal_name)
+
+        # sorted, as set order changes between runs and that would make tm.txt different every
+        # build.
+        return {move: sorted(names) for move, names in learnsets.items()}
+
+    def save_to_essentials(
+        self,
+        output_dir: Path,
+        output: OutputManifest | None = None,
+        *,
+        workers: int | None = None,
+    ) -> dict[str, float]:
+        """
+        Saves this catalog into the format ready for Essentials ingestion.
 
-        tm_txt = pbs_dir / "tm.txt"
-        save_tms_to_pbs(tm_txt, self.tms)
+        Every file is written into a staging directory first, and only moved into the output
+        directory if its content changed since the last build, so that unchanged PBS files keep
+        their mtimes (and the game doesn't recompile them).
 
-        ability_txt = pbs_dir / "abilities.txt"
-        save_abilities_to_pbs(ability_txt, self.abilities)
+        The files are independent, so they're written concurrently in a process pool. The output
+        doesn't depend on the order they finish in.
 
-        encounters_txt = pbs_dir / "encounters.txt"
-        save_encounters_to_pbs(encounters_txt, self.encounters)
+        :param output: The output manifest to record the written files in. If not provided, the
+                       manifest for the output directory is loaded and saved afterwards.
+        :param workers: The number of worker processes to use. Defaults to the number of CPUs; if
+                        1, every file is written in this process instead.
+        :return: The mapping of {file: seconds taken to write it}.
+        """
+
+        owns_manifest = output is None
+        if output is None:
+            output = OutputManifest.load(output_dir)
+
+        workers = workers or os.cpu_count() or 1
+
+        (output_dir / "PBS").mkdir(parents=True, exist_ok=True)
+        (output_dir / "Scripts").mkdir(parents=True, exist_ok=True)
 
-        map_metadata_txt = pbs_dir / "metadata.txt"
-        save_map_metadata_to_pbs(map_metadata_txt, self.maps)
+        with tracing.span("tm_learnsets", "save"):
+            tm_learnsets = self.tm_learnsets()
 
-        trainer_types_txt = pbs_dir / "trainertypes.txt"
-        save_trainer_types_to_pbs(trainer_types_txt, self.trainer_types)
+        # staged inside the output directory so that the final rename never crosses filesystems.
+        with tempfile.TemporaryDirectory(dir=output_dir, prefix=".staging-") as staging:
+            staging_dir = Path(staging)
+            (staging_dir / "PBS").mkdir()
+            (staging_dir / "Scripts").mkdir()
+
+            writers = self.essentials_writers(staging_dir, tm_learnsets)
+
+            if workers == 1:
+                timings = {
+                    name: _run_essentials_writer(name, writer) for name, writer in writers.items()
+                }
+            else:
+                timings = _run_essentials_writers_pool(
+                    self, staging_dir, tm_learnsets, list(writers), workers
+                )
 
-        trainers_txt = pbs_dir / "trainers.txt"
-        save_trainers_to_pbs(trainers_txt, self.trainers)
+            # moved in the usual order, rather than whatever order they finished in.
+            for name in writers:
+                output.replace_with(staging_dir / name, output_dir / name)
 
-        forms_file = scripts_dir / "MultipleForms.rb"
-        save_forms_to_ruby(forms_file, self.forms)
+        if owns_manifest:
+            output.save()
+
+        return timings
 
     def _sort(self):
-        print("Sorting TMs and tutor moves...")
+        with tracing.span("sort", "load"):
+            for sp in self.species:
+                self._sort_species(sp)
 
-        for sp in self.species:
-            sorted_tms = sorted(
-                sp.raw_tms, key=lambda tm_name: self.tm_name_mapping[tm_name].number or 0
-            )
+    def _sort_species(self, sp: PokemonSpecies):
+        sorted_tms = sorted(
+            sp.raw_tms, key=lambda tm_name: self.tm_name_mapping[tm_name].number or 0
+        )
+
+        sp.raw_tms = sorted_tms
+
+        sorted_tutors = sorted(sp.raw_tutor_moves)
+        sp.raw_tutor_moves = sorted_tutors
+
+    def validate(self, only: Iterable[PokemonSpecies] | None = None):
+        """
+        Validates every species and form in this catalog. Catalogs are validated when loaded
+        eagerly, but lazy catalogs aren't, so this will load every species and form.
 
-            sp.raw_tms = sorted_tms
+        :param only: If provided, only these species (and their forms) are validated.
+        """
+
+        if only is None:
+            self._validate()
+            return
 
-            sorted_tutors = sorted(sp.raw_tutor_moves)
-            sp.raw_tutor_moves = sorted_tutors
+        for species in only:
+            self._validate_species(species)
 
-        print("Done!")
+            if species.internal_name in self.forms:
+                self._validate_forms(species.internal_name, self.forms[species.internal_name])
 
     def _validate(self):
-        for species in self.species:
-            errors = []
+        with tracing.span("validate", "load"):
+            for species in self.species:
+                self._validate_species(species)
 
-            for _, _, attrs in self.all_forms_for(species):
-                for tm in species.raw_tms:
-                    if tm not in self.tm_name_mapping:
-                        errors.append(  # noqa: PERF401
-                            ValueError(f"no such TM: {tm} / when validating {attrs.internal_name}")
-                        )
+            for form_key, form in self.forms.items():
+                self._validate_forms(form_key, form)
+
+    def _validate_species(self, species: PokemonSpecies):
+        errors = []
+
+        for _, _, attrs in self.all_forms_for(species):
+            for tm in species.raw_tms:
+                if tm not in self.tm_name_mapping:
+                    errors.append(  # noqa: PERF401
+                        ValueError(f"no such TM: {tm} / when validating {attrs.internal_name}")
+                    )
 
-                for move in species.raw_level_up_moves:
-                    if move.name not in self.move_mapping:
-                        errors.append(  # noqa: PERF401
-                            ValueError(
-                                f"no such move: {move.name} / when validating {attrs.internal_name}"
-                            )
+            for move in species.raw_level_up_moves:
+                if move.name not in self.move_mapping:
+                    errors.append(  # noqa: PERF401
+                        ValueError(
+                            f"no such move: {move.name} / when validating {attrs.internal_name}"
                         )
+                    )
 
-                for ability in species.raw_abilities:
-                    if ability not in self.ability_name_mapping:
-                        errors.append(  # noqa: PERF401
-                            ValueError(
-                                f"no such ability: {ability} / when validating"
-                                f" {attrs.internal_name}"
-                            )
+            for ability in species.raw_abilities:
+                if ability not in self.ability_name_mapping:
+                    errors.append(  # noqa: PERF401
+                        ValueError(
+                            f"no such ability: {ability} / when validating {attrs.internal_name}"
                         )
+                    )
 
-            if errors:
-                raise ExceptionGroup(f"Validation error for {species.name}", errors)
+        if errors:
+            raise ExceptionGroup(f"Validation error for {species.name}", errors)
 
-        for form_key, form in self.forms.items():
-            errors = []
+    def _validate_forms(self, form_key: str, form: PokemonForms):
+        errors = []
 
-            if ferr := form._validate():
-                errors.append(ferr)
+        if ferr := form._validate():
+            errors.append(ferr)
 
-            if form_key not in self.species_mapping:
-                errors.append(ValueError(f"Form for non-existent Pokémon '{form_key}'"))
+        if form_key not in self.species_mapping:
+            errors.append(ValueError(f"Form for non-existent Pokémon '{form_key}'"))
 
-            if errors:
-                raise ExceptionGroup("Validation error for forms", errors)
+        if errors:
+            raise ExceptionGroup("Validation error for forms", errors)
 
     # == Helper methods == #
     def get_attribs_for_form(
@@ -728,22 +1221,14 @@ class EssentialsCatalog:
         Finds a move by name, or None if no such move exists.
         """
 
-        for move in self.moves:
-            if move.internal_name == internal_name:
-                return move
-
-        return None
+        return self.move_index.get(internal_name)
 
     def move_by_display_name(self, display_name: str) -> PokemonMove | None:
         """
         Finds a move by display name, or None if no such move exists.
         """
 
-        for move in self.moves:
-            if move.display_name == display_name:
-                return move
-
-        return None
+        return self.move_index.by_display_name.get(display_name)
 
     def tm_id_for(self, tm_name: str) -> int | None:
         """
@@ -768,11 +1253,10 @@ class EssentialsCatalog:
         Gets an item's localised name from its internal name.
         """
 
-        for item in self.items:
-            if item.internal_name == internal_name:
-                return item.display_name
+        if (item := self.item_index.get(internal_name)) is None:
+            raise ValueError(f"no such item {internal_name}")
 
-        raise ValueError(f"no such item {internal_name}")
+        return item.display_name
 
     def evolutionary_chain_for(self, species: PokemonSpecies) -> EvolutionaryChain | None:
         """
@@ -800,41 +1284,7 @@ class EssentialsCatalog:
         Gets a list of encounters for the provided Pokémon, and their chances.
         """
 
-        # map id -> {encounter type -> chance}
-        found_encounters: dict[int, dict[str, ExpandedEncounterEntry]] = {}
-
-        # 3 nested loops! 3 nested loops!
-        for map_id in self.species_to_encounter_map[species.internal_name]:
-            info = self.encounters[map_id]
-
-            for ec_type, all_entries in info.encounters.items():
-                slots = ENCOUNTER_SLOTS[ec_type]
-
-                for slot_idx, entry in enumerate(all_entries):
-                    # oh god, five levels of indentation
-                    if entry.name != species.internal_name:
-                        continue
-
-                    subdict = found_encounters.setdefault(map_id, {})
-                    chance = slots[slot_idx]
-
-                    # make sure percentages are added up (lol?)
-                    # it's what the wiki does...
-                    if ec_type in subdict:
-                        subdict[ec_type].update(
-                            chance=chance,
-                            min_level=entry.minimum_level,
-                            max_level=entry.maximum_level,
-                        )
-                    else:
-                        subdict[ec_type] = ExpandedEncounterEntry(
-                            poke_name=species.internal_name,
-                            chance=chance,
-                            min_level=entry.minimum_level,
-                            max_level=entry.maximum_level,
-                        )
-
-        return found_encounters
+        return self.encounter_index.encounters_for(species.internal_name)
 
     def get_map_chain_for(self, map: MapMetadata) -> list[MapMetadata]:
         """
@@ -858,69 +1308,72 @@ class EssentialsCatalog:
         Builds the reverse move mapping (i.e. a dict of move => list of Pokémon that learn it).
         """
 
-        mapping: MutableMapping[PokemonMove, list[MoveMappingEntry]] = defaultdict(list)
+        with tracing.span("build_move_mapping", "index"):
+            learners = self.move_learners
+            return {self.move_mapping[move]: learners.learners(move) for move in learners.moves()}
 
-        for species in self.species:
-            for move in species.raw_egg_moves:
-                mapped = self.move_mapping[move]
-                mapping[mapped].append(
-                    MoveMappingEntry(
-                        internal_name=mapped.internal_name,
-                        type=MoveMappingEntryType.EGG,
-                        species_name=species.internal_name,
-                    )
-                )
 
-            for tm in species.raw_tms:
-                mapped = self.move_mapping[tm]
-                mapping[mapped].append(
-                    MoveMappingEntry(
-                        internal_name=mapped.internal_name,
-                        type=MoveMappingEntryType.TM,
-                        species_name=species.internal_name,
-                    )
-                )
+def print_writer_timings(timings: Mapping[str, float]):
+    """
+    Prints the per-file timings returned by :meth:`.EssentialsCatalog.save_to_essentials`.
+    """
 
-            for tutor in species.raw_tutor_moves:
-                mapped = self.move_mapping[tutor]
-                mapping[mapped].append(
-                    MoveMappingEntry(
-                        internal_name=mapped.internal_name,
-                        type=MoveMappingEntryType.TUTOR,
-                        species_name=species.internal_name,
-                    )
-                )
+    print(f"{'file':<26} {'time':>8}")
+    for name, elapsed in sorted(timings.items(), key=lambda it: -it[1]):
+        print(f"{name:<26} {elapsed:>7.2f}s")
 
-            for id, _, attrs in self.all_forms_for(species):
-                # skip forms with identical level up movesets
-                if id > 0 and attrs.raw_level_up_moves == species.raw_level_up_moves:
-                    continue
 
-                for lvl in attrs.raw_level_up_moves:
-                    mapped = self.move_mapping[lvl.name]
-                    type: MoveMappingEntryType
+def _run_essentials_writer(name: str, writer: Callable[[], None]) -> float:
+    start = time.perf_counter()
+
+    with tracing.span(f"write:{name}", "save"):
+        writer()
 
-                    match lvl.at_level:
-                        case 0:
-                            type = MoveMappingEntryType.EVOLUTION
+    return time.perf_counter() - start
 
-                        case 1:
-                            type = MoveMappingEntryType.START
 
-                        case _:
-                            type = MoveMappingEntryType.LEVEL_UP
+#: The writers for the current worker process, see :func:`._run_essentials_writers_pool`.
+_worker_writers: dict[str, Callable[[], None]] | None = None
 
-                    mapping[mapped].append(
-                        MoveMappingEntry(
-                            internal_name=mapped.internal_name,
-                            type=type,
-                            species_name=species.internal_name,
-                            form_id=id,
-                            learned_at=lvl.at_level,
-                        )
-                    )
 
-        for sublist in mapping.values():
-            sublist.sort(key=lambda it: self.species_mapping[it.species_name].dex_number)
+def _init_essentials_worker(
+    catalog: EssentialsCatalog, staging_dir: Path, tm_learnsets: Mapping[str, Collection[str]]
+):
+    global _worker_writers
+    _worker_writers = catalog.essentials_writers(staging_dir, tm_learnsets)
+
+
+def _run_essentials_worker_task(name: str, trace: bool) -> tuple[float, list[tracing.SpanEvent]]:
+    assert _worker_writers is not None, "essentials worker wasn't initialised"
+
+    with tracing.collect(trace) as events:
+        elapsed = _run_essentials_writer(name, _worker_writers[name])
+
+    return elapsed, events
+
+
+def _run_essentials_writers_pool(
+    catalog: EssentialsCatalog,
+    staging_dir: Path,
+    tm_learnsets: Mapping[str, Collection[str]],
+    names: list[str],
+    workers: int,
+) -> dict[str, float]:
+    # the catalog is handed over once per worker (for free, when forking) rather than once per
+    # file.
+    trace = tracing.is_enabled()
+    timings: dict[str, float] = {}
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=min(workers, len(names)),
+        initializer=_init_essentials_worker,
+        initargs=(catalog, staging_dir, tm_learnsets),
+    ) as pool:
+        futures = {pool.submit(_run_essentials_worker_task, name, trace): name for name in names}
+
+        for future in concurrent.futures.as_completed(futures):
+            elapsed, events = future.result()
+            tracing.add_events(events)
+            timings[futures[future]] = elapsed
 
-        return mapping
+    return {name: timings[name] for name in names}
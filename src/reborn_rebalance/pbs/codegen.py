@@ -0,0 +1,602 @@
+from __future__ import annotations
+
+import enum
+import functools
+import hashlib
+import importlib.metadata
+import importlib.util
+import inspect
+import os
+import types
+import typing
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import attr
+import cattrs
+
+from reborn_rebalance.pbs.ability import PokemonAbility
+from reborn_rebalance.pbs.cache import code_fingerprint, user_cache_dir
+from reborn_rebalance.pbs.encounters import MapEncounters
+from reborn_rebalance.pbs.form import PokemonForms
+from reborn_rebalance.pbs.item import PokemonItem
+from reborn_rebalance.pbs.map import MapMetadata
+from reborn_rebalance.pbs.move import PokemonMove
+from reborn_rebalance.pbs.pokemon import PokemonSpecies
+from reborn_rebalance.pbs.tm import TechnicalMachine
+from reborn_rebalance.pbs.trainer import Trainer, TrainerCatalog, TrainerType
+
+# Precompiled converter hooks. cattrs generates a structure and unstructure function the first
+# time it sees each class, which means every worker process (and every run) pays for generating
+# the exact same code again. Instead, we generate plain Python source for every hook once, write
+# it into the per-user cache directory, and import it like any other module, so that Python caches
+# the bytecode too.
+#
+# Nothing happens at import time; the converter installs the hooks the first time it's used (see
+# serialisation.PrecompiledConverter). The generated module is keyed on the source of the pbs
+# package and the installed cattrs and attrs versions, as all three change what gets generated.
+#
+# The generated code is derived from the hooks on a normal cattrs converter (so the per-class
+# ``add_unstructure_hook`` overrides still apply), and only covers the happy path. If a generated
+# structure function fails on some input, the input is structured again with a normal cattrs
+# converter, so the errors are exactly the same as before. If the normal converter *doesn't* fail,
+# that's a bug in the generated code, and is raised as such.
+
+#: The classes that get precompiled hooks. Any attrs classes these refer to are included too.
+PRECOMPILED_CLASSES = (
+    PokemonSpecies,
+    PokemonForms,
+    PokemonMove,
+    PokemonItem,
+    TechnicalMachine,
+    PokemonAbility,
+    MapMetadata,
+    MapEncounters,
+    TrainerType,
+    Trainer,
+    TrainerCatalog,
+)
+
+#: The primitive types that cattrs structures by calling the type, and unstructures as-is.
+_PRIMITIVES = (int, float, str, bool)
+
+#: The prefixes of the keyword arguments of functions generated by cattrs'
+#: ``make_dict_unstructure_fn``. Anything else means the hook was made some other way.
+_CATTRS_ARGUMENT_PREFIXES = ("__c_unstr_", "__c_def_", "__c_conv_", "__c_field_")
+
+
+class UnsupportedHookError(TypeError):
+    """
+    Raised when a hook can't be precompiled.
+    """
+
+
+def _union_args(t: Any) -> tuple[Any, ...] | None:
+    if typing.get_origin(t) in (typing.Union, types.UnionType):
+        return typing.get_args(t)
+
+    return None
+
+
+def _same_hook(first: Callable[..., Any], second: Callable[..., Any]) -> bool:
+    # classes without a registered hook get a new (but identical) one every time.
+    if first is second:
+        return True
+
+    try:
+        return first.overrides == second.overrides and list(  # type: ignore
+            inspect.signature(first).parameters
+        ) == list(inspect.signature(second).parameters)
+    except AttributeError:
+        return False
+
+
+class _HookWriter:
+    """
+    Writes the source for the precompiled hooks module.
+    """
+
+    def __init__(self, reference: cattrs.Converter):
+        self.reference = reference
+        self.imports: dict[str, set[str]] = {}
+        self.names: dict[str, Any] = {}
+        self.header: list[str] = []
+        self.functions: list[str] = []
+        self.structured: set[type] = set()
+        self.unstructured: set[type] = set()
+        self._counter = 0
+
+    def _helper_name(self, kind: str) -> str:
+        self._counter += 1
+        return f"_{kind}_{self._counter}"
+
+    def _import(self, obj: Any) -> str:
+        module, qualname = obj.__module__, obj.__qualname__
+        top_level = qualname.split(".", 1)[0]
+
+        if (existing := self.names.get(top_level)) is not None and existing is not getattr(
+            importlib.import_module(module), top_level
+        ):
+            raise UnsupportedHookError(f"two different objects are named {top_level}")
+
+        self.names[top_level] = getattr(importlib.import_module(module), top_level)
+        self.imports.setdefault(module, set()).add(top_level)
+        return qualname
+
+    def _enum_by_name(self, klass: type[enum.Enum]) -> bool:
+        # the enums registered in create_cattrs_converter go by name, everything else is cattrs'
+        # default of going by value.
+        def round_trips(attribute: str) -> bool:
+            # by-name lookups raise KeyError and by-value lookups raise ValueError.
+            try:
+                return all(
+                    self.reference.unstructure(member, klass) == getattr(member, attribute)
+                    and self.reference.structure(getattr(member, attribute), klass) is member
+                    for member in klass
+                )
+            except (KeyError, ValueError):
+                return False
+
+        if round_trips("name"):
+            return True
+
+        if round_trips("value"):
+            return False
+
+        raise UnsupportedHookError(f"{klass} isn't structured by either name or value")
+
+    def structure_expr(self, t: Any, expr: str, depth: int = 0) -> str:
+        """
+        Gets the expression that structures ``expr`` as the type ``t``.
+        """
+
+        if t is Any:
+            return expr
+
+        if t in _PRIMITIVES:
+            return f"{t.__name__}({expr})"
+
+        if isinstance(t, type) and issubclass(t, enum.Enum):
+            name = self._import(t)
+            return f"{name}[{expr}]" if self._enum_by_name(t) else f"{name}({expr})"
+
+        if isinstance(t, type) and attr.has(t):
+            self.add_structure(t)
+            return f"structure_{t.__name__}({expr})"
+
+        if (args := _union_args(t)) is not None:
+            others = [it for it in args if it is not type(None)]
+            if len(others) != 1 or len(args) != 2:
+                raise UnsupportedHookError(f"can't structure the union {t}")
+
+            return f"(None if {expr} is None else {self.structure_expr(others[0], expr, depth)})"
+
+        origin, args = typing.get_origin(t), typing.get_args(t)
+        item = f"e{depth}"
+
+        if origin is list and len(args) == 1:
+            return f"[{self.structure_expr(args[0], item, depth + 1)} for {item} in {expr}]"
+
+        if origin is set and len(args) == 1:
+            return f"{{{self.structure_expr(args[0], item, depth + 1)} for {item} in {expr}}}"
+
+        if origin is tuple and len(args) == 2 and args[1] is Ellipsis:
+            inner = self.structure_expr(args[0], item, depth + 1)
+            return f"tuple([{inner} for {item} in {expr}])"
+
+        if origin is tuple and args and Ellipsis not in args:
+            return f"{self._tuple_structure_helper(args)}({expr})"
+
+        if origin is dict and len(args) == 2:
+            key, value = f"k{depth}", f"v{depth}"
+            key_expr = self.structure_expr(args[0], key, depth + 1)
+            value_expr = self.structure_expr(args[1], value, depth + 1)
+            return f"{{{key_expr}: {value_expr} for {key}, {value} in {expr}.items()}}"
+
+        raise UnsupportedHookError(f"can't structure {t}")
+
+    def _tuple_structure_helper(self, args: tuple[Any, ...]) -> str:
+        name = self._helper_name("structure_tuple")
+        items = [f"a{idx}" for idx in range(len(args))]
+
+        # unpacking raises if there's the wrong number of items, same as cattrs.
+        lines = [f"def {name}(value):", f"    {', '.join(items)}, = value"]
+        exprs = [self.structure_expr(t, item, 1) for t, item in zip(args, items, strict=True)]
+        lines.append(f"    return ({', '.join(exprs)},)")
+
+        self.functions.append("\n".join(lines))
+        return name
+
+    def add_structure(self, klass: type):
+        """
+        Generates the structure function for the provided attrs class.
+        """
+
+        if klass in self.structured:
+            return
+
+        self.structured.add(klass)
+        attr.resolve_types(klass)
+
+        name = self._import(klass)
+        keys: list[str] = []
+        required: list[str] = []
+        optional: list[str] = []
+
+        for field in attr.fields(klass):
+            if not field.init:
+                continue
+
+            if field.converter is not None:
+                raise UnsupportedHookError(f"{klass.__name__}.{field.name} has a converter")
+
+            keys.append(field.name)
+            value = self.structure_expr(field.type, f"o[{field.name!r}]")
+
+            if field.default is attr.NOTHING:
+                required.append(f"        {field.alias!r}: {value},")
+            else:
+                optional.append(f"    if {field.name!r} in o:")
+                optional.append(f"        res[{field.alias!r}] = {value}")
+
+        self.header.append(f"_KEYS_{klass.__name__} = frozenset({sorted(keys)!r})")
+
+        lines = [
+            f"def structure_{klass.__name__}(o):",
+            f"    if not _KEYS_{klass.__name__}.issuperset(o):",
+            f"        raise KeyError('extra keys for {klass.__name__}')",
+            "",
+            "    res = {",
+            *required,
+            "    }",
+            *optional,
+            f"    return {name}(**res)",
+        ]
+        self.functions.append("\n".join(lines))
+
+    def unstructure_expr(self, t: Any, expr: str, depth: int = 0) -> str:
+        """
+        Gets the expression that unstructures ``expr``, which is of the type ``t``.
+        """
+
+        if t is Any or t in _PRIMITIVES:
+            return expr
+
+        if isinstance(t, type) and issubclass(t, enum.Enum):
+            self._import(t)
+            return f"{expr}.name" if self._enum_by_name(t) else f"{expr}.value"
+
+        if isinstance(t, type) and attr.has(t):
+            self.add_unstructure(t)
+            return f"unstructure_{t.__name__}({expr})"
+
+        if (args := _union_args(t)) is not None:
+            others = [it for it in args if it is not type(None)]
+            if len(others) != 1 or len(args) != 2:
+                raise UnsupportedHookError(f"can't unstructure the union {t}")
+
+            inner = self.unstructure_expr(others[0], expr, depth)
+            if inner == expr:
+                return expr
+
+            return f"(None if {expr} is None else {inner})"
+
+        origin, args = typing.get_origin(t), typing.get_args(t)
+        item = f"e{depth}"
+
+        # homogenous tuples come out as lists, same as cattrs.
+        if (origin is list and len(args) == 1) or (
+            origin is tuple and len(args) == 2 and args[1] is Ellipsis
+        ):
+            return f"[{self.unstructure_expr(args[0], item, depth + 1)} for {item} in {expr}]"
+
+        if origin is set and len(args) == 1:
+            return f"{{{self.unstructure_expr(args[0], item, depth + 1)} for {item} in {expr}}}"
+
+        if origin is tuple and args and Ellipsis not in args:
+            exprs = [
+                self.unstructure_expr(it, f"{expr}[{idx}]", depth + 1)
+                for idx, it in enumerate(args)
+            ]
+            return f"({', '.join(exprs)},)"
+
+        if origin is dict and len(args) == 2:
+            key, value = f"k{depth}", f"v{depth}"
+            key_expr = self.unstructure_expr(args[0], key, depth + 1)
+            value_expr = self.unstructure_expr(args[1], value, depth + 1)
+            return f"{{{key_expr}: {value_expr} for {key}, {value} in {expr}.items()}}"
+
+        raise UnsupportedHookError(f"can't unstructure {t}")
+
+    def _custom_hook_expr(self, hook: Callable[..., Any], expr: str) -> str:
+        # the only custom hooks we know how to call are partials of a method with the converter,
+        # like TrainerCatalog.trainers_structure_hook.
+        if (
+            not isinstance(hook, functools.partial)
+            or hook.args != (self.reference,)
+            or hook.keywords
+        ):
+            raise UnsupportedHookError(f"can't precompile the custom hook {hook!r}")
+
+        func = hook.func
+        name = self._import(func)
+        resolved: Any = self.names[name.split(".", 1)[0]]
+        for part in name.split(".")[1:]:
+            resolved = getattr(resolved, part)
+
+        if resolved is not func:
+            raise UnsupportedHookError(f"{name} doesn't resolve to {func!r}")
+
+        return f"{name}(_converter, {expr})"
+
+    def add_unstructure(self, klass: type):
+        """
+        Generates the unstructure function for the provided attrs class, based off of the hook
+        on the reference converter.
+        """
+
+        if klass in self.unstructured:
+            return
+
+        self.unstructured.add(klass)
+        attr.resolve_types(klass)
+        self._import(klass)
+
+        hook = self.reference.get_unstructure_hook(klass)
+        overrides = getattr(hook, "overrides", None)
+        if overrides is None:
+            raise UnsupportedHookError(f"the hook for {klass.__name__} isn't a generated one")
+
+        arguments = inspect.signature(hook).parameters
+        if any(not name.startswith(_CATTRS_ARGUMENT_PREFIXES) for name in list(arguments)[1:]):
+            raise UnsupportedHookError(f"the hook for {klass.__name__} has unknown arguments")
+
+        always: list[str] = []
+        if_changed: list[str] = []
+
+        for field in attr.fields(klass):
+            override = overrides.get(field.name)
+
+            if override is not None and override.omit:
+                continue
+
+            if (override is None or override.omit is None) and not field.init:
+                continue
+
+            if override is not None and override.rename is not None:
+                key = override.rename
+            else:
+                key = field.name
+
+            if override is not None and override.unstruct_hook is not None:
+                value = self._custom_hook_expr(override.unstruct_hook, f"instance.{field.name}")
+            else:
+                # hooks for nested classes are looked up when the outer hook is made, so make sure
+                # it got the same one as we're going to use.
+                handler = arguments.get(f"__c_unstr_{field.name}")
+                if (
+                    isinstance(field.type, type)
+                    and attr.has(field.type)
+                    and handler is not None
+                    and not _same_hook(
+                        handler.default, self.reference.get_unstructure_hook(field.type)
+                    )
+                ):
+                    raise UnsupportedHookError(
+                        f"{klass.__name__}.{field.name} doesn't use the {field.type.__name__} hook"
+                    )
+
+                value = self.unstructure_expr(field.type, f"instance.{field.name}")
+
+            if f"__c_def_{field.name}" not in arguments:
+                always.append(f"        {key!r}: {value},")
+                continue
+
+            if field.converter is not None:
+                raise UnsupportedHookError(f"{klass.__name__}.{field.name} has a converter")
+
+            default_name = f"_DEF_{klass.__name__}_{field.name}"
+            default_attr = f"_attr.fields({klass.__name__}).{field.name}.default"
+
+            if isinstance(field.default, attr.Factory):  # type: ignore
+                self.header.append(f"{default_name} = {default_attr}.factory")
+                argument = "instance" if field.default.takes_self else ""
+                default_expr = f"{default_name}({argument})"
+            else:
+                self.header.append(f"{default_name} = {default_attr}")
+                default_expr = default_name
+
+            if_changed.append(f"    if instance.{field.name} != {default_expr}:")
+            if_changed.append(f"        res[{key!r}] = {value}")
+
+        lines = [
+            f"def unstructure_{klass.__name__}(instance):",
+            "    res = {",
+            *always,
+            "    }",
+            *if_changed,
+            "    return res",
+        ]
+        self.functions.append("\n".join(lines))
+
+    def source(self, fingerprint: str) -> str:
+        """
+        Gets the complete source for the hooks module.
+        """
+
+        lines = [
+            "# Precompiled converter hooks, generated by reborn_rebalance.pbs.codegen.",
+            "# Don't edit this file, it gets regenerated whenever the pbs package changes.",
+            f"# Code fingerprint: {fingerprint}",
+            "",
+            "import attr as _attr",
+            "",
+        ]
+
+        for module, names in sorted(self.imports.items()):
+            lines.append(f"from {module} import {', '.join(sorted(names))}")
+
+        lines += [
+            "",
+            "_converter = None",
+            "",
+            "",
+            "def install(converter):",
+            "    global _converter",
+            "    _converter = converter",
+            "",
+            *self.header,
+            "",
+        ]
+
+        for function in self.functions:
+            lines += ["", function, ""]
+
+        structured = ", ".join(
+            f"{it.__name__}: structure_{it.__name__}"
+            for it in sorted(self.structured, key=lambda it: it.__name__)
+        )
+        unstructured = ", ".join(
+            f"{it.__name__}: unstructure_{it.__name__}"
+            for it in sorted(self.unstructured, key=lambda it: it.__name__)
+        )
+        lines += ["", f"STRUCTURE_HOOKS = {{{structured}}}", ""]
+        lines += [f"UNSTRUCTURE_HOOKS = {{{unstructured}}}", ""]
+        return "\n".join(lines)
+
+
+def generate_hooks_source(reference: cattrs.Converter, fingerprint: str) -> str:
+    """
+    Generates the source of the precompiled hooks module for every class in
+    :data:`.PRECOMPILED_CLASSES`, based on the hooks of the provided converter.
+
+    :raises UnsupportedHookError: If any of the hooks can't be precompiled.
+    """
+
+    writer = _HookWriter(reference)
+
+    for klass in PRECOMPILED_CLASSES:
+        writer.add_structure(klass)
+        writer.add_unstructure(klass)
+
+    return writer.source(fingerprint)
+
+
+def hooks_cache_dir() -> Path:
+    """
+    Gets the default directory for the precompiled hooks modules.
+    """
+
+    return user_cache_dir() / "hooks"
+
+
+def hooks_fingerprint() -> str:
+    """
+    Hashes everything the generated hooks depend on: the source of the ``pbs`` package, and the
+    versions of cattrs and attrs.
+    """
+
+    hasher = hashlib.sha256(code_fingerprint().encode("utf-8"))
+    for package in ("cattrs", "attrs"):
+        hasher.update(f"{package}=={importlib.metadata.version(package)}".encode())
+
+    return hasher.hexdigest()
+
+
+def hooks_module_path(cache_dir: Path, fingerprint: str) -> Path:
+    """
+    Gets the path to the precompiled hooks module for the provided fingerprint.
+    """
+
+    return cache_dir / f"converter_hooks_{fingerprint[:16]}.py"
+
+
+def _load_hooks_module(path: Path) -> types.ModuleType:
+    spec = importlib.util.spec_from_file_location(f"_reborn_converter_hooks_{path.stem}", path)
+    assert spec is not None and spec.loader is not None
+
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _with_fallback(
+    function: Callable[[Any], Any],
+    klass: type,
+    reference: Callable[[], cattrs.Converter],
+) -> Callable[[Any, Any], Any]:
+    def structure(obj: Any, _: Any) -> Any:
+        try:
+            return function(obj)
+        except Exception as e:
+            # redo it the slow way, so that the user gets the proper cattrs error.
+            reference().structure(obj, klass)
+
+            raise RuntimeError(
+                f"the precompiled hook for {klass.__name__} failed on data that cattrs accepts"
+            ) from e
+
+    return structure
+
+
+def install_precompiled_hooks(
+    converter: cattrs.Converter,
+    create_reference: Callable[[], cattrs.Converter],
+    cache_dir: Path | None = None,
+) -> bool:
+    """
+    Registers the precompiled hooks on the provided converter, generating them first if needed.
+
+    :param create_reference: Creates a plain cattrs converter with all of the normal hooks, which
+                             the precompiled hooks are generated from and fall back to.
+    :param cache_dir: The directory to store the generated module in. Defaults to
+                      :func:`.hooks_cache_dir`.
+    :return: True if the hooks were installed, or False if they couldn't be (because the cache
+             directory isn't writable, or a hook isn't supported) and the converter needs its
+             normal hooks.
+    """
+
+    cache_dir = cache_dir or hooks_cache_dir()
+    fingerprint = hooks_fingerprint()
+    path = hooks_module_path(cache_dir, fingerprint)
+
+    try:
+        if not path.exists():
+            source = generate_hooks_source(create_reference(), fingerprint)
+
+            # write then rename, as multiple processes might be doing this at the same time.
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(f"{path.name}.tmp{os.getpid()}")
+            temp_path.write_text(source, encoding="utf-8")
+            temp_path.replace(path)
+
+            # clean up the modules for old versions of the code.
+            for old in path.parent.glob("converter_hooks_*.py"):
+                if old != path:
+                    old.unlink(missing_ok=True)
+
+        module = _load_hooks_module(path)
+    except (OSError, UnsupportedHookError) as e:
+        print(f"Couldn't precompile the converter hooks, using cattrs instead: {e}")
+        return False
+
+    reference: cattrs.Converter | None = None
+
+    def get_reference() -> cattrs.Converter:
+        nonlocal reference
+        if reference is None:
+            reference = create_reference()
+
+        return reference
+
+    # the hooks call back into the converter for anything they don't handle themselves.
+    module.install(converter)
+
+    for klass, function in module.STRUCTURE_HOOKS.items():
+        converter.register_structure_hook(klass, _with_fallback(function, klass, get_reference))
+
+    for klass, function in module.UNSTRUCTURE_HOOKS.items():
+        converter.register_unstructure_hook(klass, function)
+
+    return True
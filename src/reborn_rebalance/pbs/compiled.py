@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import struct
+from collections.abc import Callable, Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from rubymarshal.classes import UserDef
+from rubymarshal.writer import writes
+from typing_extensions import override
+
+from reborn_rebalance.pbs.encounters import ENCOUNTER_SLOTS
+
+if TYPE_CHECKING:
+    from reborn_rebalance.output import OutputManifest
+    from reborn_rebalance.pbs.catalog import EssentialsCatalog
+
+# Compiling the PBS data straight into the Data/*.dat files, instead of booting the game and
+# letting Essentials do it.
+#
+# Only the files that Essentials writes with a plain ``save_data`` (i.e. Ruby Marshal) of arrays
+# and hashes are supported, as those only need the same nested structure that the compiler
+# builds. The rest are either packed binary records with hardcoded offsets (dexdata, moves,
+# attacksRS, eggEmerald, evolutions, regionals), or need text from the whole game (messages), and
+# getting those wrong would just crash the game, so they still have to come from a real compile.
+#
+# The layouts here follow the Essentials compiler that Reborn is based on. If the game's compiler
+# is ever changed, these need changing too.
+
+#: The order of the encounter types in the game's ``EncounterTypes``, i.e. their numeric IDs.
+ENCOUNTER_TYPE_IDS = (
+    "Land",
+    "Cave",
+    "Water",
+    "RockSmash",
+    "OldRod",
+    "GoodRod",
+    "SuperRod",
+    "HeadbuttLow",
+    "HeadbuttHigh",
+    "LandMorning",
+    "LandDay",
+    "LandNight",
+)
+
+#: The default encounter density for each encounter type, if a map doesn't set them.
+ENCOUNTER_DENSITIES = (25, 10, 10, 0, 0, 0, 0, 0, 0, 25, 25, 25)
+
+#: Which of the (land, cave, water) rates on a map each encounter type uses, as an index, or None
+#: if the encounter type always uses its default density. The compiler only ever writes the three
+#: rates into the first three entries, so the time-specific land types keep their defaults.
+ENCOUNTER_DENSITY_COLUMNS = (0, 1, 2, None, None, None, None, None, None, None, None, None)
+
+#: The gender values for trainer types.
+TRAINER_GENDERS = {"Male": 0, "Female": 1, "Mixed": 2}
+
+#: The files that still need compiling by the game, and why.
+UNSUPPORTED_DAT_FILES = {
+    "Data/attacksRS.dat": "packed binary",
+    "Data/dexdata.dat": "packed binary",
+    "Data/eggEmerald.dat": "packed binary",
+    "Data/evolutions.dat": "packed binary",
+    "Data/moves.dat": "packed binary",
+    "Data/regionals.dat": "packed binary",
+    "Data/items.dat": "not generated from our data yet",
+    "Data/metadata.dat": "not generated from our data yet",
+    "Data/trainers.dat": "not generated from our data yet",
+    "Data/messages.dat": "needs every string in the game",
+    "Data/fieldnotes.dat": "not in our data",
+    "Data/metrics.dat": "not in our data",
+    "Data/move2anim.dat": "not in our data",
+}
+
+
+class WordArray(UserDef):
+    """
+    The Essentials ``WordArray`` class, an array of unsigned shorts that marshals as the packed
+    shorts.
+    """
+
+    ruby_class_name = "WordArray"
+
+    def __init__(self, values: list[int]):
+        super().__init__(ruby_class_name=self.ruby_class_name)
+        self.values = values
+
+    @override
+    def _dump(self) -> bytes:
+        return struct.pack(f"<{len(self.values)}H", *self.values)
+
+
+def _species_ids(catalog: EssentialsCatalog) -> dict[str, int]:
+    # species IDs are just their position in pokemon.txt.
+    return {species.internal_name: idx + 1 for idx, species in enumerate(catalog.species)}
+
+
+def _put(array: list[Any], idx: int, value: Any):
+    # assigning past the end of a ruby array fills the gap with nils.
+    if idx >= len(array):
+        array.extend([None] * (idx + 1 - len(array)))
+
+    array[idx] = value
+
+
+def compile_tms(catalog: EssentialsCatalog, tm_learnsets: Mapping[str, list[str]]) -> list[Any]:
+    """
+    Compiles ``tm.dat``, an array of {move ID: WordArray of species IDs}.
+    """
+
+    species_ids = _species_ids(catalog)
+    compiled: list[Any] = []
+
+    # like tm.txt, later duplicate entries replace earlier ones, so only the learners matter.
+    for move in tm_learnsets:
+        learners = [species_ids[name] for name in tm_learnsets[move]]
+        _put(compiled, catalog.move_index[move].id, WordArray(learners))
+
+    return compiled
+
+
+def compile_encounters(catalog: EssentialsCatalog) -> dict[int, Any]:
+    """
+    Compiles ``encounters.dat``, a hash of {map ID: [densities, encounters by type ID]}. Every
+    encounter is a ``[species ID, minimum level, maximum level]`` array.
+    """
+
+    species_ids = _species_ids(catalog)
+    compiled: dict[int, Any] = {}
+
+    for map_id, info in sorted(catalog.encounters.items()):
+        densities: list[int] = list(ENCOUNTER_DENSITIES)
+        for type_id, column in enumerate(ENCOUNTER_DENSITY_COLUMNS):
+            if column is not None:
+                densities[type_id] = info.chances[column]
+
+        by_type: list[Any] = []
+        for ec_type, entries in info.encounters.items():
+            # the compiler only reads as many lines as there are slots.
+            slots = len(ENCOUNTER_SLOTS[ec_type])
+            _put(
+                by_type,
+                ENCOUNTER_TYPE_IDS.index(ec_type),
+                [
+                    [species_ids[it.name], it.minimum_level, it.maximum_level]
+                    for it in entries[:slots]
+                ],
+            )
+
+        compiled[map_id] = [densities, by_type]
+
+    return compiled
+
+
+def compile_trainer_types(catalog: EssentialsCatalog) -> list[Any]:
+    """
+    Compiles ``trainertypes.dat``, an array of {trainer type ID: record}.
+    """
+
+    compiled: list[Any] = []
+
+    for tt in catalog.trainer_types.values():
+        record = [
+            tt.id,
+            tt.internal_name,
+            tt.name_prefix,
+            tt.money_per_level,
+            tt.bgm,
+            tt.end_sfx,
+            tt.intro_sfx,
+            TRAINER_GENDERS.get(tt.gender, 2),
+            # the skill level defaults to the money.
+            tt.skill_level if tt.skill_level is not None else tt.money_per_level,
+        ]
+        _put(compiled, tt.id, record)
+
+    return compiled
+
+
+def dat_compilers(
+    catalog: EssentialsCatalog, tm_learnsets: Mapping[str, list[str]]
+) -> dict[str, Callable[[], Any]]:
+    """
+    Gets the compiler for every supported ``.dat`` file, keyed by the path of the file relative to
+    the game directory. Each compiler returns the object to marshal.
+    """
+
+    return {
+        "Data/encounters.dat": lambda: compile_encounters(catalog),
+        "Data/tm.dat": lambda: compile_tms(catalog, tm_learnsets),
+        "Data/trainertypes.dat": lambda: compile_trainer_types(catalog),
+    }
+
+
+def compile_to_dat(catalog: EssentialsCatalog, output_dir: Path, output: OutputManifest):
+    """
+    Compiles every supported ``.dat`` file into the ``Data`` directory of the provided game
+    directory, and lists the ones that still need compiling in-game.
+    """
+
+    (output_dir / "Data").mkdir(parents=True, exist_ok=True)
+
+    for name, compiler in dat_compilers(catalog, catalog.tm_learnsets()).items():
+        if output.write_bytes(output_dir / name, writes(compiler())):
+            print(f"Compiled {name}")
+
+    print("These still need to be compiled by the game:")
+    for name, reason in UNSUPPORTED_DAT_FILES.items():
+        print(f"  {name} ({reason})")
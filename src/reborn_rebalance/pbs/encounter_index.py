@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+from collections.abc import Collection, Mapping
+
+import attr
+
+from reborn_rebalance.pbs.encounters import ENCOUNTER_SLOTS, MapEncounters
+
+# The reverse encounter mapping, i.e. "where can I find this Pokémon?". Every species page needs
+# this, and working it out from the encounter tables means scanning every table on every map the
+# species is on, so the catalog keeps one of these around instead.
+#
+# It's built in a single pass over every map, with the slot percentages from ENCOUNTER_SLOTS
+# already resolved and added up per (species, map, encounter type). Updating a map only touches
+# the species that were (or now are) on it.
+
+#: The time-specific encounter types. In-game, these replace the regular ``Land`` encounters at
+#: that time of day on maps that have them.
+TIME_ENCOUNTER_TYPES = {
+    "Morning": "LandMorning",
+    "Day": "LandDay",
+    "Night": "LandNight",
+}
+
+
+@attr.s(frozen=True, slots=True)
+class ExpandedEncounterEntry:
+    """
+    An expanded encounter entry for usage with templates.
+    """
+
+    #: The name of the Pokémon this entry is for.
+    poke_name: str = attr.ib()
+
+    #: The percentage chance this entry is for.
+    chance: int = attr.ib()
+
+    min_level: int = attr.ib()
+    max_level: int = attr.ib()
+
+    def merged(self, chance: int, min_level: int, max_level: int) -> ExpandedEncounterEntry:
+        """
+        Returns a copy of this entry with another slot for the same Pokémon added on.
+        """
+
+        total = self.chance + chance
+        assert total <= 100, "eeeh?"
+
+        return ExpandedEncounterEntry(
+            poke_name=self.poke_name,
+            chance=total,
+            min_level=min(min_level, self.min_level),
+            max_level=max(max_level, self.max_level),
+        )
+
+
+def expand_map_encounters(info: MapEncounters) -> dict[str, dict[str, ExpandedEncounterEntry]]:
+    """
+    Expands the encounter tables for a single map into {species: {encounter type: entry}}, with
+    the chances of every slot a species is in added up (like the wiki does).
+    """
+
+    expanded: dict[str, dict[str, ExpandedEncounterEntry]] = {}
+
+    for ec_type, all_entries in info.encounters.items():
+        slots = ENCOUNTER_SLOTS[ec_type]
+
+        for slot_idx, entry in enumerate(all_entries):
+            by_type = expanded.setdefault(entry.name, {})
+
+            if (existing := by_type.get(ec_type)) is not None:
+                by_type[ec_type] = existing.merged(
+                    chance=slots[slot_idx],
+                    min_level=entry.minimum_level,
+                    max_level=entry.maximum_level,
+                )
+            else:
+                by_type[ec_type] = ExpandedEncounterEntry(
+                    poke_name=entry.name,
+                    chance=slots[slot_idx],
+                    min_level=entry.minimum_level,
+                    max_level=entry.maximum_level,
+                )
+
+    return expanded
+
+
+class EncounterIndex:
+    """
+    An incrementally maintained index of which species can be encountered on which maps.
+    """
+
+    def __init__(self):
+        #: {species name: {map ID: {encounter type: entry}}}, with maps in catalog order.
+        self._by_species: dict[str, dict[int, dict[str, ExpandedEncounterEntry]]] = {}
+
+        #: {map ID: the encounter types that map has}
+        self._map_types: dict[int, frozenset[str]] = {}
+
+        #: {map ID: the species on that map}, for updating maps.
+        self._map_species: dict[int, tuple[str, ...]] = {}
+
+    @classmethod
+    def build(cls, encounters: Mapping[int, MapEncounters]) -> EncounterIndex:
+        """
+        Builds the index for every map in the provided {map ID: encounters} mapping.
+        """
+
+        index = cls()
+
+        for map_id, info in encounters.items():
+            index._add(map_id, info)
+
+        return index
+
+    def _add(self, map_id: int, info: MapEncounters):
+        expanded = expand_map_encounters(info)
+        self._map_types[map_id] = frozenset(info.encounters.keys())
+        self._map_species[map_id] = tuple(expanded.keys())
+
+        for name, by_type in expanded.items():
+            self._by_species.setdefault(name, {})[map_id] = by_type
+
+    def update_map(self, map_id: int, info: MapEncounters | None):
+        """
+        Re-indexes the provided map, e.g. after its encounters were reloaded. If ``info`` is None,
+        the map is removed from the index.
+        """
+
+        self.remove_map(map_id)
+
+        if info is not None:
+            self._add(map_id, info)
+
+    def remove_map(self, map_id: int):
+        """
+        Removes every entry for the provided map, if it's indexed.
+        """
+
+        self._map_types.pop(map_id, None)
+
+        for name in self._map_species.pop(map_id, ()):
+            maps = self._by_species[name]
+            del maps[map_id]
+
+            if not maps:
+                del self._by_species[name]
+
+    def __contains__(self, species: str) -> bool:
+        return species in self._by_species
+
+    def species(self) -> list[str]:
+        """
+        Gets every species that can be encountered somewhere.
+        """
+
+        return list(self._by_species)
+
+    def encounters_for(self, species: str) -> dict[int, dict[str, ExpandedEncounterEntry]]:
+        """
+        Gets every encounter for the provided species, as {map ID: {encounter type: entry}}.
+        Maps updated since the index was built come last.
+
+        The returned dicts are copies, so they can be changed without breaking the index.
+        """
+
+        return {
+            map_id: dict(by_type) for map_id, by_type in self._by_species.get(species, {}).items()
+        }
+
+    def species_on(self, map_id: int, ec_type: str | None = None) -> list[str]:
+        """
+        Gets every species that can be encountered on the provided map, in encounter table order.
+
+        :param ec_type: If provided, only species in this encounter table are returned.
+        """
+
+        names = self._map_species.get(map_id, ())
+        if ec_type is None:
+            return list(names)
+
+        return [it for it in names if ec_type in self._by_species[it][map_id]]
+
+    def maps_for(self, species: str, ec_types: Collection[str] | None = None) -> list[int]:
+        """
+        Gets every map the provided species can be encountered on.
+
+        :param ec_types: If provided, only maps where the species is in one of these encounter
+                         tables are returned.
+        """
+
+        maps = self._by_species.get(species, {})
+        if ec_types is None:
+            return list(maps)
+
+        return [
+            map_id for map_id, by_type in maps.items() if not by_type.keys().isdisjoint(ec_types)
+        ]
+
+    def maps_at_time(self, species: str, time: str) -> list[int]:
+        """
+        Gets every map the provided species can be encountered on at the provided time of day
+        (one of :data:`.TIME_ENCOUNTER_TYPES`), in any encounter table.
+
+        On maps with encounters for that time, those replace the regular ``Land`` encounters.
+        """
+
+        time_type = TIME_ENCOUNTER_TYPES[time]
+        found = []
+
+        for map_id, by_type in self._by_species.get(species, {}).items():
+            replaces_land = time_type in self._map_types[map_id]
+
+            for ec_type in by_type:
+                if ec_type in TIME_ENCOUNTER_TYPES.values():
+                    if ec_type != time_type:
+                        continue
+                elif ec_type == "Land" and replaces_land:
+                    continue
+
+                found.append(map_id)
+                break
+
+        return found
+
+    def area_chances(self, species: str, ec_type: str | None = None) -> dict[int, int]:
+        """
+        Gets the percentage chance that a single encounter on each map is the provided species.
+
+        :param ec_type: The encounter type to get the chance for. If not provided, the best chance
+                        out of every encounter type on that map is used instead.
+        """
+
+        chances: dict[int, int] = {}
+
+        for map_id, by_type in self._by_species.get(species, {}).items():
+            if ec_type is None:
+                chances[map_id] = max(it.chance for it in by_type.values())
+            elif (entry := by_type.get(ec_type)) is not None:
+                chances[map_id] = entry.chance
+
+        return chances
@@ -4,6 +4,7 @@ import attr
 from cattrs import Converter
 from cattrs.gen import make_dict_unstructure_fn
 
+from reborn_rebalance import tracing
 from reborn_rebalance.pbs.pokemon import (
     FormAttributes,
     PokemonSpecies,
@@ -285,23 +286,20 @@ class PokemonForms:
         buffer.write_line("},")
 
 
+@tracing.traced("save_forms", "save")
 def save_forms_to_ruby(output_path: Path, forms: dict[str, PokemonForms]):
     """
     Generates the ruby code for the forms data.
     """
 
-    buffer = RubyBuffer()
-    buffer.write(HEADER)
+    with RubyBuffer.streaming(output_path) as buffer:
+        buffer.write(HEADER)
 
-    buffer.write_line("PokemonForms = {")
+        buffer.write_line("PokemonForms = {")
 
-    with buffer.indented():
-        for form_list in forms.values():
-            form_list.generate_ruby_code(buffer)
-
-    buffer.write_line("}")
-    buffer.write(FOOTER)
+        with buffer.indented():
+            for form_list in forms.values():
+                form_list.generate_ruby_code(buffer)
 
-    with output_path.open(mode="w", encoding="utf-8") as f:
-        print("writing to", output_path, f)
-        f.write(buffer.backing.getvalue())
+        buffer.write_line("}")
+        buffer.write(FOOTER)
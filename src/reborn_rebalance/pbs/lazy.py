@@ -0,0 +1,355 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Iterable, Iterator, Mapping, MutableMapping, MutableSequence
+from pathlib import Path
+from typing import overload
+
+import rtoml
+from typing_extensions import override
+
+from reborn_rebalance.pbs.form import PokemonForms
+from reborn_rebalance.pbs.pokemon import PokemonEvolution, PokemonSpecies
+from reborn_rebalance.pbs.serialisation import (
+    form_toml_files,
+    load_single_form,
+    load_single_species_toml,
+    species_toml_files,
+)
+
+# Lazy species and forms. Most one-off queries only care about a couple of species, but loading
+# the catalog normally means parsing and structuring all ~1,200 species and form files. In lazy
+# mode, the catalog only builds an index of which file each species lives in, and parses them the
+# first time they're actually used.
+#
+# File names can't be used for the name index (e.g. ``0029-nidoran.toml`` is ``NIDORANfE``), so
+# only the top-level keys of every file are parsed up front, which is a lot cheaper than the whole
+# thing.
+
+
+#: Matches the evolution targets in a species file, for the pre-evolution index. These can be
+#: either in an array of tables or an inline array.
+_INTO_NAME = re.compile(r'\binto_name\s*=\s*"([^"\\]*)"')
+
+
+def _scan_top_level(text: str) -> dict[str, object]:
+    # top-level keys have to come before the first table, so everything up to that is a valid
+    # document of its own. unless it's inside a multi-line string or something, in which case just
+    # parse the whole thing.
+    if (table_start := text.find("\n[")) != -1:
+        try:
+            return rtoml.loads(text[:table_start])
+        except rtoml.TomlParsingError:
+            pass
+
+    return rtoml.loads(text)
+
+
+def scan_species(path: Path) -> tuple[str, list[str]]:
+    """
+    Gets the internal name of the species in the provided file, and the internal names of what it
+    evolves into, without fully loading it.
+    """
+
+    text = path.read_text(encoding="utf-8")
+    keys = _scan_top_level(text)
+    evolves_into = _INTO_NAME.findall(text)
+
+    if (internal_name := keys.get("internal_name")) is not None:
+        return str(internal_name), evolves_into
+
+    # same default as PokemonSpecies.internal_name.
+    return str(keys["name"]).upper(), evolves_into
+
+
+def scan_form_name(path: Path) -> str:
+    """
+    Gets the internal name of the species the provided forms file is for, without fully loading
+    it.
+    """
+
+    keys = _scan_top_level(path.read_text(encoding="utf-8"))
+
+    # same default as load_single_form.
+    return str(keys.get("internal_name", path.stem.upper()))
+
+
+class LazySpeciesList(MutableSequence[PokemonSpecies]):
+    """
+    A list of species in Pokédex order that only loads each species the first time it's accessed.
+    """
+
+    def __init__(
+        self,
+        paths: list[Path],
+        scanned: list[tuple[str, list[str]]],
+        on_load: Callable[[PokemonSpecies], None] | None = None,
+    ):
+        self._paths: list[Path | None] = list(paths)
+        self._items: list[PokemonSpecies | None] = [None] * len(paths)
+        self._name_index: dict[str, int] = {}
+        self._pre_evolution_index: dict[str, int] = {}
+
+        for idx, (name, evolves_into) in enumerate(scanned):
+            self._index(idx, name, evolves_into)
+
+        #: Called with every species after it's loaded, e.g. for sorting its TMs.
+        self.on_load = on_load
+
+    @classmethod
+    def from_directory(
+        cls, path: Path, on_load: Callable[[PokemonSpecies], None] | None = None
+    ) -> LazySpeciesList:
+        """
+        Creates a new lazy list from the provided TOML species directory.
+        """
+
+        files = species_toml_files(path)
+        paths: list[Path] = [None] * len(files)  # type: ignore
+
+        for file in files:
+            paths[int(file.name.split("-", 1)[0]) - 1] = file
+
+        for idx, file in enumerate(paths):
+            if file is None:
+                raise ValueError(f"didn't find {idx + 1}")
+
+        return cls(paths, [scan_species(file) for file in paths], on_load)
+
+    def _index(self, idx: int, name: str, evolves_into: Iterable[str]):
+        self._name_index[name] = idx
+
+        for into_name in evolves_into:
+            self._pre_evolution_index[into_name] = idx
+
+    def _unindex(self, idx: int):
+        for index in (self._name_index, self._pre_evolution_index):
+            for name, position in list(index.items()):
+                if position == idx:
+                    del index[name]
+
+    def _load(self, idx: int) -> PokemonSpecies:
+        if (species := self._items[idx]) is not None:
+            return species
+
+        path = self._paths[idx]
+        if path is None:
+            # only happens mid-reload, see EssentialsCatalog.reload_changed.
+            return None  # type: ignore
+
+        _, species = load_single_species_toml(path)
+        if self.on_load is not None:
+            self.on_load(species)
+
+        self._items[idx] = species
+        return species
+
+    @property
+    def loaded_count(self) -> int:
+        """
+        The number of species that have actually been loaded.
+        """
+
+        return sum(1 for it in self._items if it is not None)
+
+    def load_all(self) -> list[PokemonSpecies]:
+        """
+        Loads every species that hasn't been loaded yet.
+        """
+
+        return [self._load(idx) for idx in range(len(self._items))]
+
+    def index_of(self, internal_name: str) -> int | None:
+        """
+        Gets the position of the species with the provided internal name, without loading it.
+        """
+
+        return self._name_index.get(internal_name)
+
+    def pre_evolution_index_of(self, internal_name: str) -> int | None:
+        """
+        Gets the position of the species that evolves into the species with the provided internal
+        name, without loading it.
+        """
+
+        return self._pre_evolution_index.get(internal_name)
+
+    def pre_evolution_names(self) -> Iterable[str]:
+        """
+        Gets the internal names of every species that has a pre-evolution.
+        """
+
+        return self._pre_evolution_index.keys()
+
+    @override
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @overload
+    def __getitem__(self, idx: int) -> PokemonSpecies: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> list[PokemonSpecies]: ...
+
+    @override
+    def __getitem__(self, idx: int | slice) -> PokemonSpecies | list[PokemonSpecies]:
+        if isinstance(idx, slice):
+            return [self._load(it) for it in range(len(self._items))[idx]]
+
+        if idx < 0:
+            idx += len(self._items)
+
+        if not 0 <= idx < len(self._items):
+            raise IndexError(idx)
+
+        return self._load(idx)
+
+    @override
+    def __iter__(self) -> Iterator[PokemonSpecies]:
+        for idx in range(len(self._items)):
+            yield self._load(idx)
+
+    def __setitem__(self, idx: int, value: PokemonSpecies) -> None:  # type: ignore[override]
+        self._unindex(idx)
+        self._items[idx] = value
+        self._paths[idx] = None
+
+        if value is not None:
+            self._index(idx, value.internal_name, (evo.into_name for evo in value.evolutions))
+
+    def __delitem__(self, idx: int) -> None:  # type: ignore[override]
+        raise TypeError("species can't be removed from the dex, only replaced")
+
+    @override
+    def insert(self, idx: int, value: PokemonSpecies) -> None:
+        if idx != len(self._items):
+            raise TypeError("species can only be appended to the dex")
+
+        self._items.append(value)
+        self._paths.append(None)
+        self._index(idx, value.internal_name, (evo.into_name for evo in value.evolutions))
+
+
+class LazySpeciesMapping(Mapping[str, PokemonSpecies]):
+    """
+    A read-only {internal name: species} view over a :class:`.LazySpeciesList`.
+    """
+
+    def __init__(self, species: LazySpeciesList):
+        self._species = species
+
+    @override
+    def __getitem__(self, name: str) -> PokemonSpecies:
+        if (idx := self._species.index_of(name)) is None:
+            raise KeyError(name)
+
+        return self._species[idx]
+
+    @override
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._species.index_of(name) is not None
+
+    @override
+    def __iter__(self) -> Iterator[str]:
+        return (species.internal_name for species in self._species)
+
+    @override
+    def __len__(self) -> int:
+        return len(self._species)
+
+
+class LazyPreEvolutionMapping(Mapping[str, tuple[PokemonSpecies, PokemonEvolution]]):
+    """
+    A read-only {species internal name: (pre-evo species, pre-evolution)} view over a
+    :class:`.LazySpeciesList`. See :attr:`.EssentialsCatalog.pre_evolutionary_cache`.
+    """
+
+    def __init__(self, species: LazySpeciesList):
+        self._species = species
+
+    @override
+    def __getitem__(self, name: str) -> tuple[PokemonSpecies, PokemonEvolution]:
+        if (idx := self._species.pre_evolution_index_of(name)) is None:
+            raise KeyError(name)
+
+        # some species evolve into the same thing in multiple ways (e.g. eevee), and the last
+        # one wins in the eager version.
+        pre_evo = self._species[idx]
+        for evo in reversed(pre_evo.evolutions):
+            if evo.into_name == name:
+                return pre_evo, evo
+
+        raise KeyError(name)
+
+    @override
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._species.pre_evolution_index_of(name) is not None
+
+    @override
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._species.pre_evolution_names()))
+
+    @override
+    def __len__(self) -> int:
+        return len(list(self._species.pre_evolution_names()))
+
+
+class LazyFormsMapping(MutableMapping[str, PokemonForms]):
+    """
+    A mapping of {species internal name: forms} that only loads each forms file the first time
+    it's accessed.
+    """
+
+    def __init__(self, paths: Iterable[tuple[str, Path]]):
+        self._paths: dict[str, Path | None] = dict(paths)
+        self._items: dict[str, PokemonForms] = {}
+
+    @classmethod
+    def from_directory(cls, path: Path) -> LazyFormsMapping:
+        """
+        Creates a new lazy mapping from the provided TOML forms directory.
+        """
+
+        return cls((scan_form_name(file), file) for file in form_toml_files(path))
+
+    @property
+    def loaded_count(self) -> int:
+        """
+        The number of forms files that have actually been loaded.
+        """
+
+        return len(self._items)
+
+    @override
+    def __getitem__(self, name: str) -> PokemonForms:
+        if (forms := self._items.get(name)) is not None:
+            return forms
+
+        path = self._paths[name]
+        if path is None:
+            raise KeyError(name)
+
+        forms = self._items[name] = load_single_form(path)
+        return forms
+
+    @override
+    def __contains__(self, name: object) -> bool:
+        return name in self._paths
+
+    @override
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    @override
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    @override
+    def __setitem__(self, name: str, forms: PokemonForms) -> None:
+        self._paths[name] = None
+        self._items[name] = forms
+
+    @override
+    def __delitem__(self, name: str) -> None:
+        del self._paths[name]
+        self._items.pop(name, None)
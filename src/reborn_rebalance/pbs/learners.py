@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+from collections.abc import Collection
+from typing import TYPE_CHECKING
+
+from reborn_rebalance.pbs.move import MoveMappingEntry, MoveMappingEntryType
+from reborn_rebalance.pbs.pokemon import PokemonSpecies
+
+if TYPE_CHECKING:
+    from reborn_rebalance.pbs.catalog import EssentialsCatalog
+
+# The reverse move mapping, i.e. "who learns this move, and how?". Building it means walking every
+# learnset of every species and form, so rather than doing that every time it's needed, the
+# catalog keeps one of these around and only re-indexes the species that a reload touched.
+#
+# Entries are stored per (move, species), so updating a species only touches the moves it learns
+# (before and after the change). The dex-sorted learner list for each move is built on demand and
+# cached until one of its learners changes.
+
+#: The learn methods that count as learning a move by levelling up.
+LEVEL_UP_METHODS = frozenset(
+    {MoveMappingEntryType.START, MoveMappingEntryType.EVOLUTION, MoveMappingEntryType.LEVEL_UP}
+)
+
+
+def learner_entries_for(
+    catalog: EssentialsCatalog, species: PokemonSpecies
+) -> list[MoveMappingEntry]:
+    """
+    Gets every way the provided species (and its forms) can learn a move, in learnset order: egg
+    moves, TMs, tutor moves, then level-up moves for each form.
+    """
+
+    entries: list[MoveMappingEntry] = []
+    name = species.internal_name
+
+    for moves, type in (
+        (species.raw_egg_moves, MoveMappingEntryType.EGG),
+        (species.raw_tms, MoveMappingEntryType.TM),
+        (species.raw_tutor_moves, MoveMappingEntryType.TUTOR),
+    ):
+        entries.extend(
+            MoveMappingEntry(internal_name=move, type=type, species_name=name) for move in moves
+        )
+
+    for id, _, attrs in catalog.all_forms_for(species):
+        # skip forms with identical level up movesets
+        if id > 0 and attrs.raw_level_up_moves == species.raw_level_up_moves:
+            continue
+
+        for lvl in attrs.raw_level_up_moves:
+            type: MoveMappingEntryType
+
+            match lvl.at_level:
+                case 0:
+                    type = MoveMappingEntryType.EVOLUTION
+
+                case 1:
+                    type = MoveMappingEntryType.START
+
+                case _:
+                    type = MoveMappingEntryType.LEVEL_UP
+
+            entries.append(
+                MoveMappingEntry(
+                    internal_name=lvl.name,
+                    type=type,
+                    species_name=name,
+                    form_id=id,
+                    learned_at=lvl.at_level,
+                )
+            )
+
+    return entries
+
+
+def _matches(
+    entry: MoveMappingEntry,
+    methods: Collection[MoveMappingEntryType] | None,
+    form_id: int | None,
+) -> bool:
+    if methods is not None and entry.type not in methods:
+        return False
+
+    return form_id is None or entry.form_id == form_id
+
+
+class MoveLearnerIndex:
+    """
+    An incrementally maintained index of which species learn which moves.
+
+    Entries for forms only exist for forms whose level-up moves differ from the base form; TM,
+    tutor and egg moves are always recorded against form 0.
+    """
+
+    def __init__(self):
+        #: {species name: every entry for that species, in learnset order}
+        self._by_species: dict[str, tuple[MoveMappingEntry, ...]] = {}
+
+        #: {move name: {species name: entries for that move}}
+        self._by_move: dict[str, dict[str, list[MoveMappingEntry]]] = {}
+
+        #: {species name: dex number}, for ordering learners.
+        self._dex_numbers: dict[str, int] = {}
+
+        #: {move name: learners sorted by dex number}, built on demand.
+        self._sorted: dict[str, list[MoveMappingEntry]] = {}
+        self._move_order: list[str] | None = None
+
+    @classmethod
+    def build(cls, catalog: EssentialsCatalog) -> MoveLearnerIndex:
+        """
+        Builds the index for every species in the provided catalog.
+        """
+
+        index = cls()
+
+        for species in catalog.species:
+            index._add(species, learner_entries_for(catalog, species))
+
+        # moves are added in the order they're first seen, so if the species are in dex order
+        # (they always are, but just in case) that's already the right order.
+        dex_numbers = list(index._dex_numbers.values())
+        if dex_numbers == sorted(dex_numbers):
+            index._move_order = list(index._by_move)
+
+        return index
+
+    def _add(self, species: PokemonSpecies, entries: list[MoveMappingEntry]):
+        name = species.internal_name
+        self._by_species[name] = tuple(entries)
+        self._dex_numbers[name] = species.dex_number
+
+        by_move = self._by_move
+        for entry in entries:
+            if (learners := by_move.get(entry.internal_name)) is None:
+                by_move[entry.internal_name] = {name: [entry]}
+            elif (existing := learners.get(name)) is None:
+                learners[name] = [entry]
+            else:
+                existing.append(entry)
+
+    def update_species(self, catalog: EssentialsCatalog, species: PokemonSpecies):
+        """
+        Re-indexes the provided species, e.g. after it (or its forms) was reloaded.
+        """
+
+        self.remove_species(species.internal_name)
+
+        entries = learner_entries_for(catalog, species)
+        self._add(species, entries)
+
+        for entry in entries:
+            self._sorted.pop(entry.internal_name, None)
+
+        self._move_order = None
+
+    def remove_species(self, name: str):
+        """
+        Removes every entry for the provided species, if it's indexed.
+        """
+
+        if (old := self._by_species.pop(name, None)) is None:
+            return
+
+        del self._dex_numbers[name]
+
+        for move in {it.internal_name for it in old}:
+            learners = self._by_move[move]
+            del learners[name]
+
+            if not learners:
+                del self._by_move[move]
+
+            self._sorted.pop(move, None)
+
+        self._move_order = None
+
+    def __contains__(self, move: str) -> bool:
+        return move in self._by_move
+
+    def _sorted_learners(self, move: str) -> list[MoveMappingEntry]:
+        if (cached := self._sorted.get(move)) is not None:
+            return cached
+
+        by_species = self._by_move.get(move, {})
+        learners = [
+            entry
+            for name in sorted(by_species, key=self._dex_numbers.__getitem__)
+            for entry in by_species[name]
+        ]
+        self._sorted[move] = learners
+        return learners
+
+    def learners(
+        self,
+        move: str,
+        *,
+        methods: Collection[MoveMappingEntryType] | None = None,
+        form_id: int | None = None,
+    ) -> list[MoveMappingEntry]:
+        """
+        Gets every entry for the provided move, sorted by dex number.
+
+        :param methods: If provided, only entries learnt by one of these methods are returned.
+        :param form_id: If provided, only entries for this form are returned.
+        """
+
+        learners = self._sorted_learners(move)
+
+        if methods is None and form_id is None:
+            return list(learners)
+
+        return [it for it in learners if _matches(it, methods, form_id)]
+
+    def learnset(
+        self,
+        species: str,
+        *,
+        methods: Collection[MoveMappingEntryType] | None = None,
+        form_id: int | None = None,
+    ) -> list[MoveMappingEntry]:
+        """
+        Gets every entry for the provided species, in learnset order.
+
+        :param methods: If provided, only entries learnt by one of these methods are returned.
+        :param form_id: If provided, only entries for this form are returned.
+        """
+
+        return [it for it in self._by_species.get(species, ()) if _matches(it, methods, form_id)]
+
+    def moves_for(self, species: str) -> set[str]:
+        """
+        Gets the internal names of every move the provided species can learn, in any form.
+        """
+
+        return {it.internal_name for it in self._by_species.get(species, ())}
+
+    def learns(
+        self,
+        species: str,
+        move: str,
+        *,
+        methods: Collection[MoveMappingEntryType] | None = None,
+    ) -> bool:
+        """
+        Checks if the provided species (in any form) can learn the provided move.
+
+        :param methods: If provided, only these learn methods are considered.
+        """
+
+        entries = self._by_move.get(move, {}).get(species, ())
+        return any(_matches(it, methods, None) for it in entries)
+
+    def moves(self) -> list[str]:
+        """
+        Gets every move learnt by at least one species, in the order they're first encountered
+        when walking every learnset in dex order.
+        """
+
+        if self._move_order is not None:
+            return self._move_order
+
+        def first_seen(move: str) -> tuple[int, int]:
+            first = self._sorted_learners(move)[0]
+            position = self._by_species[first.species_name].index(first)
+            return self._dex_numbers[first.species_name], position
+
+        self._move_order = sorted(self._by_move, key=first_seen)
+        return self._move_order
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import concurrent.futures
+import math
+import os
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import attr
+
+from reborn_rebalance import tracing
+from reborn_rebalance.pbs.form import PokemonForms
+from reborn_rebalance.pbs.pokemon import PokemonSpecies
+from reborn_rebalance.pbs.serialisation import (
+    encounter_toml_files,
+    form_toml_files,
+    load_abilities_from_toml,
+    load_items_from_toml,
+    load_map_metadata_from_toml,
+    load_moves_from_toml,
+    load_single_encounter,
+    load_single_form,
+    load_single_species_toml,
+    load_single_trainer_file_toml,
+    load_tms_from_toml,
+    load_trainer_types_from_toml,
+    species_toml_files,
+    trainer_toml_files,
+)
+from reborn_rebalance.pbs.trainer import TrainerCatalog
+from reborn_rebalance.util import chunks
+
+# The catalog loading scheduler. This used to be six separate process pools that ran one after
+# another (each one paying the worker startup cost again), submitting one tiny task per file. Now
+# every phase goes into a single shared pool as batches of files, and all the phases are
+# interleaved so that the species, forms, encounters and trainers all load at the same time.
+
+#: The mapping of {phase name: per-file loader} for every phase. Flat phases are a single file that
+#: gets loaded as its own task.
+PHASE_LOADERS: dict[str, Callable[[Path], Any]] = {
+    "moves": load_moves_from_toml,
+    "items": load_items_from_toml,
+    "tms": load_tms_from_toml,
+    "abilities": load_abilities_from_toml,
+    "maps": load_map_metadata_from_toml,
+    "trainer_types": load_trainer_types_from_toml,
+    "species": load_single_species_toml,
+    "forms": load_single_form,
+    "encounters": load_single_encounter,
+    "trainers": load_single_trainer_file_toml,
+}
+
+#: The mapping of {flat phase name: file name in the data directory}.
+FLAT_PHASES: dict[str, str] = {
+    "moves": "moves.toml",
+    "items": "items.toml",
+    "tms": "tms.toml",
+    "abilities": "abilities.toml",
+    "maps": "maps.toml",
+    "trainer_types": "trainer_types.toml",
+}
+
+#: The upper bound on the number of files loaded by a single task.
+MAX_CHUNK_SIZE = 32
+
+
+@attr.s(slots=True, kw_only=True)
+class PhaseTiming:
+    """
+    Timing information for a single loading phase.
+    """
+
+    #: The name of this phase.
+    name: str = attr.ib()
+
+    #: The number of files loaded in this phase.
+    files: int = attr.ib(default=0)
+
+    #: The number of tasks submitted for this phase.
+    tasks: int = attr.ib(default=0)
+
+    #: The total time workers spent on this phase, in seconds.
+    busy: float = attr.ib(default=0.0)
+
+    #: When the first task in this phase started, relative to the start of loading.
+    started: float = attr.ib(default=math.inf)
+
+    #: When the last task in this phase finished, relative to the start of loading.
+    finished: float = attr.ib(default=0.0)
+
+
+def _load_chunk(
+    phase: str, paths: list[Path], trace: bool = False
+) -> tuple[list[Any], float, float, list[tracing.SpanEvent]]:
+    """
+    Loads a batch of files for a single phase, inside a worker.
+
+    :param trace: If True, spans are recorded inside the worker and sent back.
+    :return: A tuple of (loaded objects, start timestamp, end timestamp, trace events).
+    """
+
+    # wall clock rather than perf_counter, so the timestamps are comparable between processes.
+    start = time.time()
+    loader = PHASE_LOADERS[phase]
+
+    with (
+        tracing.collect(trace) as events,
+        tracing.span(f"load_chunk:{phase}", "load", files=len(paths)),
+    ):
+        results = [loader(path) for path in paths]
+
+    return results, start, time.time(), events
+
+
+def _chunk_size_for(total_files: int, workers: int) -> int:
+    # aim for a few tasks per worker so that the slow files don't leave the other workers idle,
+    # but not so many that the pickling overhead dominates.
+    return max(1, min(MAX_CHUNK_SIZE, math.ceil(total_files / (workers * 4))))
+
+
+def _phase_files(path: Path, *, skip_species: bool) -> dict[str, list[Path]]:
+    files = {phase: [path / filename] for phase, filename in FLAT_PHASES.items()}
+
+    if not skip_species:
+        files["species"] = species_toml_files(path / "species")
+        files["forms"] = form_toml_files(path / "forms")
+
+    files["encounters"] = encounter_toml_files(path / "encounters")
+    files["trainers"] = trainer_toml_files(path / "trainers")
+    return files
+
+
+def _assemble(phase: str, results: list[Any]) -> Any:
+    """
+    Turns the flat list of per-file results for a phase into the catalog field value.
+    """
+
+    if phase in FLAT_PHASES:
+        return results[0]
+
+    if phase == "species":
+        species: list[PokemonSpecies] = [None] * len(results)  # type: ignore
+        for idx, decoded in results:
+            species[idx - 1] = decoded
+
+        for idx, read_in in enumerate(species):
+            if read_in is None:
+                raise ValueError(f"didn't load {idx + 1}")
+
+        return species
+
+    if phase == "forms":
+        forms: dict[str, PokemonForms] = {}
+        for form in results:
+            forms[form.internal_name] = form
+
+        return forms
+
+    if phase == "encounters":
+        return dict(results)
+
+    if phase == "trainers":
+        return {
+            name: TrainerCatalog(trainer_name=name, trainers=mapping) for name, mapping in results
+        }
+
+    raise ValueError(f"unknown phase {phase}")
+
+
+def load_catalog_fields(
+    path: Path,
+    *,
+    skip_species: bool = False,
+    executor: concurrent.futures.Executor | None = None,
+    workers: int | None = None,
+) -> tuple[dict[str, Any], dict[str, PhaseTiming]]:
+    """
+    Loads every catalog field from the provided ``data`` directory using a single shared worker
+    pool.
+
+    :param executor: The executor to submit tasks to. If not provided, a process pool will be
+                     created (and shut down) just for this load.
+    :param workers: The number of workers the executor has, used for picking the batch size.
+    :return: A tuple of (catalog fields, {phase name: timing}). Species and forms are empty if
+             ``skip_species`` is True.
+    """
+
+    workers = workers or os.cpu_count() or 1
+
+    if executor is None:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            return load_catalog_fields(
+                path, skip_species=skip_species, executor=executor, workers=workers
+            )
+
+    phase_files = _phase_files(path, skip_species=skip_species)
+    chunked_files = {
+        phase: files for phase, files in phase_files.items() if phase not in FLAT_PHASES
+    }
+    chunk_size = _chunk_size_for(sum(len(it) for it in chunked_files.values()), workers)
+
+    timings = {
+        phase: PhaseTiming(name=phase, files=len(files)) for phase, files in phase_files.items()
+    }
+
+    # flat files go first as they're the biggest single tasks (moves.toml especially), then the
+    # batches from each per-file phase are round-robined so everything progresses together.
+    batches: list[tuple[str, int, list[Path]]] = [
+        (phase, 0, phase_files[phase]) for phase in FLAT_PHASES
+    ]
+    per_phase_batches = [
+        [(phase, n, chunk) for n, chunk in enumerate(chunks(files, chunk_size))]
+        for phase, files in chunked_files.items()
+    ]
+    for turn in range(max((len(it) for it in per_phase_batches), default=0)):
+        batches.extend(
+            phase_batches[turn] for phase_batches in per_phase_batches if turn < len(phase_batches)
+        )
+
+    start = time.time()
+    trace = tracing.is_enabled()
+    futures = {}
+    for phase, batch_idx, paths in batches:
+        future = executor.submit(_load_chunk, phase, paths, trace)
+        futures[future] = (phase, batch_idx)
+        timings[phase].tasks += 1
+
+    # batches can finish in any order, so put them back in file order afterwards. this keeps the
+    # dict orderings identical to the old sequential loaders.
+    batch_results: dict[str, dict[int, list[Any]]] = {phase: {} for phase in phase_files}
+    for future in concurrent.futures.as_completed(futures):
+        phase, batch_idx = futures[future]
+        results, task_start, task_end, events = future.result()
+        batch_results[phase][batch_idx] = results
+        tracing.add_events(events)
+
+        timing = timings[phase]
+        timing.busy += task_end - task_start
+        timing.started = min(timing.started, task_start - start)
+        timing.finished = max(timing.finished, task_end - start)
+
+    fields: dict[str, Any] = {}
+    for phase, by_batch in batch_results.items():
+        results = [item for idx in sorted(by_batch) for item in by_batch[idx]]
+        fields[phase] = _assemble(phase, results)
+
+        if phase == "forms":
+            fields["form_files"] = {
+                file.relative_to(path).as_posix(): forms.internal_name
+                for file, forms in zip(phase_files[phase], results, strict=True)
+            }
+
+    if skip_species:
+        fields["species"] = []
+        fields["forms"] = {}
+        fields["form_files"] = {}
+
+    return fields, timings
+
+
+def print_phase_timings(timings: dict[str, PhaseTiming]):
+    """
+    Prints the per-phase timing breakdown of a catalog load.
+    """
+
+    print(f"{'phase':<14} {'files':>6} {'tasks':>6} {'busy':>8} {'start':>8} {'end':>8}")
+    for timing in timings.values():
+        started = 0.0 if timing.started == math.inf else timing.started
+        print(
+            f"{timing.name:<14} {timing.files:>6} {timing.tasks:>6} {timing.busy:>7.2f}s "
+            f"{started:>7.2f}s {timing.finished:>7.2f}s"
+        )
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import bisect
+import types
+from collections.abc import Callable, Iterable, Mapping
+from typing import Generic, TypeVar
+
+# Lookup tables for the flat data (moves, items, abilities, trainer types). Everything used to look
+# these up by scanning the whole list, which is fine once but not from inside a template loop that
+# runs for every page.
+#
+# Each index has exact lookups by internal name, display name and numeric ID, plus case-insensitive
+# and prefix lookups (over both names) for tooling that takes names typed by a human.
+
+T = TypeVar("T")
+
+
+def _fold(name: str) -> str:
+    return name.casefold()
+
+
+class LookupIndex(Generic[T]):
+    """
+    Hash indexes over a list of entities by internal name, display name and ID.
+
+    If multiple entities share a display name (or a name that only differs by case), the first one
+    wins, same as scanning the list would.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[T],
+        *,
+        name: Callable[[T], str],
+        display_name: Callable[[T], str] | None = None,
+        id: Callable[[T], int] | None = None,
+    ):
+        by_name: dict[str, T] = {}
+        by_display_name: dict[str, T] = {}
+        by_id: dict[int, T] = {}
+        folded: dict[str, T] = {}
+
+        for item in items:
+            internal_name = name(item)
+            by_name.setdefault(internal_name, item)
+            folded.setdefault(_fold(internal_name), item)
+
+            if display_name is not None:
+                shown = display_name(item)
+                by_display_name.setdefault(shown, item)
+                folded.setdefault(_fold(shown), item)
+
+            if id is not None:
+                by_id.setdefault(id(item), item)
+
+        #: The mapping of {internal name: entity}.
+        self.by_name: Mapping[str, T] = types.MappingProxyType(by_name)
+
+        #: The mapping of {display name: entity}.
+        self.by_display_name: Mapping[str, T] = types.MappingProxyType(by_display_name)
+
+        #: The mapping of {ID: entity}.
+        self.by_id: Mapping[int, T] = types.MappingProxyType(by_id)
+
+        self._folded = folded
+        # sorted once, so that prefix lookups are a binary search.
+        self._sorted_names = sorted(folded)
+
+    def __len__(self) -> int:
+        return len(self.by_name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.by_name
+
+    def __getitem__(self, name: str) -> T:
+        return self.by_name[name]
+
+    def get(self, name: str) -> T | None:
+        """
+        Gets an entity by internal name, or None if no such entity exists.
+        """
+
+        return self.by_name.get(name)
+
+    def find(self, name: str) -> T | None:
+        """
+        Gets an entity by either its internal name or its display name, ignoring case. Returns None
+        if no such entity exists.
+        """
+
+        if (exact := self.by_name.get(name)) is not None:
+            return exact
+
+        return self._folded.get(_fold(name))
+
+    def with_prefix(self, prefix: str) -> list[T]:
+        """
+        Gets every entity whose internal name or display name starts with the provided prefix,
+        ignoring case, sorted by name.
+        """
+
+        prefix = _fold(prefix)
+        names = self._sorted_names
+        found: dict[int, T] = {}
+
+        for idx in range(bisect.bisect_left(names, prefix), len(names)):
+            if not names[idx].startswith(prefix):
+                break
+
+            item = self._folded[names[idx]]
+            found.setdefault(id(item), item)
+
+        return list(found.values())
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, Self
+
+import attr
+
+from reborn_rebalance.pbs.cache import catalog_input_files, code_fingerprint
+
+if TYPE_CHECKING:
+    from reborn_rebalance.pbs.catalog import EssentialsCatalog
+
+# The data pack. This is the entire data directory compiled down to one file, so that loading
+# the catalog is a single open + mmap instead of walking and parsing ~2,500 tiny TOML files.
+#
+# Layout:
+#
+#   magic (8 bytes) | index offset (u64) | index length (u64) | blobs... | index
+#
+# Every entity (a single species, move, trainer file, etc) is its own pickled blob, so any one
+# of them can be loaded without touching the rest. The raw bytes of every source TOML file are
+# stored too, which is what unpacking and verifying use, and what loading falls back to if the
+# pickles were made by an incompatible version of the code.
+
+#: The magic bytes at the start of every pack file.
+PACK_MAGIC = b"RRPACK\x00\x01"
+
+_HEADER = struct.Struct("<8sQQ")
+
+#: The catalog fields that are lists, mapped to the attribute used for looking entities up by
+#: name. List entities are keyed by their position, as not all of these names are unique.
+LIST_KINDS: dict[str, str] = {
+    "species": "internal_name",
+    "moves": "internal_name",
+    "items": "internal_name",
+    "tms": "move",
+    "abilities": "name",
+}
+
+#: The catalog fields that are dicts. Entities are keyed by their dict key.
+DICT_KINDS = ("forms", "maps", "encounters", "trainer_types", "trainers")
+
+
+@attr.s(slots=True, kw_only=True)
+class KindIndex:
+    """
+    The index for a single kind of entity in a pack.
+    """
+
+    #: The keys of every entity, in catalog order.
+    keys: list[Any] = attr.ib(factory=list)
+
+    #: The mapping of {key: (offset, length)} for every entity blob.
+    entries: dict[Any, tuple[int, int]] = attr.ib(factory=dict)
+
+    #: For list kinds, the mapping of {name: key}. If a name is duplicated, the last one wins,
+    #: same as the catalog's own mappings.
+    names: dict[str, int] = attr.ib(factory=dict)
+
+
+@attr.s(slots=True, kw_only=True)
+class PackIndex:
+    """
+    The index of a pack file, stored at the end.
+    """
+
+    #: The fingerprint of the code that wrote the entity pickles.
+    code_fingerprint: str = attr.ib()
+
+    #: The mapping of {catalog field: index}.
+    kinds: dict[str, KindIndex] = attr.ib(factory=dict)
+
+    #: The mapping of {POSIX path relative to the data directory: (offset, length)} for the raw
+    #: source files.
+    sources: dict[str, tuple[int, int]] = attr.ib(factory=dict)
+
+    #: The mapping of {relative path: SHA-256 digest} for the raw source files.
+    source_digests: dict[str, str] = attr.ib(factory=dict)
+
+    #: The catalog's mapping of {forms file: internal name}. Small enough to not need a blob.
+    form_files: dict[str, str] = attr.ib(factory=dict)
+
+
+class _BlobWriter:
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.offset = _HEADER.size
+
+    def write(self, data: bytes) -> tuple[int, int]:
+        position = (self.offset, len(data))
+        self.file.write(data)
+        self.offset += len(data)
+        return position
+
+
+def write_pack(catalog: EssentialsCatalog, data_dir: Path, output: Path):
+    """
+    Writes the provided catalog (which should have been freshly loaded from ``data_dir``) and the
+    raw source files from ``data_dir`` into a pack file.
+    """
+
+    index = PackIndex(code_fingerprint=code_fingerprint(), form_files=dict(catalog.form_files))
+
+    # write then rename, same as the snapshot cache.
+    temp_path = output.with_name(f"{output.name}.tmp{os.getpid()}")
+    with temp_path.open(mode="wb") as f:
+        f.write(_HEADER.pack(PACK_MAGIC, 0, 0))
+        writer = _BlobWriter(f)
+
+        for kind, name_attr in LIST_KINDS.items():
+            kind_index = index.kinds[kind] = KindIndex()
+
+            for position, entity in enumerate(getattr(catalog, kind)):
+                blob = pickle.dumps(entity, protocol=pickle.HIGHEST_PROTOCOL)
+                kind_index.keys.append(position)
+                kind_index.entries[position] = writer.write(blob)
+                kind_index.names[getattr(entity, name_attr)] = position
+
+        for kind in DICT_KINDS:
+            kind_index = index.kinds[kind] = KindIndex()
+
+            for key, entity in getattr(catalog, kind).items():
+                blob = pickle.dumps(entity, protocol=pickle.HIGHEST_PROTOCOL)
+                kind_index.keys.append(key)
+                kind_index.entries[key] = writer.write(blob)
+
+        for source in catalog_input_files(data_dir):
+            relative = source.relative_to(data_dir).as_posix()
+            data = source.read_bytes()
+            index.sources[relative] = writer.write(data)
+            index.source_digests[relative] = hashlib.sha256(data).hexdigest()
+
+        index_offset = writer.offset
+        index_blob = pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL)
+        f.write(index_blob)
+
+        f.seek(0)
+        f.write(_HEADER.pack(PACK_MAGIC, index_offset, len(index_blob)))
+
+    temp_path.replace(output)
+
+
+class PackReader:
+    """
+    Provides memory-mapped random access to the entities and source files inside a pack.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = path.open(mode="rb")
+
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        try:
+            magic, index_offset, index_length = _HEADER.unpack_from(self._mmap, 0)
+            if magic != PACK_MAGIC:
+                raise ValueError(f"{path} is not a data pack")
+
+            self.index: PackIndex = pickle.loads(self._read(index_offset, index_length))
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object):
+        self.close()
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+    def _read(self, offset: int, length: int) -> bytes:
+        return self._mmap[offset : offset + length]
+
+    @property
+    def is_compatible(self) -> bool:
+        """
+        If the entity pickles in this pack were written by the current version of the code.
+        """
+
+        return self.index.code_fingerprint == code_fingerprint()
+
+    def keys(self, kind: str) -> list[Any]:
+        """
+        Gets the keys of every entity of the provided kind, in catalog order.
+        """
+
+        return self.index.kinds[kind].keys
+
+    def get(self, kind: str, key: Any) -> Any:
+        """
+        Loads a single entity. List kinds (species, moves, etc) can be looked up by either their
+        position or their name.
+        """
+
+        kind_index = self.index.kinds[kind]
+        if key not in kind_index.entries:
+            key = kind_index.names[key]
+
+        return pickle.loads(self._read(*kind_index.entries[key]))
+
+    def iter_kind(self, kind: str) -> Iterator[tuple[Any, Any]]:
+        """
+        Iterates over every (key, entity) of the provided kind, in catalog order.
+        """
+
+        kind_index = self.index.kinds[kind]
+        for key in kind_index.keys:
+            yield key, pickle.loads(self._read(*kind_index.entries[key]))
+
+    def load_fields(self) -> dict[str, Any]:
+        """
+        Loads every entity in this pack, returning the catalog constructor fields.
+        """
+
+        fields: dict[str, Any] = {}
+
+        for kind in LIST_KINDS:
+            fields[kind] = [entity for _, entity in self.iter_kind(kind)]
+
+        for kind in DICT_KINDS:
+            fields[kind] = dict(self.iter_kind(kind))
+
+        fields["form_files"] = dict(self.index.form_files)
+        return fields
+
+    def source_files(self) -> list[str]:
+        """
+        Gets the relative paths of every source file in this pack.
+        """
+
+        return list(self.index.sources.keys())
+
+    def read_source(self, relative: str) -> bytes:
+        """
+        Reads the raw bytes of a single source file.
+        """
+
+        return self._read(*self.index.sources[relative])
+
+    def corrupt_sources(self) -> list[str]:
+        """
+        Gets the list of source files whose contents don't match their recorded digest.
+        """
+
+        return [
+            relative
+            for relative, digest in self.index.source_digests.items()
+            if hashlib.sha256(self.read_source(relative)).hexdigest() != digest
+        ]
+
+    def unpack_sources(self, output_dir: Path):
+        """
+        Writes every source file back out into the provided directory, recreating the original
+        ``data`` layout byte-for-byte.
+        """
+
+        for relative in self.index.sources:
+            output = output_dir / relative
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_bytes(self.read_source(relative))
+
+    def diff_against(self, data_dir: Path) -> set[str]:
+        """
+        Compares the source files in this pack against a data directory.
+
+        :return: The set of relative paths that differ, including added and removed files.
+        """
+
+        on_disk = {it.relative_to(data_dir).as_posix(): it for it in catalog_input_files(data_dir)}
+
+        changed = on_disk.keys() ^ self.index.sources.keys()
+        for relative in on_disk.keys() & self.index.sources.keys():
+            digest = hashlib.sha256(on_disk[relative].read_bytes()).hexdigest()
+            if digest != self.index.source_digests[relative]:
+                changed.add(relative)
+
+        return changed
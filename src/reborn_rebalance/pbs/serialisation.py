@@ -1,16 +1,19 @@
 from __future__ import annotations
 
-import concurrent.futures
 import csv
-from io import StringIO
+from collections.abc import Collection, Mapping
 from pathlib import Path
+from typing import Any
 
 import cattrs
 import rtoml
 from rtoml import load
 from tomli_w import dump
+from typing_extensions import override
 
+from reborn_rebalance import tracing
 from reborn_rebalance.pbs.ability import PokemonAbility
+from reborn_rebalance.pbs.codegen import install_precompiled_hooks
 from reborn_rebalance.pbs.encounters import EncounterParser, MapEncounters
 from reborn_rebalance.pbs.form import PokemonForms, SinglePokemonForm
 from reborn_rebalance.pbs.item import PokemonItem
@@ -26,7 +29,12 @@ from reborn_rebalance.pbs.trainer import (
     TrainerType,
 )
 from reborn_rebalance.pbs.type import PokemonType
-from reborn_rebalance.util import PbsBuffer, StupidFuckingIterationWrapper, chunks
+from reborn_rebalance.util import (
+    PbsBuffer,
+    StupidFuckingIterationWrapper,
+    atomic_write,
+    chunks,
+)
 
 GENERATIONS = [
     # Bulbasaur -> Mew
@@ -58,9 +66,7 @@ def generation_for(dex_number: int) -> int:
     raise ValueError(dex_number)
 
 
-def create_cattrs_converter() -> cattrs.Converter:
-    converter = cattrs.Converter(forbid_extra_keys=True)
-
+def _register_enum_hooks(converter: cattrs.Converter):
     # dump enums via name rather than by value
     for enum in (
         PokemonType,
@@ -74,23 +80,82 @@ def create_cattrs_converter() -> cattrs.Converter:
         converter.register_structure_hook(enum, lambda name, klass: klass[name])
         converter.register_unstructure_hook(enum, lambda it: it.name)
 
+
+def _register_class_hooks(converter: cattrs.Converter):
     TechnicalMachine.add_unstructuring_hook(converter)
     PokemonSpecies.add_unstructuring_hook(converter)
     PokemonItem.add_unstructuring_hook(converter)
-    PokemonForms.add_unstructure_hook(converter)
+    # single forms first, so that the forms hook picks up the single form hook.
     SinglePokemonForm.add_unstructure_hook(converter)
+    PokemonForms.add_unstructure_hook(converter)
     MapMetadata.add_unstructure_hook(converter)
     TrainerType.add_unstructure_hook(converter)
     SingleTrainerPokemon.add_unstructure_hook(converter)
     Trainer.add_unstructure_hook(converter)
     TrainerCatalog.add_unstructure_hook(converter)
 
+
+class PrecompiledConverter(cattrs.Converter):
+    """
+    A converter that uses the precompiled hooks from :mod:`.codegen`. These are installed (and
+    generated, if needed) the first time anything is structured or unstructured, or explicitly with
+    :meth:`.install_hooks`.
+
+    :param cache_dir: The directory to store the generated hooks in. Defaults to
+                      :func:`.hooks_cache_dir`.
+    """
+
+    def __init__(self, cache_dir: Path | None = None):
+        super().__init__(forbid_extra_keys=True)
+        _register_enum_hooks(self)
+
+        self._cache_dir = cache_dir
+        self._hooks_installed = False
+
+    def install_hooks(self):
+        """
+        Installs the precompiled hooks, or the normal hooks if they can't be precompiled. Does
+        nothing if this was already done.
+        """
+
+        if self._hooks_installed:
+            return
+
+        self._hooks_installed = True
+        if not install_precompiled_hooks(self, create_cattrs_converter, self._cache_dir):
+            _register_class_hooks(self)
+
+    @override
+    def structure(self, obj: Any, cl: Any) -> Any:
+        if not self._hooks_installed:
+            self.install_hooks()
+
+        return super().structure(obj, cl)
+
+    @override
+    def unstructure(self, obj: Any, unstructure_as: Any = None) -> Any:
+        if not self._hooks_installed:
+            self.install_hooks()
+
+        return super().unstructure(obj, unstructure_as)
+
+
+def create_cattrs_converter() -> cattrs.Converter:
+    """
+    Creates a plain cattrs converter with the normal hooks for loading and saving all of the data
+    files.
+    """
+
+    converter = cattrs.Converter(forbid_extra_keys=True)
+    _register_enum_hooks(converter)
+    _register_class_hooks(converter)
     return converter
 
 
-CONVERTER = create_cattrs_converter()
+CONVERTER = PrecompiledConverter()
 
 
+@tracing.traced("load_species", "load")
 def load_single_species_toml(path: Path) -> tuple[int, PokemonSpecies]:
     """
     Loads a single species from the provided TOML file.
@@ -98,8 +163,6 @@ def load_single_species_toml(path: Path) -> tuple[int, PokemonSpecies]:
     :return A tuple of (dex number, parsed species).
     """
 
-    print(f"LOAD: {path}")
-
     with path.open(encoding="utf-8", mode="r") as f:
         data = load(f)
 
@@ -117,26 +180,27 @@ def load_all_species_from_pbs(path: Path) -> list[PokemonSpecies]:
     return [PokemonSpecies.from_pbs(key, it) for key, it in raw_data.items() if it]
 
 
-def load_all_species_from_toml(path: Path, *, singlethreaded: bool = False) -> list[PokemonSpecies]:
+def species_toml_files(path: Path) -> list[Path]:
     """
-    Loads all species from the TOML directory, and returns them in Pokédex order.
+    Gets the list of species files in the provided TOML species directory.
     """
 
-    to_read: list[Path] = []
+    return [f for f in path.rglob("*") if not f.is_dir()]
 
-    for f in path.rglob("*"):
-        if f.is_dir():
-            continue
 
-        to_read.append(f)
+def load_all_species_from_toml(path: Path) -> list[PokemonSpecies]:
+    """
+    Loads all species from the TOML directory, and returns them in Pokédex order.
 
-    species: list[PokemonSpecies] = [None] * len(to_read)  # type: ignore
+    This runs in the current process. Full catalog loads go through the shared scheduler in
+    ``loading.py`` instead.
+    """
 
-    with concurrent.futures.ProcessPoolExecutor() as executor:
-        mapping_fn = map if singlethreaded else executor.map
+    to_read = species_toml_files(path)
+    species: list[PokemonSpecies] = [None] * len(to_read)  # type: ignore
 
-        for idx, decoded in mapping_fn(load_single_species_toml, to_read):
-            species[idx - 1] = decoded
+    for idx, decoded in map(load_single_species_toml, to_read):
+        species[idx - 1] = decoded
 
     if __debug__:
         for idx, read_in in enumerate(species):
@@ -146,18 +210,16 @@ def load_all_species_from_toml(path: Path, *, singlethreaded: bool = False) -> l
     return species
 
 
+@tracing.traced("save_species", "save")
 def save_all_species_to_pbs(path: Path, all_species: list[PokemonSpecies]):
     """
     Saves all Pokémon species from the provided list into PBS format.
     """
 
-    buffer = PbsBuffer()
-
-    for idx, species in enumerate(all_species):
-        buffer.write_id_header(idx + 1)
-        species.to_pbs(buffer)
-
-    path.write_text(buffer.backing.getvalue(), encoding="utf-8")
+    with PbsBuffer.streaming(path) as buffer:
+        for idx, species in enumerate(all_species):
+            buffer.write_id_header(idx + 1)
+            species.to_pbs(buffer)
 
 
 def save_single_species_to_toml(output_path: Path, species: PokemonSpecies):
@@ -199,12 +261,12 @@ def save_all_species_to_toml(output_path: Path, input_pokemon: list[PokemonSpeci
         print(f"Saved {name}")
 
 
+@tracing.traced("load_forms", "load")
 def load_single_form(path: Path) -> PokemonForms:
     """
     Loads a single form from the provided path.
     """
 
-    print(f"LOAD (form): {path}")
     with path.open(mode="r", encoding="utf-8") as f:
         forms_for_mon = load(f)
 
@@ -224,28 +286,23 @@ def load_single_form(path: Path) -> PokemonForms:
     return forms_for_mon
 
 
-def load_all_forms(path: Path, *, singlethreaded: bool = False) -> dict[str, PokemonForms]:
+def form_toml_files(path: Path) -> list[Path]:
     """
-    Loads all forms from the provided path.
+    Gets the list of form files in the provided TOML forms directory.
     """
 
-    all_forms = {}
-    to_load: list[Path] = []
-
-    for subfile in path.glob("**/*"):
-        if subfile.is_dir():
-            continue
+    return [f for f in path.glob("**/*") if not f.is_dir() and f.suffix == ".toml"]
 
-        if subfile.suffix != ".toml":
-            continue
 
-        to_load.append(subfile)
+def load_all_forms(path: Path) -> dict[str, PokemonForms]:
+    """
+    Loads all forms from the provided path, in the current process.
+    """
 
-    with concurrent.futures.ProcessPoolExecutor() as executor:
-        mapping_fn = map if singlethreaded else executor.map
+    all_forms = {}
 
-        for forms in mapping_fn(load_single_form, to_load):
-            all_forms[forms.internal_name] = forms
+    for forms in map(load_single_form, form_toml_files(path)):
+        all_forms[forms.internal_name] = forms
 
     return all_forms
 
@@ -261,6 +318,7 @@ def load_moves_from_pbs(path: Path) -> list[PokemonMove]:
         return [PokemonMove.load_from_pbs_line(line) for line in reader if line]
 
 
+@tracing.traced("load_moves", "load")
 def load_moves_from_toml(path: Path) -> list[PokemonMove]:
     """
     Loads all moves from the providied ``moves.TOML`` file.
@@ -289,6 +347,7 @@ def save_moves_to_toml(path: Path, moves: list[PokemonMove]):
         dump(output, f)
 
 
+@tracing.traced("save_moves", "save")
 def save_moves_to_pbs(path: Path, moves: list[PokemonMove]):
     """
     Saves all moves to PBS format (CSV) instead.
@@ -318,6 +377,7 @@ def load_items_from_pbs(path: Path) -> list[PokemonItem]:
     return items
 
 
+@tracing.traced("load_items", "load")
 def load_items_from_toml(path: Path) -> list[PokemonItem]:
     """
     Loads all items from the provided ``items.TOML`` file.
@@ -329,6 +389,7 @@ def load_items_from_toml(path: Path) -> list[PokemonItem]:
     return [CONVERTER.structure(i, PokemonItem) for i in data]
 
 
+@tracing.traced("save_items", "save")
 def save_items_to_pbs(output_path: Path, items: list[PokemonItem]):
     """
     Saves all items to PBS format (CSV) instead.
@@ -387,6 +448,7 @@ def load_tms_from_pbs(path: Path) -> list[TechnicalMachine]:
     return tms
 
 
+@tracing.traced("load_tms", "load")
 def load_tms_from_toml(path: Path) -> list[TechnicalMachine]:
     """
     Loads all TMs from the provided ``technical_machines.TOML`` file.
@@ -422,22 +484,39 @@ def save_tms_to_toml(path: Path, tms: list[TechnicalMachine]):
         # dump(output, f)
 
 
-def save_tms_to_pbs(path: Path, tms: list[TechnicalMachine]):
+@tracing.traced("save_tms", "save")
+def save_tms_to_pbs(
+    path: Path,
+    tms: list[TechnicalMachine],
+    learnsets: Mapping[str, Collection[str]] | None = None,
+):
     """
     Saves all TMs to PBS format (CSV) instead.
 
-    This *requires* that you backfill the ``pokemon`` field!
+    :param learnsets: The mapping of {move: species that learn it}, from
+                      :meth:`.EssentialsCatalog.tm_learnsets`. If not provided, the ``pokemon``
+                      field of each TM is used instead, which *requires* that you backfill it!
     """
 
-    # yay, more stupid formats
-    buffer = StringIO()
-
-    for tm in tms:
-        buffer.write(f"[{tm.move}]\n")
-        buffer.write(",".join(tm.pokemon))
-        buffer.write("\n")
+    # some moves are in the list twice (ROOST...), in which case only the last entry gets the
+    # learners, same as when they were backfilled through the name mapping.
+    last_entries = {tm.move: idx for idx, tm in enumerate(tms)}
 
-    path.write_text(buffer.getvalue(), encoding="utf-8")
+    # yay, more stupid formats
+    with atomic_write(path) as f:
+        for idx, tm in enumerate(tms):
+            if learnsets is None:
+                learners: Collection[str] = tm.pokemon
+            elif last_entries[tm.move] == idx:
+                learners = learnsets[tm.move]
+            else:
+                learners = ()
+
+            f.write(f"[{tm.move}]\n")
+            # sorted, as set order changes between runs and that would make the file different
+            # every build.
+            f.write(",".join(sorted(learners)))
+            f.write("\n")
 
 
 def load_abilities_from_pbs(path: Path) -> list[PokemonAbility]:
@@ -450,6 +529,7 @@ def load_abilities_from_pbs(path: Path) -> list[PokemonAbility]:
         return [PokemonAbility.from_pbs(it) for it in reader]
 
 
+@tracing.traced("load_abilities", "load")
 def load_abilities_from_toml(path: Path) -> list[PokemonAbility]:
     """
     Loads all abilities from TOML format.
@@ -465,6 +545,7 @@ def load_abilities_from_toml(path: Path) -> list[PokemonAbility]:
     return abilities
 
 
+@tracing.traced("save_abilities", "save")
 def save_abilities_to_pbs(path: Path, abilities: list[PokemonAbility]):
     """
     Saves all abilities into the PBS (CSV) format.
@@ -501,12 +582,12 @@ def load_encounters_from_pbs(path: Path) -> dict[int, MapEncounters]:
     return parser.parse()
 
 
+@tracing.traced("load_encounters", "load")
 def load_single_encounter(path: Path) -> tuple[int, MapEncounters]:
     """
     Loads a single encounter from the provided path.
     """
 
-    print(f"LOAD (Encounter): {path}")
     id = int(path.name.split("_", 1)[0])
 
     with path.open(mode="r", encoding="utf-8") as f:
@@ -516,30 +597,29 @@ def load_single_encounter(path: Path) -> tuple[int, MapEncounters]:
     return id, encounter
 
 
-def load_encounters_from_toml(
-    path: Path, *, singlethread: bool = False
-) -> dict[int, MapEncounters]:
+def encounter_toml_files(path: Path) -> list[Path]:
     """
-    Loads the encounters data from the ``encounters.toml`` file.
+    Gets the list of encounter files in the provided TOML encounters directory.
     """
 
-    encounters = {}
-    with concurrent.futures.ProcessPoolExecutor() as executor:
-        mapping_fn = map if singlethread else executor.map
-        filtered_encounters = filter(lambda it: it.suffix == ".toml", path.rglob("*"))
+    return [f for f in path.rglob("*") if f.suffix == ".toml"]
 
-        for id, encounter in mapping_fn(load_single_encounter, filtered_encounters):
-            encounters[id] = encounter
 
-    return encounters
+def load_encounters_from_toml(path: Path) -> dict[int, MapEncounters]:
+    """
+    Loads the encounters data from the ``encounters`` directory, in the current process.
+    """
 
+    return dict(map(load_single_encounter, encounter_toml_files(path)))
 
+
+@tracing.traced("save_encounters", "save")
 def save_encounters_to_pbs(path: Path, data: dict[int, MapEncounters]):
     """
     Saves the encounters data to PBS format.
     """
 
-    with path.open(mode="w", encoding="utf-8") as f:
+    with atomic_write(path) as f:
         # aaaaaaaaahHHHH
 
         sorted_encounters = sorted(data.items(), key=lambda it: it[0])
@@ -602,6 +682,7 @@ def load_map_metadata_from_pbs(path: Path) -> dict[int, MapMetadata]:
     return {id: MapMetadata.from_pbs(id, line) for id, line in raw_data.items()}
 
 
+@tracing.traced("load_maps", "load")
 def load_map_metadata_from_toml(path: Path) -> dict[int, MapMetadata]:
     """
     Loads all map metadata from the TOML file.
@@ -617,14 +698,13 @@ def load_map_metadata_from_toml(path: Path) -> dict[int, MapMetadata]:
     return maps
 
 
+@tracing.traced("save_maps", "save")
 def save_map_metadata_to_pbs(path: Path, maps: dict[int, MapMetadata]):
     """
     Saves all map metadata to PBS format.
     """
 
-    buffer = PbsBuffer()
-
-    with path.open(mode="w", encoding="utf-8") as f:
+    with PbsBuffer.streaming(path) as buffer:
         buffer.backing.write(MAP_DATA_HEADER)
 
         s_maps: list[MapMetadata] = sorted(maps.values(), key=lambda it: it.id)
@@ -632,8 +712,6 @@ def save_map_metadata_to_pbs(path: Path, maps: dict[int, MapMetadata]):
             buffer.write_id_header(f"{meta.id:03d}")
             meta.to_pbs(buffer)
 
-        f.write(buffer.backing.getvalue())
-
 
 def save_map_metadata_to_toml(path: Path, maps: dict[int, MapMetadata]):
     """
@@ -663,6 +741,7 @@ def load_trainer_types_from_pbs(path: Path) -> dict[str, TrainerType]:
     return {it.internal_name: it for it in types}
 
 
+@tracing.traced("load_trainer_types", "load")
 def load_trainer_types_from_toml(path: Path) -> dict[str, TrainerType]:
     """
     Loads all trainer types from TOML.
@@ -679,6 +758,7 @@ def load_trainer_types_from_toml(path: Path) -> dict[str, TrainerType]:
     return types
 
 
+@tracing.traced("save_trainer_types", "save")
 def save_trainer_types_to_pbs(path: Path, types: dict[str, TrainerType]):
     """
     Saves all trainer types to PBS.
@@ -707,13 +787,13 @@ def save_trainer_types_to_toml(path: Path, types: dict[str, TrainerType]):
         dump(output, f)
 
 
+@tracing.traced("load_trainers", "load")
 def load_single_trainer_file_toml(path: Path) -> tuple[str, dict[str, dict[int, Trainer]]]:
     """
     Loads a single trainer file from TOML.
     """
 
     with path.open(encoding="utf-8", mode="r") as f:
-        print(f"LOAD (Trainer): {path}")
         data = load(f)["trainers"]
 
     trainers: dict[str, dict[int, Trainer]] = {}
@@ -728,21 +808,25 @@ def load_single_trainer_file_toml(path: Path) -> tuple[str, dict[str, dict[int,
     return path.stem, trainers
 
 
-def load_trainers_from_toml(path: Path, *, singlethread: bool = False) -> dict[str, TrainerCatalog]:
+def trainer_toml_files(path: Path) -> list[Path]:
     """
-    Loads all trainers from TOML.
+    Gets the list of trainer files in the provided TOML trainers directory.
+    """
+
+    return [f for f in path.rglob("*") if f.suffix == ".toml"]
+
+
+def load_trainers_from_toml(path: Path) -> dict[str, TrainerCatalog]:
+    """
+    Loads all trainers from TOML, in the current process.
     """
 
     trainers: dict[str, TrainerCatalog] = {}
     # yikes!
 
-    with concurrent.futures.ProcessPoolExecutor() as executor:
-        filtered_trainers = filter(lambda it: it.suffix == ".toml", path.rglob("*"))
-        mapping_fn = map if singlethread else executor.map
-
-        for name, mapping in mapping_fn(load_single_trainer_file_toml, filtered_trainers):
-            catalog = TrainerCatalog(trainer_name=name, trainers=mapping)
-            trainers[name] = catalog
+    for name, mapping in map(load_single_trainer_file_toml, trainer_toml_files(path)):
+        catalog = TrainerCatalog(trainer_name=name, trainers=mapping)
+        trainers[name] = catalog
 
     return trainers
 
@@ -803,20 +887,18 @@ def save_trainers_to_toml(path: Path, trainers: dict[str, TrainerCatalog]):
             dump(raw_data, f)
 
 
+@tracing.traced("save_trainers", "save")
 def save_trainers_to_pbs(path: Path, trainers: dict[str, TrainerCatalog]):
     """
     Saves all trainer data to the PBS file.
     """
 
     # yikes
-    buffer = StringIO()
-
-    for catalog in trainers.values():
-        for trainer in catalog.all_trainers():
-            buffer.write("#-------------------\n")
-            trainer.into_pbs(buffer)
-
-    path.write_text(buffer.getvalue(), encoding="utf-8")
+    with atomic_write(path) as f:
+        for catalog in trainers.values():
+            for trainer in catalog.all_trainers():
+                f.write("#-------------------\n")
+                trainer.into_pbs(f)
 
 
 def load_map_names(path: Path) -> dict[int, str]:
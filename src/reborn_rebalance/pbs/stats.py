@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+import numpy as np
+import numpy.typing as npt
+
+from reborn_rebalance.pbs.pokemon import PokemonSpecies
+from reborn_rebalance.pbs.type import PokemonType, defensive_profiles
+
+if TYPE_CHECKING:
+    from reborn_rebalance.pbs.catalog import EssentialsCatalog
+
+# A columnar view of the stats of every species and form, for asking questions across the whole
+# dex ("every form with a BST over 600 and at least 100 speed") without looping over thousands of
+# attrs objects in Python.
+#
+# Every row is one form of one species, in dex order then form order. Each column is a NumPy array
+# with one entry per row, so queries are just boolean masks, e.g.
+#
+#   table.rows((table.bst > 600) & (table.stat("spe") >= 100))
+
+#: The names of the six stats, in column order.
+STAT_NAMES = ("hp", "atk", "def_", "spa", "spd", "spe")
+
+#: Every type, in the order used by the type columns (i.e. by :attr:`.PokemonType.index`).
+ALL_TYPES = tuple(PokemonType)
+
+# (species, form id, form name, is mega, is visual only, base stats + type indexes)
+_Row = tuple[PokemonSpecies, int, str, bool, bool, tuple[int, ...]]
+
+
+class StatTable:
+    """
+    The base stats, EV yields, types and catch rates of every species and form, as NumPy columns.
+    """
+
+    def __init__(self, rows: list[_Row]):
+        count = len(rows)
+
+        #: The internal name of the species each row is for.
+        self.species: npt.NDArray[np.object_] = np.array(
+            [it[0].internal_name for it in rows], dtype=object
+        )
+
+        #: The national dex number of each row.
+        self.dex_number = np.fromiter((it[0].dex_number for it in rows), np.int32, count)
+
+        #: The form ID of each row. Zero is the base form.
+        self.form_id = np.fromiter((it[1] for it in rows), np.int32, count)
+
+        #: The form name of each row.
+        self.form_name: npt.NDArray[np.object_] = np.array([it[2] for it in rows], dtype=object)
+
+        #: If each row is a mega evolution.
+        self.is_mega = np.fromiter((it[3] for it in rows), np.bool_, count)
+
+        #: If each row is a visual-only form, i.e. one without its own definition.
+        self.is_visual_only = np.fromiter((it[4] for it in rows), np.bool_, count)
+
+        packed = np.array([it[5] for it in rows], dtype=np.int32).reshape(count, 8)
+
+        #: The base stats of each row, as an (N, 6) array in :data:`.STAT_NAMES` order.
+        self.base_stats = packed[:, :6]
+
+        #: The primary type of each row, as an index into :data:`.ALL_TYPES`.
+        self.primary_type = packed[:, 6]
+
+        #: The secondary type of each row, as an index into :data:`.ALL_TYPES`. Single-typed rows
+        #: have the same primary and secondary type.
+        self.secondary_type = packed[:, 7]
+
+        #: The base stat total of each row.
+        self.bst = self.base_stats.sum(axis=1)
+
+        #: The base stat total of the species (i.e. the default form) each row belongs to.
+        self.species_bst = np.fromiter((it[0].base_stats.sum() for it in rows), np.int32, count)
+
+        # forms don't have their own EV yield or catch rate, so these come from the species.
+        #: The EV yield of each row, as an (N, 6) array in :data:`.STAT_NAMES` order.
+        self.ev_yield = np.array([tuple(it[0].ev_yield) for it in rows], dtype=np.int32).reshape(
+            count, 6
+        )
+
+        #: The catch rate of each row.
+        self.catch_rate = np.fromiter((it[0].catch_rate for it in rows), np.int32, count)
+
+    @classmethod
+    def build(
+        cls, catalog: EssentialsCatalog, species: Iterable[PokemonSpecies] | None = None
+    ) -> StatTable:
+        """
+        Builds the table for every form of the provided species, defaulting to every species in
+        the catalog.
+        """
+
+        rows: list[_Row] = []
+
+        for sp in catalog.species if species is None else species:
+            forms = catalog.forms.get(sp.internal_name)
+            mega_ids: set[int] = set()
+            defined: set[str] = set()
+
+            if forms is not None:
+                defined.update(forms.forms.keys())
+
+                # a custom mega mapping replaces the regular mega form entirely.
+                if forms.custom_mega_mapping:
+                    mega_ids.update(forms.custom_mega_mapping.values())
+                elif forms.mega_form:
+                    mega_ids.add(forms.mega_form)
+
+            for form_id, form_name, attrs in catalog.all_forms_for(sp):
+                # the implicit base form isn't in the form mapping, but isn't visual-only either.
+                visual_only = (
+                    forms is not None and form_id in forms.form_mapping and form_name not in defined
+                )
+                secondary = attrs.secondary_type or attrs.primary_type
+                packed = (
+                    *attrs.base_stats,
+                    attrs.primary_type.index,
+                    secondary.index,
+                )
+                rows.append((sp, form_id, form_name, form_id in mega_ids, visual_only, packed))
+
+        return cls(rows)
+
+    def __len__(self) -> int:
+        return len(self.species)
+
+    def stat(self, name: str) -> npt.NDArray[np.int32]:
+        """
+        Gets the column for a single base stat, e.g. ``spe``.
+        """
+
+        return self.base_stats[:, STAT_NAMES.index(name)]
+
+    def has_type(self, type: PokemonType) -> npt.NDArray[np.bool_]:
+        """
+        Gets a mask of the rows that have the provided type, in either slot.
+        """
+
+        idx = type.index
+        return (self.primary_type == idx) | (self.secondary_type == idx)
+
+    def defensive_matchups(self) -> npt.NDArray[np.float64]:
+        """
+        Gets the type matchups of every row in one go.
+
+        :return: An ``(N, types)`` array of the multiplier from every attacking type (indexed as in
+                 :data:`.ALL_TYPES`) against each row.
+        """
+
+        return defensive_profiles(self.primary_type, self.secondary_type)
+
+    def rows(self, mask: npt.NDArray[np.bool_]) -> list[tuple[str, int, str]]:
+        """
+        Gets the (species, form ID, form name) for every row selected by the provided mask.
+        """
+
+        (indexes,) = np.nonzero(mask)
+        return [(self.species[idx], int(self.form_id[idx]), self.form_name[idx]) for idx in indexes]
+
+    def percentile_rank(self, column: npt.NDArray[np.integer]) -> npt.NDArray[np.float64]:
+        """
+        Gets the percentile rank (0-100) of every row in the provided column, i.e. the percentage
+        of rows with the same or a lower value. Tied rows get the same rank.
+        """
+
+        ordered = np.sort(column)
+        at_or_below = np.searchsorted(ordered, column, side="right")
+        return (at_or_below * (100.0 / max(len(column), 1))).astype(np.float64, copy=False)
+
+    def type_distribution(
+        self, column: npt.NDArray[np.integer], mask: npt.NDArray[np.bool_] | None = None
+    ) -> dict[PokemonType, tuple[int, float, float, int, int]]:
+        """
+        Summarises the provided column for every type, counting dual-typed rows under both types.
+
+        :param mask: If provided, only the rows selected by this mask are counted.
+        :return: A mapping of {type: (count, mean, median, min, max)}. Types with no rows are
+                 skipped.
+        """
+
+        primary, secondary = self.primary_type, self.secondary_type
+        if mask is not None:
+            primary, secondary, column = primary[mask], secondary[mask], column[mask]
+
+        # dual-typed rows appear once per type; single-typed rows only once.
+        dual = secondary != primary
+        types = np.concatenate([primary, secondary[dual]])
+        values = np.concatenate([column, column[dual]])
+
+        order = np.argsort(types, kind="stable")
+        types, values = types[order], values[order]
+        starts = np.searchsorted(types, np.arange(len(ALL_TYPES) + 1))
+
+        result: dict[PokemonType, tuple[int, float, float, int, int]] = {}
+        for idx, type in enumerate(ALL_TYPES):
+            group = values[starts[idx] : starts[idx + 1]]
+            if not len(group):
+                continue
+
+            result[type] = (
+                len(group),
+                float(group.mean()),
+                float(np.median(group)),
+                int(group.min()),
+                int(group.max()),
+            )
+
+        return result
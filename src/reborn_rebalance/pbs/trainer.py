@@ -3,7 +3,7 @@ from __future__ import annotations
 import csv
 from collections.abc import Iterable, Iterator
 from functools import partial
-from io import StringIO
+from typing import TextIO
 
 import attr
 import cattrs.gen
@@ -373,7 +373,7 @@ class Trainer:
             pokemon=pokes,
         )
 
-    def into_pbs(self, buffer: StringIO):
+    def into_pbs(self, buffer: TextIO):
         """
         Writes this trainer out in PBS format.
         """
@@ -1,6 +1,11 @@
 from __future__ import annotations
 
 import enum
+import functools
+from io import StringIO
+
+import numpy as np
+import numpy.typing as npt
 
 from reborn_rebalance.util import PbsBuffer
 
@@ -88,37 +93,139 @@ class PokemonType(enum.Enum):
 
         self.special_type = special_type
 
+    # these are read back out of the type chart rather than cached on the member, so they can
+    # never disagree with it.
+
     @property
     def weaknesses(self) -> list[PokemonType]:
         """
-        The resolved list of weaknesses that this type has.
+        The list of types that are super effective against this type.
         """
 
-        return [PokemonType[it] for it in self._unresolved_weaknesses]
+        return self._attackers(2.0, self._unresolved_weaknesses)
 
     @property
     def resistances(self) -> list[PokemonType]:
         """
-        The resolved list of resistances that this type has.
+        The list of types that are not very effective against this type.
         """
 
-        return [PokemonType[it] for it in self._unresolved_resistances]
+        return self._attackers(0.5, self._unresolved_resistances)
 
     @property
     def immunities(self) -> list[PokemonType]:
         """
-        The resolved list of immunities that this type has.
+        The list of types that have no effect against this type.
         """
 
-        return [PokemonType[it] for it in self._unresolved_immunities]
+        return self._attackers(0.0, self._unresolved_immunities)
+
+    def _attackers(self, multiplier: float, declared: list[str]) -> list[PokemonType]:
+        column = type_chart()[:, self.index]
+        found = [it for it in PokemonType if column[it.index] == multiplier]
+
+        # in the order they were declared in, so that dump_types matches the stock types.txt.
+        order = {name: idx for idx, name in enumerate(declared)}
+        return sorted(found, key=lambda it: order.get(it.name, len(order)))
+
+    @property
+    def index(self) -> int:
+        """
+        The index of this type in the type chart, which is also its ID in types.txt.
+        """
+
+        return _TYPE_INDEXES[self]
+
+
+#: The index of every type, in definition order.
+_TYPE_INDEXES = {type: idx for idx, type in enumerate(PokemonType)}
+
+
+@functools.cache
+def type_chart() -> npt.NDArray[np.float64]:
+    """
+    Gets the type effectiveness chart, as an array of ``[attacking type, defending type]``
+    multipliers indexed by :attr:`.PokemonType.index`.
+
+    This is built once from the weaknesses, resistances and immunities each type is defined with,
+    on first use (so after any custom tweaks have been applied). Everything else, including
+    :func:`.dump_types`, reads the types back out of this chart.
+    """
+
+    chart = np.ones((len(PokemonType), len(PokemonType)))
+
+    for defending in PokemonType:
+        for name in defending._unresolved_weaknesses:
+            chart[PokemonType[name].index, defending.index] = 2.0
+
+        for name in defending._unresolved_resistances:
+            chart[PokemonType[name].index, defending.index] = 0.5
+
+        for name in defending._unresolved_immunities:
+            chart[PokemonType[name].index, defending.index] = 0.0
+
+    chart.flags.writeable = False
+    return chart
+
+
+@functools.cache
+def dual_type_chart() -> npt.NDArray[np.float64]:
+    """
+    Gets the defensive multipliers for every pair of types, as an array of ``[primary type,
+    secondary type, attacking type]`` multipliers. Pairs of the same type are single-typed.
+    """
+
+    # chart[attacking, defending] -> per defending type, the multipliers from every attacker.
+    defending = type_chart().T
+    pairs = defending[:, np.newaxis, :] * defending[np.newaxis, :, :]
+
+    # a single-typed pokemon doesn't get double weaknesses from its one type.
+    single = np.arange(len(PokemonType))
+    pairs[single, single] = defending
+
+    pairs.flags.writeable = False
+    return pairs
+
+
+def effectiveness(attacking: PokemonType, defending: PokemonType) -> float:
+    """
+    Gets the multiplier for a move of the attacking type hitting a Pokémon of the defending type.
+    """
+
+    return float(type_chart()[attacking.index, defending.index])
+
+
+def defensive_profile(
+    primary: PokemonType, secondary: PokemonType | None = None
+) -> dict[PokemonType, float]:
+    """
+    Gets the multiplier from every attacking type against a Pokémon with the provided types.
+    """
+
+    row = dual_type_chart()[primary.index, (secondary or primary).index]
+    return {type: float(row[idx]) for idx, type in enumerate(PokemonType)}
+
+
+def defensive_profiles(
+    primary: npt.NDArray[np.integer], secondary: npt.NDArray[np.integer]
+) -> npt.NDArray[np.float64]:
+    """
+    Gets the defensive multipliers for many Pokémon at once, from arrays of their primary and
+    secondary type indexes (single-typed Pokémon having the same index twice).
+
+    :return: An ``(N, types)`` array of the multiplier from every attacking type for each Pokémon.
+    """
+
+    return dual_type_chart()[primary, secondary]
 
 
 def dump_types() -> str:
     """
-    Dumps all types into a PBS types.txt format.
+    Dumps all types into a PBS types.txt format, from the type chart.
     """
 
-    buffer = PbsBuffer()
+    output = StringIO()
+    buffer = PbsBuffer(output)
 
     for idx, type in enumerate(PokemonType):
         type: PokemonType
@@ -148,7 +255,7 @@ def dump_types() -> str:
         # extra newline, to keep in line with the stock format.
         buffer.backing.write("\n")
 
-    return buffer.backing.getvalue()
+    return output.getvalue()
 
 
 # Apply custom type tweaks here.
@@ -0,0 +1,475 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from functools import partial
+from io import StringIO
+from pathlib import Path
+from typing import Any
+
+import jinja2
+from rtoml import load
+from tomli_w import dump
+from typing_extensions import override
+
+from reborn_rebalance.building.web import WebsiteBuilder
+from reborn_rebalance.pbs.ability import PokemonAbility
+from reborn_rebalance.pbs.catalog import EssentialsCatalog
+from reborn_rebalance.pbs.encounters import MapEncounters
+from reborn_rebalance.pbs.form import PokemonForms
+from reborn_rebalance.pbs.item import PokemonItem
+from reborn_rebalance.pbs.map import MapMetadata
+from reborn_rebalance.pbs.move import PokemonMove
+from reborn_rebalance.pbs.pokemon import PokemonSpecies
+from reborn_rebalance.pbs.serialisation import (
+    CONVERTER,
+    encounter_toml_files,
+    form_toml_files,
+    species_toml_files,
+    trainer_toml_files,
+)
+from reborn_rebalance.pbs.tm import TechnicalMachine
+from reborn_rebalance.pbs.trainer import Trainer, TrainerType
+
+# The benchmark harness. This times every stage of the pipeline (loading, PBS export, and the
+# website build) against a data directory, optionally scaled up, and spits out the results as JSON
+# so that two commits can be compared with ``bench compare``.
+#
+# All times are in seconds. With ``--repeat``, every stage is run multiple times and the fastest
+# run is reported, as that's the least noisy number.
+
+#: Bump this whenever the layout of the results changes.
+RESULTS_VERSION = 1
+
+#: The mapping of {flat file: (top-level keys, class)} for the single-file TOML inputs.
+FLAT_FILES: dict[str, tuple[list[str], type]] = {
+    "moves.toml": (["moves"], PokemonMove),
+    "items.toml": (["items"], PokemonItem),
+    "tms.toml": (["tm", "tutor"], TechnicalMachine),
+    "abilities.toml": (["abilities"], PokemonAbility),
+    "maps.toml": (["maps"], MapMetadata),
+    "trainer_types.toml": (["trainer_types"], TrainerType),
+}
+
+
+@contextlib.contextmanager
+def _quiet() -> Iterator[None]:
+    # the loaders and savers print a line per file.
+    with contextlib.redirect_stdout(StringIO()):
+        yield
+
+
+def _timed(fn: Callable[[], Any]) -> tuple[float, Any]:
+    before = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - before, result
+
+
+def _files_for(data_dir: Path, kind: str) -> list[Path]:
+    if kind in FLAT_FILES:
+        return [data_dir / kind]
+
+    finders = {
+        "species": species_toml_files,
+        "forms": form_toml_files,
+        "encounters": encounter_toml_files,
+        "trainers": trainer_toml_files,
+    }
+    return finders[kind](data_dir / kind)
+
+
+def _structure(kind: str, path: Path, data: dict[str, Any]):
+    # same as what the loaders in serialisation do after parsing.
+    if kind in FLAT_FILES:
+        keys, klass = FLAT_FILES[kind]
+
+        for key in keys:
+            items = data[key]
+            for item in items.values() if isinstance(items, dict) else items:
+                CONVERTER.structure(item, klass)
+
+    elif kind == "species":
+        CONVERTER.structure(data, PokemonSpecies)
+
+    elif kind == "forms":
+        data.setdefault("internal_name", path.stem.upper())
+        CONVERTER.structure(data, PokemonForms)
+
+    elif kind == "encounters":
+        CONVERTER.structure(data, MapEncounters)
+
+    elif kind == "trainers":
+        for all_values in data["trainers"].values():
+            for trainer in all_values.values():
+                CONVERTER.structure(trainer, Trainer)
+
+
+def _parse_all(files: list[Path]) -> list[tuple[Path, dict[str, Any]]]:
+    return [(path, load(path)) for path in files]
+
+
+def _structure_all(kind: str, parsed: list[tuple[Path, dict[str, Any]]]):
+    for path, data in parsed:
+        _structure(kind, path, data)
+
+
+def bench_loading(data_dir: Path) -> tuple[dict[str, Any], EssentialsCatalog]:
+    """
+    Times parsing, structuring, sorting and validating the catalog.
+    """
+
+    results: dict[str, Any] = {"toml_parse": {}, "structure": {}}
+
+    for kind in [*FLAT_FILES, "species", "forms", "encounters", "trainers"]:
+        files = _files_for(data_dir, kind)
+        parse_time, parsed = _timed(partial(_parse_all, files))
+        structure_time, _ = _timed(partial(_structure_all, kind, parsed))
+
+        results["toml_parse"][kind] = parse_time
+        results["structure"][kind] = structure_time
+
+    with _quiet():
+        results["load_single_threaded"], _ = _timed(
+            lambda: EssentialsCatalog.load_from_toml(
+                data_dir, single_threaded=True, use_cache=False
+            )
+        )
+        results["load"], catalog = _timed(
+            lambda: EssentialsCatalog.load_from_toml(data_dir, use_cache=False)
+        )
+
+        results["sort"], _ = _timed(catalog._sort)
+        results["validate"], _ = _timed(catalog._validate)
+
+    return results, catalog
+
+
+def bench_export(catalog: EssentialsCatalog, output_dir: Path) -> dict[str, Any]:
+    """
+    Times writing every Essentials file, and building the move mapping.
+    """
+
+    results: dict[str, Any] = {"save_to_essentials": {}}
+
+    (output_dir / "PBS").mkdir(parents=True, exist_ok=True)
+    (output_dir / "Scripts").mkdir(parents=True, exist_ok=True)
+
+    with _quiet():
+        results["tm_learnsets"], tm_learnsets = _timed(catalog.tm_learnsets)
+
+        for name, writer in catalog.essentials_writers(output_dir, tm_learnsets).items():
+            results["save_to_essentials"][name], _ = _timed(writer)
+
+    results["build_move_mapping"], _ = _timed(catalog.build_move_mapping)
+    return results
+
+
+def _timed_template_class(timings: dict[str, dict[str, Any]]) -> type[jinja2.Template]:
+    class TimedTemplate(jinja2.Template):
+        @override
+        def render(self, *args: Any, **kwargs: Any) -> str:
+            before = time.perf_counter()
+            try:
+                return super().render(*args, **kwargs)
+            finally:
+                timing = timings.setdefault(str(self.name), {"count": 0, "total": 0.0})
+                timing["count"] += 1
+                timing["total"] += time.perf_counter() - before
+
+    return TimedTemplate
+
+
+def bench_web(
+    catalog: EssentialsCatalog, data_dir: Path, template_dir: Path, output_dir: Path
+) -> dict[str, Any]:
+    """
+    Times rendering every page of the website, both per render method and per template.
+    """
+
+    empty = output_dir / "empty"
+    empty.mkdir(parents=True, exist_ok=True)
+
+    templates: dict[str, dict[str, Any]] = {}
+    results: dict[str, Any] = {"pages": {}, "templates": templates}
+
+    with _quiet():
+        results["setup"], builder = _timed(
+            lambda: WebsiteBuilder(
+                catalog=catalog,
+                input_dir=data_dir,
+                template_dir=template_dir,
+                output_dir=output_dir / "site",
+                pokesprites=empty,
+                maps_dir=empty,
+                skip_unchanged=False,
+            )
+        )
+
+        # the template class is only used for newly loaded templates.
+        builder.env.template_class = _timed_template_class(templates)
+        builder.env.cache.clear()
+        (output_dir / "site").mkdir(parents=True, exist_ok=True)
+
+        stages: dict[str, Callable[[], Any]] = {
+            "page_views": lambda: builder.views,
+            "index_pages": builder.render_index_pages,
+            "species_pages": lambda: builder.render_species_pages(catalog.species),
+            "move_pages": builder.render_move_pages,
+            "map_pages": lambda: builder.render_map_pages(catalog.maps.keys()),
+            "trainer_pages": lambda: builder.render_trainer_pages(catalog.trainers.keys()),
+            "walkthrough_pages": builder.render_walkthrough_pages,
+        }
+
+        for name, stage in stages.items():
+            # tqdm writes to stderr.
+            with contextlib.redirect_stderr(StringIO()):
+                results["pages"][name], _ = _timed(stage)
+
+    return results
+
+
+def make_scaled_dataset(data_dir: Path, output_dir: Path, scale: int):
+    """
+    Creates a copy of the provided data directory with ``scale`` copies of every species, form and
+    trainer file. Copies get a ``_N`` suffix on their internal names, and evolve into each other.
+    """
+
+    shutil.copytree(data_dir, output_dir, dirs_exist_ok=True)
+
+    species_files = species_toml_files(data_dir / "species")
+    species_count = len(species_files)
+
+    for copy in range(1, scale):
+        species_dir = output_dir / "species" / f"scaled_{copy}"
+        species_dir.mkdir(parents=True, exist_ok=True)
+
+        for file in species_files:
+            data = load(file)
+            data["dex_number"] += copy * species_count
+            internal_name = data.get("internal_name", str(data["name"]).upper())
+            data["internal_name"] = f"{internal_name}_{copy}"
+
+            for evo in data.get("evolutions", []):
+                evo["into_name"] = f"{evo['into_name']}_{copy}"
+
+            name = file.name.split("-", 1)[1]
+            with (species_dir / f"{data['dex_number']:04d}-{name}").open(mode="wb") as f:
+                dump(data, f)
+
+        for file in form_toml_files(data_dir / "forms"):
+            data = load(file)
+            internal_name = data.get("internal_name", file.stem.upper())
+            data["internal_name"] = f"{internal_name}_{copy}"
+
+            with (output_dir / "forms" / f"{file.stem}_{copy}.toml").open(mode="wb") as f:
+                dump(data, f)
+
+        for file in trainer_toml_files(data_dir / "trainers"):
+            shutil.copyfile(file, output_dir / "trainers" / f"{file.stem}_{copy}.toml")
+
+
+def _best_of(runs: list[Any]) -> Any:
+    # nested dicts of timings get the fastest time for each leaf.
+    first = runs[0]
+
+    if isinstance(first, dict):
+        return {key: _best_of([run[key] for run in runs]) for key in first}
+
+    if isinstance(first, float):
+        return min(runs)
+
+    return first
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    data_dir: Path, template_dir: Path | None, *, scale: int, repeat: int
+) -> dict[str, Any]:
+    """
+    Runs every benchmark, returning the results.
+    """
+
+    with tempfile.TemporaryDirectory() as dir:
+        work_dir = Path(dir)
+
+        if scale > 1:
+            scaled = work_dir / "data"
+            make_scaled_dataset(data_dir, scaled, scale)
+            data_dir = scaled
+
+        runs = []
+        for n in range(repeat):
+            print(f"Run {n + 1}/{repeat}...", file=sys.stderr)
+
+            loading, catalog = bench_loading(data_dir)
+            run = {
+                "loading": loading,
+                "export": bench_export(catalog, work_dir / f"export_{n}"),
+            }
+
+            if template_dir is not None:
+                run["web"] = bench_web(catalog, data_dir, template_dir, work_dir / f"web_{n}")
+
+            runs.append(run)
+
+        catalog_info = {
+            "species": len(catalog.species),
+            "forms": len(catalog.forms),
+            "moves": len(catalog.moves),
+            "encounters": len(catalog.encounters),
+            "trainers": len(catalog.trainers),
+        }
+
+    return {
+        "version": RESULTS_VERSION,
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "repeat": repeat,
+        "catalog": catalog_info,
+        "stages": _best_of(runs),
+    }
+
+
+def _flatten(stages: dict[str, Any], prefix: str = "") -> dict[str, float]:
+    flat: dict[str, float] = {}
+
+    for key, value in stages.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        elif isinstance(value, float):
+            flat[name] = value
+
+    return flat
+
+
+def compare_results(old: dict[str, Any], new: dict[str, Any], threshold: float) -> bool:
+    """
+    Prints a comparison of two sets of results.
+
+    :param threshold: The relative slowdown above which a stage counts as a regression, e.g.
+                      ``0.1`` for 10%.
+    :return: True if any stage regressed.
+    """
+
+    if old.get("scale") != new.get("scale"):
+        print(f"warning: comparing scale {old.get('scale')} against scale {new.get('scale')}")
+
+    old_stages, new_stages = _flatten(old["stages"]), _flatten(new["stages"])
+    regressed = False
+
+    print(f"{'stage':<60} {'old':>9} {'new':>9} {'change':>8}")
+    for name, new_time in new_stages.items():
+        if (old_time := old_stages.get(name)) is None:
+            print(f"{name:<60} {'-':>9} {new_time:>8.3f}s")
+            continue
+
+        change = (new_time - old_time) / old_time if old_time else 0.0
+        marker = ""
+        if change > threshold:
+            regressed = True
+            marker = " !"
+
+        print(f"{name:<60} {old_time:>8.3f}s {new_time:>8.3f}s {change:>+7.1%}{marker}")
+
+    return regressed
+
+
+def _run(args: argparse.Namespace) -> int:
+    data_dir: Path = args.INPUT
+    if not data_dir.is_dir():
+        print(f"{data_dir} doesn't exist")
+        return 1
+
+    template_dir: Path | None = None if args.skip_web else args.templates
+    if template_dir is not None and not template_dir.is_dir():
+        print(f"{template_dir} doesn't exist, pass --skip-web to skip the website benchmarks")
+        return 1
+
+    results = run_benchmarks(data_dir, template_dir, scale=args.scale, repeat=args.repeat)
+    output = json.dumps(results, indent=2)
+
+    if args.output is None:
+        print(output)
+    else:
+        args.output.write_text(output + "\n")
+
+    return 0
+
+
+def _compare(args: argparse.Namespace) -> int:
+    old = json.loads(args.OLD.read_text())
+    new = json.loads(args.NEW.read_text())
+    return int(compare_results(old, new, args.threshold))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks loading, exporting and building")
+    subparsers = parser.add_subparsers(required=True)
+
+    run_parser = subparsers.add_parser("run", help="Runs the benchmarks and outputs JSON")
+    run_parser.add_argument("INPUT", help="The input data directory", type=Path)
+    run_parser.add_argument(
+        "--templates",
+        help="The website templates directory",
+        type=Path,
+        default=Path.cwd() / "templates",
+    )
+    run_parser.add_argument(
+        "--skip-web", help="Skips the website benchmarks", action="store_true", default=False
+    )
+    run_parser.add_argument(
+        "--scale",
+        help="Benchmarks against a synthetic dataset with this many copies of every species, form "
+        "and trainer",
+        type=int,
+        default=1,
+    )
+    run_parser.add_argument(
+        "--repeat",
+        help="The number of times to run every stage. The fastest run is reported",
+        type=int,
+        default=1,
+    )
+    run_parser.add_argument(
+        "--output", help="The file to write the results to, instead of stdout", type=Path
+    )
+    run_parser.set_defaults(fn=_run)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Compares two sets of results, exiting with 1 if anything regressed"
+    )
+    compare_parser.add_argument("OLD", help="The baseline results", type=Path)
+    compare_parser.add_argument("NEW", help="The new results", type=Path)
+    compare_parser.add_argument(
+        "--threshold",
+        help="The relative slowdown that counts as a regression",
+        type=float,
+        default=0.1,
+    )
+    compare_parser.set_defaults(fn=_compare)
+
+    args = parser.parse_args()
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+import argparse
+import contextlib
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+
+from reborn_rebalance.pbs.catalog import EssentialsCatalog
+from reborn_rebalance.pbs.stats import ALL_TYPES, STAT_NAMES
+from reborn_rebalance.pbs.type import PokemonType
+
+# Prints a quick balance overview of the whole dex: how each type's forms compare, and which forms
+# stick out the most. Mostly useful for eyeballing the effects of a batch of stat changes.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prints a balance report of every species' stats")
+    parser.add_argument("INPUT", help="The input data directory", type=Path)
+    parser.add_argument(
+        "--top", help="How many of the highest BST forms to list", type=int, default=15
+    )
+    parser.add_argument(
+        "--include-megas",
+        help="Include mega evolutions in the report",
+        action="store_true",
+    )
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(StringIO()):
+        catalog = EssentialsCatalog.load_from_toml(args.INPUT)
+
+    table = catalog.stat_table
+
+    # visual-only forms are just copies of their base form, so would count twice.
+    mask = ~table.is_visual_only
+    if not args.include_megas:
+        mask &= ~table.is_mega
+
+    print(f"=== {mask.sum()} forms ===\n")
+
+    print(f"{'Type':<10} {'Count':>5} {'Mean':>7} {'Median':>7} {'Min':>5} {'Max':>5}")
+    distribution = table.type_distribution(table.bst, mask)
+    for type, (count, mean, median, low, high) in distribution.items():
+        print(
+            f"{type.localised_name:<10} {count:>5} {mean:>7.1f} {median:>7.1f} {low:>5} {high:>5}"
+        )
+
+    print(f"\n{'Attacking':<10} {'Weak':>5} {'Resist':>6} {'Immune':>6}")
+    matchups = table.defensive_matchups()[mask]
+    for idx, type in enumerate(ALL_TYPES):
+        if type == PokemonType.QMARKS:
+            continue
+
+        column = matchups[:, idx]
+        weak = (column > 1).sum()
+        resist = ((column < 1) & (column > 0)).sum()
+        immune = (column == 0).sum()
+        print(f"{type.localised_name:<10} {weak:>5} {resist:>6} {immune:>6}")
+
+    print(f"\n=== Top {args.top} by BST ===\n")
+
+    # ranked against the whole dex, megas and all.
+    ranks = table.percentile_rank(table.bst)
+    (candidates,) = np.nonzero(mask)
+    for idx in candidates[np.argsort(-table.bst[candidates], kind="stable")][: args.top]:
+        stats = " / ".join(
+            f"{name}: {value}"
+            for name, value in zip(STAT_NAMES, table.base_stats[idx], strict=True)
+        )
+        print(
+            f"{table.species[idx]} (form {table.form_id[idx]}, {table.form_name[idx]}):"
+            f" {table.bst[idx]} BST,"
+            f" {ranks[idx]:.1f}th percentile ({stats})"
+        )
+
+
+if __name__ == "__main__":
+    main()
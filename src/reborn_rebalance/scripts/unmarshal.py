@@ -4,6 +4,8 @@ import sys
 from pathlib import Path
 from typing import Any, TypeVar
 
+import numpy as np
+import numpy.typing as npt
 from rubymarshal.classes import ClassRegistry, RubyObject, RubyString, UserDef
 from rubymarshal.reader import load, loads
 from typing_extensions import override
@@ -22,15 +24,22 @@ _hotpatch._patch()
 class RgssTable(UserDef):
     """
     Represents the RGSS Table class. Like a shitty 3D array.
+
+    The data is exposed as a NumPy array of shape ``(z, y, x)`` directly over the marshalled
+    bytes, without copying. Unused dimensions are 1, so a 1D table is ``(1, 1, x)``.
     """
 
     ruby_class_name = "Table"
 
+    #: The size of the header before the data, (dimensions, x, y, z, size).
+    HEADER = struct.Struct("<5L")
+
     def __init__(self, ruby_class_name=None, attributes=None):
         super().__init__(ruby_class_name=ruby_class_name, attributes=attributes)
 
-        # the actual raw map data
-        self.raw_data: list[int] = []
+        #: The actual table data, as little-endian unsigned shorts. Read-only, as it's a view
+        #: over the marshal data.
+        self.data: npt.NDArray[np.uint16] = np.zeros((0, 0, 0), dtype="<u2")
 
         # dimensions? not sure
         self.dim = 0
@@ -45,15 +54,36 @@ class RgssTable(UserDef):
     @override
     def _load(self, private_data: bytes):
         # native endian, lol. why.
-        header = struct.calcsize("<5L")
-        self.dim, self.x, self.y, self.z, size = struct.unpack("<5L", private_data[:header])
+        self.dim, self.x, self.y, self.z, size = self.HEADER.unpack_from(private_data)
 
-        map_data = private_data[header:]
         # array of LE shorts
+        map_data = memoryview(private_data)[self.HEADER.size :]
         if len(map_data) // 2 != size:
             raise ValueError(f"expected {size} bytes, got {len(map_data)}")
 
-        self.raw_data = [i[0] for i in struct.iter_unpack("<H", map_data)]
+        self.data = np.frombuffer(map_data, dtype="<u2").reshape(self.z, self.y, self.x)
+
+    @override
+    def _dump(self) -> bytes:
+        header = self.HEADER.pack(self.dim, self.x, self.y, self.z, self.data.size)
+        return header + self.data.astype("<u2", copy=False).tobytes()
+
+    @property
+    def flat(self) -> npt.NDArray[np.uint16]:
+        """
+        The table data as a flat array, in serialised order (x, then y, then z).
+        """
+
+        return self.data.reshape(-1)
+
+    @property
+    def raw_data(self) -> list[int]:
+        """
+        The table data as a flat list. This makes a new list every time, so only use it for
+        things that really need a list.
+        """
+
+        return self.flat.tolist()
 
     def to_dict(self) -> dict[str, Any]:
         return {"dim": self.dim, "x": self.x, "y": self.y, "z": self.z, "raw": self.raw_data}
@@ -1,17 +1,38 @@
 import contextlib
 import sys
+from collections.abc import Iterable
 from io import StringIO
 from pathlib import Path
 
 from reborn_rebalance.pbs.catalog import EssentialsCatalog
+from reborn_rebalance.pbs.form import PokemonForms
+from reborn_rebalance.pbs.move import MoveMappingEntryType
+from reborn_rebalance.pbs.pokemon import PokemonSpecies
 
 
-def extended_validate_megas(catalog: EssentialsCatalog):
+def _forms_to_check(
+    catalog: EssentialsCatalog, only: Iterable[PokemonSpecies] | None
+) -> Iterable[tuple[str, PokemonForms]]:
+    if only is None:
+        return catalog.forms.items()
+
+    return [
+        (it.internal_name, catalog.forms[it.internal_name])
+        for it in only
+        if it.internal_name in catalog.forms
+    ]
+
+
+def extended_validate_megas(
+    catalog: EssentialsCatalog, only: Iterable[PokemonSpecies] | None = None
+):
     """
     Validates that mega evolutions are correct.
+
+    :param only: If provided, only these species are checked.
     """
 
-    for species_name, forms in catalog.forms.items():
+    for species_name, forms in _forms_to_check(catalog, only):
         species = catalog.species_mapping[species_name]
 
         to_check = []
@@ -40,6 +61,7 @@ def extended_validate_megas(catalog: EssentialsCatalog):
                     " one ability"
                 )
 
+            # megas always get exactly +100 BST over their base form.
             bst = attrs.base_stats.sum()
             if bst != (expected := species.base_stats.sum() + 100):
                 print(
@@ -48,8 +70,10 @@ def extended_validate_megas(catalog: EssentialsCatalog):
                 )
 
 
-def extended_validate_abilities(catalog: EssentialsCatalog):
-    for species in catalog.species:
+def extended_validate_abilities(
+    catalog: EssentialsCatalog, only: Iterable[PokemonSpecies] | None = None
+):
+    for species in catalog.species if only is None else only:
         if len(species.full_abilities) > 3:
             print(
                 f"warning: species {species.name} has too many abilities ({species.full_abilities})"
@@ -79,8 +103,8 @@ def extended_validate_abilities(catalog: EssentialsCatalog):
                 )
 
 
-def extended_validate_tms(catalog: EssentialsCatalog):
-    for species in catalog.species:
+def extended_validate_tms(catalog: EssentialsCatalog, only: Iterable[PokemonSpecies] | None = None):
+    for species in catalog.species if only is None else only:
         for tm in species.raw_tms:
             if not catalog.tm_name_mapping[tm].number:
                 print(f"warning: TM '{tm}' is not valid inside species '{species.name}'")
@@ -89,17 +113,36 @@ def extended_validate_tms(catalog: EssentialsCatalog):
             if not catalog.tm_name_mapping[tutor].is_tutor:
                 print(f"warning: tutor move '{tutor}' is not valid inside species '{species.name}'")
 
+    # finding TMs that nothing learns needs every species loaded, so skip it for partial checks.
+    if only is not None:
+        return
+
+    learners = catalog.move_learners
+    for tm in catalog.tms:
+        method = MoveMappingEntryType.TUTOR if tm.is_tutor else MoveMappingEntryType.TM
+        if not learners.learners(tm.move, methods={method}):
+            kind = "tutor move" if tm.is_tutor else "TM"
+            print(f"warning: {kind} '{tm.move}' isn't learnt by any species")
+
 
 def do_extended_validation():
+    # if any species are named, only those get loaded and checked.
+    names = [it.upper() for it in sys.argv[2:]]
+
     with contextlib.redirect_stdout(StringIO()):
-        catalog = EssentialsCatalog.load_from_toml(Path(sys.argv[1]))
+        catalog = EssentialsCatalog.load_from_toml(Path(sys.argv[1]), lazy=bool(names))
+
+    only: list[PokemonSpecies] | None = None
+    if names:
+        only = [catalog.species_mapping[name] for name in names]
+        catalog.validate(only)
 
     print("=== Begin Extended Validation ===\n")
-    extended_validate_megas(catalog)
+    extended_validate_megas(catalog, only)
     print()
-    extended_validate_abilities(catalog)
+    extended_validate_abilities(catalog, only)
     print()
-    extended_validate_tms(catalog)
+    extended_validate_tms(catalog, only)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, TypeVar
+
+import attr
+from typing_extensions import override
+
+# Structured tracing. Every interesting bit of work (loading a file, a loading phase, writing a PBS
+# file, rendering a page) is wrapped in a span, which records its wall and CPU time along with the
+# process and thread it ran on. Spans nest by time, so they can be exported as a Chrome trace and
+# opened in ``chrome://tracing`` or https://ui.perfetto.dev.
+#
+# Tracing is off by default, in which case spans cost about as much as an empty ``with`` block.
+# Worker processes record their spans with :func:`.collect` and send them back to the main process
+# alongside their results, where they're merged with :func:`.add_events`.
+
+#: The environment variable that enables tracing for any entry point. Set it to the path to write
+#: the trace to.
+TRACE_ENV_VAR = "REBORN_TRACE"
+
+_TracedFn = TypeVar("_TracedFn", bound=Callable[..., Any])
+
+
+@attr.s(slots=True, kw_only=True)
+class SpanEvent:
+    """
+    A single finished span.
+    """
+
+    #: The name of this span, e.g. ``load_species``.
+    name: str = attr.ib()
+
+    #: The category of this span, e.g. ``load`` or ``render``.
+    category: str = attr.ib()
+
+    #: When this span started, as a UNIX timestamp in seconds. Wall clock time is used as it's
+    #: comparable between processes.
+    start: float = attr.ib()
+
+    #: How long this span took, in seconds.
+    wall: float = attr.ib()
+
+    #: How much CPU time the thread running this span used, in seconds.
+    cpu: float = attr.ib()
+
+    #: The ID of the process this span ran in.
+    pid: int = attr.ib()
+
+    #: The ID of the thread this span ran in.
+    tid: int = attr.ib()
+
+    #: Extra information about this span, such as the file path or the number of bytes read.
+    args: dict[str, Any] = attr.ib(factory=dict)
+
+
+class Span:
+    """
+    A handle to a running span, for attaching extra information to it.
+    """
+
+    __slots__ = ("args",)
+
+    def __init__(self, args: dict[str, Any]):
+        self.args = args
+
+    def set(self, **kwargs: Any):
+        """
+        Attaches extra information to this span.
+        """
+
+        self.args.update(kwargs)
+
+
+class _NullSpan(Span):
+    __slots__ = ()
+
+    @override
+    def set(self, **kwargs: Any):
+        pass
+
+
+_NULL_SPAN = _NullSpan({})
+
+#: The events recorded so far, or None if tracing is disabled.
+_events: list[SpanEvent] | None = None
+
+
+def is_enabled() -> bool:
+    """
+    Checks if tracing is currently enabled.
+    """
+
+    return _events is not None
+
+
+def enable():
+    """
+    Enables tracing in this process. Any previously recorded events are kept.
+    """
+
+    global _events
+
+    if _events is None:
+        _events = []
+
+
+def disable() -> list[SpanEvent]:
+    """
+    Disables tracing in this process.
+
+    :return: Every event that was recorded.
+    """
+
+    global _events
+
+    events, _events = _events or [], None
+    return events
+
+
+@contextmanager
+def span(name: str, category: str = "", **args: Any) -> Iterator[Span]:
+    """
+    Records a span around the body of the ``with`` block. Keyword arguments (and anything passed
+    to :meth:`.Span.set`) are stored as the arguments of the span.
+    """
+
+    if _events is None:
+        yield _NULL_SPAN
+        return
+
+    handle = Span(args)
+    start = time.time()
+    start_counter = time.perf_counter()
+    start_cpu = time.thread_time()
+
+    try:
+        yield handle
+    finally:
+        wall = time.perf_counter() - start_counter
+        cpu = time.thread_time() - start_cpu
+
+        # tracing might have been disabled (and the events taken) in the meantime.
+        if _events is not None:
+            _events.append(
+                SpanEvent(
+                    name=name,
+                    category=category,
+                    start=start,
+                    wall=wall,
+                    cpu=cpu,
+                    pid=os.getpid(),
+                    tid=threading.get_native_id(),
+                    args=handle.args,
+                )
+            )
+
+
+def traced(name: str, category: str = "") -> Callable[[_TracedFn], _TracedFn]:
+    """
+    Decorates a function that takes a file path as its first argument (i.e. a loader or a saver) so
+    that every call is recorded as a span, along with the path and the size of the file.
+    """
+
+    def decorator(fn: _TracedFn) -> _TracedFn:
+        @functools.wraps(fn)
+        def wrapper(path: Path, *args: Any, **kwargs: Any) -> Any:
+            if _events is None:
+                return fn(path, *args, **kwargs)
+
+            with span(name, category, path=str(path)) as trace:
+                try:
+                    return fn(path, *args, **kwargs)
+                finally:
+                    # savers might not have created the file if they failed.
+                    if path.is_file():
+                        trace.set(bytes=path.stat().st_size)
+
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+@contextmanager
+def collect(enabled: bool = True) -> Iterator[list[SpanEvent]]:
+    """
+    Records the spans inside the ``with`` block into a separate list, instead of the events for
+    this process. Used inside worker processes, which send the list back with their results.
+
+    :param enabled: If False, nothing is recorded and the list stays empty.
+    """
+
+    global _events
+
+    previous = _events
+    collected: list[SpanEvent] = []
+    _events = collected if enabled else None
+
+    try:
+        yield collected
+    finally:
+        _events = previous
+
+
+def add_events(events: Iterable[SpanEvent]):
+    """
+    Adds events recorded elsewhere (e.g. in a worker process) to the events for this process.
+    """
+
+    if _events is not None:
+        _events.extend(events)
+
+
+def to_chrome_trace(events: list[SpanEvent]) -> dict[str, Any]:
+    """
+    Converts the provided events into the Chrome trace event format.
+    """
+
+    main_pid = os.getpid()
+    origin = min((it.start for it in events), default=0.0)
+
+    trace_events: list[dict[str, Any]] = [
+        {
+            "name": "process_name",
+            "ph": "M",
+            "pid": pid,
+            "args": {"name": "main" if pid == main_pid else f"worker {pid}"},
+        }
+        for pid in sorted({it.pid for it in events})
+    ]
+
+    for event in sorted(events, key=lambda it: (it.start, -it.wall)):
+        args = {
+            key: str(value) if isinstance(value, Path) else value
+            for key, value in event.args.items()
+        }
+        args["cpu_ms"] = round(event.cpu * 1000, 3)
+
+        trace_events.append(
+            {
+                "name": event.name,
+                "cat": event.category,
+                "ph": "X",
+                "ts": round((event.start - origin) * 1_000_000, 1),
+                "dur": round(event.wall * 1_000_000, 1),
+                "pid": event.pid,
+                "tid": event.tid,
+                "args": args,
+            }
+        )
+
+    return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(path: Path, events: list[SpanEvent]):
+    """
+    Writes the provided events to a Chrome trace file.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(to_chrome_trace(events)))
+
+
+@contextmanager
+def trace_to(path: Path | None) -> Iterator[None]:
+    """
+    Traces the body of the ``with`` block, and writes a Chrome trace to the provided path at the
+    end. If the path is None, the path from the ``REBORN_TRACE`` environment variable is used
+    instead, and if that isn't set either then nothing is traced.
+    """
+
+    if path is None and (from_env := os.environ.get(TRACE_ENV_VAR)):
+        path = Path(from_env)
+
+    if path is None:
+        yield
+        return
+
+    enable()
+    try:
+        yield
+    finally:
+        events = disable()
+        write_chrome_trace(path, events)
+        print(f"Wrote {len(events)} trace events to {path}")
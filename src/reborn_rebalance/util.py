@@ -1,13 +1,21 @@
+from __future__ import annotations
+
+import os
 from collections.abc import Generator, Iterable, Iterator, Sequence
 from contextlib import contextmanager
 from io import StringIO
-from typing import Any, TypeVar
+from pathlib import Path
+from typing import Any, TextIO, TypeVar
 
 import attr
 
 _ChunkType = TypeVar("_ChunkType")
 _GetSafelyType = TypeVar("_GetSafelyType")
 
+#: The buffer size used when streaming generated files to disk. The PBS writers do lots of tiny
+#: writes, so this is a lot bigger than the default.
+WRITE_BUFFER_SIZE = 1024 * 1024
+
 
 def chunks(lst: list[_ChunkType], n: int) -> Iterable[list[_ChunkType]]:
     """
@@ -27,13 +35,47 @@ def get_safely(
         return default
 
 
+@contextmanager
+def atomic_write(path: Path) -> Generator[TextIO, None, None]:
+    """
+    Opens a temporary file next to the provided path for writing text to, which is renamed over
+    the path once the block exits successfully. If the block raises, the temporary file is
+    deleted and the path is left untouched, so a crash never leaves a half-written file behind.
+    """
+
+    temp_path = path.with_name(f".{path.name}.tmp")
+
+    try:
+        with temp_path.open(mode="w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+            yield f
+
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
 class PbsBuffer:
     """
     A buffer-like object that supports writing PBS-formatted data.
+
+    By default this writes into memory; use :meth:`.streaming` to write straight to a file
+    instead.
     """
 
-    def __init__(self):
-        self.backing = StringIO()
+    def __init__(self, backing: TextIO | None = None):
+        self.backing = backing if backing is not None else StringIO()
+
+    @classmethod
+    @contextmanager
+    def streaming(cls, path: Path) -> Generator[PbsBuffer, None, None]:
+        """
+        Creates a buffer that streams into the provided file, which is only replaced once the
+        block exits successfully. See :func:`.atomic_write`.
+        """
+
+        with atomic_write(path) as f:
+            yield cls(f)
 
     def write_id_header(self, id: Any):
         self.backing.write("[")
@@ -70,9 +112,20 @@ class RubyBuffer:
     A buffer for Ruby code generation.
     """
 
-    def __init__(self):
+    def __init__(self, backing: TextIO | None = None):
         self._indent = 0
-        self.backing = StringIO()
+        self.backing = backing if backing is not None else StringIO()
+
+    @classmethod
+    @contextmanager
+    def streaming(cls, path: Path) -> Generator[RubyBuffer, None, None]:
+        """
+        Creates a buffer that streams into the provided file, which is only replaced once the
+        block exits successfully. See :func:`.atomic_write`.
+        """
+
+        with atomic_write(path) as f:
+            yield cls(f)
 
     @contextmanager
     def indented(self) -> Generator[None, None, None]:
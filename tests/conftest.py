@@ -0,0 +1,34 @@
+import os
+import shutil
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+#: The real data directory in the repository.
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _isolated_user_cache(tmp_path_factory: pytest.TempPathFactory) -> Iterator[None]:
+    # don't leave generated hooks in the real per-user cache.
+    previous = os.environ.get("XDG_CACHE_HOME")
+    os.environ["XDG_CACHE_HOME"] = str(tmp_path_factory.mktemp("user_cache"))
+
+    yield
+
+    if previous is None:
+        del os.environ["XDG_CACHE_HOME"]
+    else:
+        os.environ["XDG_CACHE_HOME"] = previous
+
+
+@pytest.fixture
+def data_copy(tmp_path: Path) -> Path:
+    """
+    A copy of the real data directory that tests can modify.
+    """
+
+    copied = tmp_path / "data"
+    shutil.copytree(DATA_DIR, copied, ignore=shutil.ignore_patterns("overwritten_maps"))
+    return copied
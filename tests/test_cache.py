@@ -0,0 +1,60 @@
+from pathlib import Path
+
+from reborn_rebalance.pbs.cache import CatalogSnapshotCache
+from reborn_rebalance.pbs.catalog import EssentialsCatalog
+
+
+def _load(data_dir: Path, cache_dir: Path) -> EssentialsCatalog:
+    return EssentialsCatalog.load_from_toml(data_dir, cache_dir=cache_dir)
+
+
+def test_snapshot_is_reused(data_copy: Path, tmp_path: Path):
+    cache_dir = tmp_path / "cache"
+    fresh = _load(data_copy, cache_dir)
+
+    cached = CatalogSnapshotCache(cache_dir, data_copy).load()
+    assert cached is not None
+
+    _, _, changed = cached
+    assert not changed
+    assert _load(data_copy, cache_dir) == fresh
+
+
+def test_snapshot_notices_changes(data_copy: Path, tmp_path: Path):
+    cache_dir = tmp_path / "cache"
+    _load(data_copy, cache_dir)
+
+    moves = data_copy / "moves.toml"
+    moves.write_text(moves.read_text().replace("Pound", "Pummel", 1))
+
+    cached = CatalogSnapshotCache(cache_dir, data_copy).load()
+    assert cached is not None
+    assert cached[2] == {"moves.toml"}
+
+    assert _load(data_copy, cache_dir) == EssentialsCatalog.load_from_toml(
+        data_copy, use_cache=False
+    )
+
+
+def test_snapshots_are_per_data_directory(data_copy: Path, tmp_path: Path):
+    cache_dir = tmp_path / "cache"
+    _load(data_copy, cache_dir)
+
+    other = tmp_path / "other"
+    assert CatalogSnapshotCache(cache_dir, other).load() is None
+
+    first = CatalogSnapshotCache(cache_dir, data_copy)
+    second = CatalogSnapshotCache(cache_dir, data_copy / ".." / data_copy.name)
+    assert first.snapshot_path == second.snapshot_path
+    assert first.snapshot_path != CatalogSnapshotCache(cache_dir, other).snapshot_path
+
+
+def test_unchanged_snapshot_is_not_rewritten(data_copy: Path, tmp_path: Path):
+    cache_dir = tmp_path / "cache"
+    _load(data_copy, cache_dir)
+
+    snapshot = CatalogSnapshotCache(cache_dir, data_copy).snapshot_path
+    mtime = snapshot.stat().st_mtime_ns
+
+    _load(data_copy, cache_dir)
+    assert snapshot.stat().st_mtime_ns == mtime
@@ -0,0 +1,106 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import cattrs
+import pytest
+import rtoml
+from reborn_rebalance.pbs import codegen
+from reborn_rebalance.pbs.form import PokemonForms
+from reborn_rebalance.pbs.pokemon import PokemonSpecies
+from reborn_rebalance.pbs.serialisation import PrecompiledConverter, create_cattrs_converter
+
+from tests.conftest import DATA_DIR
+
+SPECIES_FILES = sorted((DATA_DIR / "species").rglob("*.toml"))[:40]
+FORMS_FILES = sorted((DATA_DIR / "forms").glob("*.toml"))
+
+
+@pytest.fixture
+def converter(tmp_path: Path) -> PrecompiledConverter:
+    converter = PrecompiledConverter(cache_dir=tmp_path)
+    converter.install_hooks()
+    return converter
+
+
+def test_importing_has_no_side_effects(tmp_path: Path):
+    code = "import reborn_rebalance.pbs.serialisation, reborn_rebalance.pbs.catalog"
+    src = Path(codegen.__file__).parents[2]
+    subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path,
+        env={"PYTHONPATH": str(src), "XDG_CACHE_HOME": str(tmp_path / "user")},
+        check=True,
+    )
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_hooks_are_generated_lazily(tmp_path: Path):
+    converter = PrecompiledConverter(cache_dir=tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+    data = rtoml.load(SPECIES_FILES[0])
+    converter.structure(data, PokemonSpecies)
+
+    (generated,) = tmp_path.glob("converter_hooks_*.py")
+    assert generated == codegen.hooks_module_path(tmp_path, codegen.hooks_fingerprint())
+
+
+def test_fingerprint_depends_on_library_versions(monkeypatch: pytest.MonkeyPatch):
+    before = codegen.hooks_fingerprint()
+
+    real_version = codegen.importlib.metadata.version
+    monkeypatch.setattr(
+        codegen.importlib.metadata,
+        "version",
+        lambda name: "0.0.0" if name == "cattrs" else real_version(name),
+    )
+
+    assert codegen.hooks_fingerprint() != before
+
+
+@pytest.mark.parametrize("path", SPECIES_FILES, ids=lambda it: it.name)
+def test_species_round_trip(converter: PrecompiledConverter, path: Path):
+    plain = create_cattrs_converter()
+    data = rtoml.load(path)
+
+    structured = converter.structure(data, PokemonSpecies)
+    assert structured == plain.structure(data, PokemonSpecies)
+    assert converter.unstructure(structured) == plain.unstructure(structured)
+
+
+@pytest.mark.parametrize("path", FORMS_FILES, ids=lambda it: it.name)
+def test_forms_round_trip(converter: PrecompiledConverter, path: Path):
+    plain = create_cattrs_converter()
+    data = rtoml.load(path)
+    data.setdefault("internal_name", path.stem.upper())
+
+    structured = converter.structure(data, PokemonForms)
+    assert structured == plain.structure(data, PokemonForms)
+    assert converter.unstructure(structured) == plain.unstructure(structured)
+
+
+def test_invalid_data_raises_cattrs_errors(converter: PrecompiledConverter):
+    data = rtoml.load(SPECIES_FILES[0])
+    data["not_a_field"] = 1
+
+    with pytest.raises(cattrs.BaseValidationError):
+        converter.structure(data, PokemonSpecies)
+
+
+def test_generated_hook_bugs_propagate():
+    def broken(_):
+        raise NameError("oops")
+
+    hook = codegen._with_fallback(broken, PokemonSpecies, create_cattrs_converter)
+
+    # data that cattrs accepts means the generated code is wrong...
+    data = rtoml.load(SPECIES_FILES[0])
+    with pytest.raises(RuntimeError, match="precompiled hook for PokemonSpecies"):
+        hook(data, PokemonSpecies)
+
+    # ...but data that cattrs rejects gets the cattrs error.
+    data["not_a_field"] = 1
+    with pytest.raises(cattrs.BaseValidationError):
+        hook(data, PokemonSpecies)
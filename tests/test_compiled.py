@@ -0,0 +1,22 @@
+import pytest
+from reborn_rebalance.pbs.catalog import EssentialsCatalog
+from reborn_rebalance.pbs.compiled import ENCOUNTER_DENSITIES, compile_encounters
+
+from .conftest import DATA_DIR
+
+
+@pytest.fixture(scope="module")
+def catalog() -> EssentialsCatalog:
+    return EssentialsCatalog.load_from_toml(DATA_DIR, use_cache=False)
+
+
+def test_encounter_densities(catalog: EssentialsCatalog):
+    compiled = compile_encounters(catalog)
+
+    for map_id, info in catalog.encounters.items():
+        densities = compiled[map_id][0]
+
+        # only land, cave, and water get the rates from the map, even LandMorning/Day/Night
+        # keep their defaults.
+        assert densities[:3] == list(info.chances)
+        assert densities[3:] == list(ENCOUNTER_DENSITIES[3:])
@@ -0,0 +1,114 @@
+import numpy as np
+import numpy.typing as npt
+import pytest
+from PIL import Image
+from reborn_rebalance.map.compositor import (
+    AUTOTILE_PATTERNS,
+    FIRST_TILE_ID,
+    STRIP_ROWS,
+    TILE_SIZE,
+    TILESET_WIDTH,
+    TileAtlas,
+    autotile_frame_count,
+    expand_autotile,
+)
+
+
+def _random_image(rng: np.random.Generator, height: int, width: int) -> npt.NDArray[np.uint8]:
+    # a mix of fully transparent, fully opaque, and partially transparent pixels.
+    pixels = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+    alpha = rng.random((height, width))
+    pixels[..., 3] = np.where(alpha < 0.3, 0, np.where(alpha < 0.5, 255, pixels[..., 3]))
+    return pixels
+
+
+def _paste_tiles(tileset: Image.Image, layers: list[npt.NDArray[np.intp]]) -> Image.Image:
+    # the slow way that the atlas replaces, one paste per tile.
+    rows, columns = layers[0].shape
+    image = Image.new("RGBA", (columns * TILE_SIZE, rows * TILE_SIZE))
+
+    for grid in layers:
+        for y in range(rows):
+            for x in range(columns):
+                tile_id = int(grid[y, x])
+                if tile_id < FIRST_TILE_ID:
+                    continue
+
+                position = tile_id - FIRST_TILE_ID
+                left = (position % TILESET_WIDTH) * TILE_SIZE
+                top = (position // TILESET_WIDTH) * TILE_SIZE
+                tile = tileset.crop((left, top, left + TILE_SIZE, top + TILE_SIZE))
+                image.paste(tile, (x * TILE_SIZE, y * TILE_SIZE), tile)
+
+    return image
+
+
+# a whole tileset, and one that's too short and narrow so that some tiles are cut off.
+@pytest.mark.parametrize("height,width", [(16 * TILE_SIZE, 256), (8 * TILE_SIZE + 7, 250)])
+def test_composite_matches_pasting_tiles(height: int, width: int):
+    rng = np.random.default_rng(2)
+    pixels = _random_image(rng, height, width)
+    atlas = TileAtlas.from_image(pixels)
+
+    # more rows than a single strip, with some tiles past the end of the tileset.
+    shape = (STRIP_ROWS + 5, 7)
+    layers = [
+        rng.integers(FIRST_TILE_ID, FIRST_TILE_ID + 20 * TILESET_WIDTH, shape),
+        rng.integers(0, FIRST_TILE_ID + 20 * TILESET_WIDTH, shape),
+        np.zeros(shape, dtype=np.intp),
+    ]
+
+    image = Image.new("RGBA", (shape[1] * TILE_SIZE, shape[0] * TILE_SIZE))
+    for grid in layers:
+        atlas.composite(image, atlas.indexes(grid))
+
+    expected = _paste_tiles(Image.fromarray(pixels), layers)
+    assert image.tobytes() == expected.tobytes()
+
+
+def test_autotile_patterns():
+    rng = np.random.default_rng(5)
+    # two frames of a full 96x128 autotile.
+    pixels = _random_image(rng, 4 * TILE_SIZE, 6 * TILE_SIZE)
+    patterns = expand_autotile(pixels)
+
+    assert autotile_frame_count(pixels) == 2
+    assert patterns.shape == (2, AUTOTILE_PATTERNS, TILE_SIZE, TILE_SIZE, 4)
+
+    for frame in range(2):
+        left = frame * 3 * TILE_SIZE
+
+        # the last pattern is the top left tile, i.e. the preview in the editor.
+        preview = pixels[:TILE_SIZE, left : left + TILE_SIZE]
+        assert np.array_equal(patterns[frame, 47], preview)
+
+        # the first pattern has neighbours on every side, i.e. it's the middle of the 3x3 block.
+        centre = pixels[2 * TILE_SIZE : 3 * TILE_SIZE, left + TILE_SIZE : left + 2 * TILE_SIZE]
+        assert np.array_equal(patterns[frame, 0], centre)
+
+
+def test_single_tile_autotile():
+    rng = np.random.default_rng(6)
+    # two frames of a single tile autotile, plus a partial third one that gets dropped.
+    pixels = _random_image(rng, TILE_SIZE, 3 * TILE_SIZE - 8)
+    patterns = expand_autotile(pixels)
+
+    assert autotile_frame_count(pixels) == 2
+    assert np.array_equal(patterns[0, 0], pixels[:, :TILE_SIZE])
+    assert (patterns[:, 1:] == patterns[:, :1]).all()
+
+
+def test_atlas_autotiles():
+    rng = np.random.default_rng(7)
+    pixels = _random_image(rng, 4 * TILE_SIZE, 3 * TILE_SIZE)
+    patterns = expand_autotile(pixels)[0]
+
+    atlas = TileAtlas.from_image(_random_image(rng, TILE_SIZE, 256), [None, patterns])
+
+    # autotile 0 is missing, so it isn't drawn.
+    assert atlas.empty[AUTOTILE_PATTERNS : 2 * AUTOTILE_PATTERNS].all()
+    assert np.array_equal(atlas.tiles[2 * AUTOTILE_PATTERNS : 3 * AUTOTILE_PATTERNS], patterns)
+
+    moved = atlas.with_autotiles([patterns])
+    assert np.array_equal(moved.tiles[AUTOTILE_PATTERNS : 2 * AUTOTILE_PATTERNS], patterns)
+    assert moved.empty[2 * AUTOTILE_PATTERNS : FIRST_TILE_ID].all()
@@ -0,0 +1,108 @@
+from pathlib import Path
+
+import attr
+import pytest
+from reborn_rebalance.pbs.catalog import EssentialsCatalog
+from reborn_rebalance.pbs.encounter_index import EncounterIndex
+from reborn_rebalance.pbs.encounters import ENCOUNTER_SLOTS
+
+from .conftest import DATA_DIR
+
+
+@pytest.fixture(scope="module")
+def catalog() -> EssentialsCatalog:
+    return EssentialsCatalog.load_from_toml(DATA_DIR, use_cache=False)
+
+
+def _scan_chances(catalog: EssentialsCatalog, species: str) -> dict[int, dict[str, int]]:
+    # the slow way that the index replaces.
+    chances: dict[int, dict[str, int]] = {}
+
+    for map_id, info in catalog.encounters.items():
+        for ec_type, entries in info.encounters.items():
+            for slot, entry in zip(ENCOUNTER_SLOTS[ec_type], entries, strict=False):
+                if entry.name == species:
+                    by_type = chances.setdefault(map_id, {})
+                    by_type[ec_type] = by_type.get(ec_type, 0) + slot
+
+    return chances
+
+
+def _assert_same_index(index: EncounterIndex, other: EncounterIndex):
+    assert sorted(index.species()) == sorted(other.species())
+
+    for species in index.species():
+        assert index.encounters_for(species) == other.encounters_for(species)
+
+
+def test_index_matches_scan(catalog: EssentialsCatalog):
+    index = catalog.encounter_index
+    scanned = {
+        entry.name
+        for info in catalog.encounters.values()
+        for entries in info.encounters.values()
+        for entry in entries
+    }
+
+    assert set(index.species()) == scanned
+
+    for species in scanned:
+        found = index.encounters_for(species)
+        chances = {
+            map_id: {ec_type: entry.chance for ec_type, entry in by_type.items()}
+            for map_id, by_type in found.items()
+        }
+
+        assert chances == _scan_chances(catalog, species)
+        assert index.maps_for(species) == list(found)
+
+
+def test_encounters_are_copies(catalog: EssentialsCatalog):
+    index = catalog.encounter_index
+    species = index.species()[0]
+
+    found = index.encounters_for(species)
+    map_id, by_type = next(iter(found.items()))
+    by_type.clear()
+    found.clear()
+
+    assert index.encounters_for(species)[map_id]
+
+    entry = next(iter(index.encounters_for(species)[map_id].values()))
+    with pytest.raises(attr.exceptions.FrozenInstanceError):
+        entry.chance = 100  # type: ignore
+
+
+def test_missing_species(catalog: EssentialsCatalog):
+    index = catalog.encounter_index
+
+    assert "NOT_A_SPECIES" not in index
+    assert index.encounters_for("NOT_A_SPECIES") == {}
+    assert index.maps_for("NOT_A_SPECIES") == []
+    assert index.area_chances("NOT_A_SPECIES") == {}
+
+
+def test_remove_and_update_map(catalog: EssentialsCatalog):
+    index = EncounterIndex.build(catalog.encounters)
+    map_id, info = next(iter(catalog.encounters.items()))
+
+    index.remove_map(map_id)
+    assert index.species_on(map_id) == []
+    assert all(map_id not in index.maps_for(it) for it in index.species())
+
+    index.update_map(map_id, info)
+    _assert_same_index(index, EncounterIndex.build(catalog.encounters))
+
+
+def test_reload_keeps_index_up_to_date(data_copy: Path):
+    catalog = EssentialsCatalog.load_from_toml(data_copy, use_cache=False)
+    index = catalog.encounter_index
+
+    coral_ward = data_copy / "encounters/014_coral_ward.toml"
+    coral_ward.unlink()
+    catalog.reload_changed(data_copy, [coral_ward])
+
+    # the same index object was patched in place, rather than being rebuilt.
+    assert catalog.encounter_index is index
+    assert index.species_on(14) == []
+    _assert_same_index(index, EncounterIndex.build(catalog.encounters))
@@ -0,0 +1,47 @@
+import pytest
+from reborn_rebalance.pbs.catalog import EssentialsCatalog
+from reborn_rebalance.pbs.lazy import LazyFormsMapping, LazySpeciesList
+
+from .conftest import DATA_DIR
+
+
+@pytest.fixture(scope="module")
+def eager() -> EssentialsCatalog:
+    return EssentialsCatalog.load_from_toml(DATA_DIR, use_cache=False)
+
+
+@pytest.fixture
+def lazy() -> EssentialsCatalog:
+    return EssentialsCatalog.load_from_toml(DATA_DIR, lazy=True)
+
+
+def test_lookups_only_load_what_they_need(lazy: EssentialsCatalog, eager: EssentialsCatalog):
+    species = lazy.species
+    forms = lazy.forms
+    assert isinstance(species, LazySpeciesList)
+    assert isinstance(forms, LazyFormsMapping)
+
+    assert lazy.species_mapping["EEVEE"] == eager.species_mapping["EEVEE"]
+    assert lazy.forms["DEOXYS"] == eager.forms["DEOXYS"]
+    assert species.loaded_count == 1
+    assert forms.loaded_count == 1
+
+    assert "DREKEON" in lazy.species_mapping
+    assert "NOT_A_SPECIES" not in lazy.species_mapping
+    assert lazy.pre_evolutionary_cache["VAPOREON"] == eager.pre_evolutionary_cache["VAPOREON"]
+
+
+def test_lazy_matches_eager(lazy: EssentialsCatalog, eager: EssentialsCatalog):
+    assert list(lazy.species) == eager.species
+    assert list(lazy.forms) == list(eager.forms)
+    assert all(lazy.forms[name] == forms for name, forms in eager.forms.items())
+    assert lazy.form_files == eager.form_files
+
+
+def test_validate_subset(lazy: EssentialsCatalog):
+    eevee = lazy.species_mapping["EEVEE"]
+    lazy.validate([eevee])
+
+    # validating eevee checks its evolutions exist, but doesn't need to load them.
+    assert isinstance(lazy.species, LazySpeciesList)
+    assert lazy.species.loaded_count < len(lazy.species)
@@ -0,0 +1,108 @@
+from pathlib import Path
+
+import pytest
+from reborn_rebalance.pbs.catalog import EssentialsCatalog
+from reborn_rebalance.pbs.learners import (
+    LEVEL_UP_METHODS,
+    MoveLearnerIndex,
+    learner_entries_for,
+)
+from reborn_rebalance.pbs.move import MoveMappingEntry
+
+from .conftest import DATA_DIR
+
+
+@pytest.fixture(scope="module")
+def catalog() -> EssentialsCatalog:
+    return EssentialsCatalog.load_from_toml(DATA_DIR, use_cache=False)
+
+
+def _scan_learners(catalog: EssentialsCatalog, move: str) -> list[MoveMappingEntry]:
+    # the slow way that the index replaces.
+    return [
+        entry
+        for species in sorted(catalog.species, key=lambda it: it.dex_number)
+        for entry in learner_entries_for(catalog, species)
+        if entry.internal_name == move
+    ]
+
+
+def _assert_same_index(index: MoveLearnerIndex, other: MoveLearnerIndex):
+    assert index.moves() == other.moves()
+
+    for move in index.moves():
+        assert index.learners(move) == other.learners(move)
+
+
+def test_learners_match_scan(catalog: EssentialsCatalog):
+    index = catalog.move_learners
+
+    for move in ("TACKLE", "EARTHQUAKE", "DRAGONRAGE", "SOFTBOILED"):
+        assert index.learners(move) == _scan_learners(catalog, move)
+
+
+def test_every_learnt_move_is_indexed(catalog: EssentialsCatalog):
+    index = catalog.move_learners
+    learnt = {
+        entry.internal_name
+        for species in catalog.species
+        for entry in learner_entries_for(catalog, species)
+    }
+
+    assert set(index.moves()) == learnt
+    assert all(move in index for move in learnt)
+
+
+def test_species_queries(catalog: EssentialsCatalog):
+    index = catalog.move_learners
+    eevee = catalog.species_mapping["EEVEE"]
+
+    assert index.learnset("EEVEE") == learner_entries_for(catalog, eevee)
+    assert index.moves_for("EEVEE") == {it.internal_name for it in index.learnset("EEVEE")}
+
+    for level_up in eevee.raw_level_up_moves:
+        assert index.learns("EEVEE", level_up.name, methods=LEVEL_UP_METHODS)
+
+    assert not index.learns("EEVEE", "NOT_A_MOVE")
+    assert index.learnset("NOT_A_SPECIES") == []
+
+
+def test_filtered_learners(catalog: EssentialsCatalog):
+    index = catalog.move_learners
+    learners = index.learners("TACKLE", methods=LEVEL_UP_METHODS, form_id=0)
+
+    assert learners
+    assert all(it.type in LEVEL_UP_METHODS and it.form_id == 0 for it in learners)
+
+
+def test_remove_and_update_species(catalog: EssentialsCatalog):
+    index = MoveLearnerIndex.build(catalog)
+    eevee = catalog.species_mapping["EEVEE"]
+
+    index.remove_species("EEVEE")
+    assert index.learnset("EEVEE") == []
+    assert all(it.species_name != "EEVEE" for it in index.learners("TACKLE"))
+
+    index.update_species(catalog, eevee)
+    _assert_same_index(index, MoveLearnerIndex.build(catalog))
+
+
+def test_reload_keeps_index_up_to_date(data_copy: Path):
+    catalog = EssentialsCatalog.load_from_toml(data_copy, use_cache=False)
+    index = catalog.move_learners
+
+    eevee = data_copy / "species/gen_1/0133-eevee.toml"
+    text = eevee.read_text(encoding="utf-8")
+    assert 'name = "GROWTH"' in text
+    eevee.write_text(text.replace('name = "GROWTH"', 'name = "POUND"', 1), encoding="utf-8")
+
+    deoxys = data_copy / "forms/deoxys.toml"
+    deoxys.unlink()
+
+    catalog.reload_changed(data_copy, [eevee, deoxys])
+
+    # the same index object was patched in place, rather than being rebuilt.
+    assert catalog.move_learners is index
+    assert index.learns("EEVEE", "POUND", methods=LEVEL_UP_METHODS)
+    assert not index.learns("EEVEE", "GROWTH")
+    _assert_same_index(index, MoveLearnerIndex.build(catalog))
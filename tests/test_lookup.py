@@ -0,0 +1,90 @@
+import attr
+import pytest
+from reborn_rebalance.pbs.catalog import EssentialsCatalog
+from reborn_rebalance.pbs.lookup import LookupIndex
+
+from .conftest import DATA_DIR
+
+
+@attr.s(frozen=True)
+class Thing:
+    name: str = attr.ib()
+    display_name: str = attr.ib()
+    id: int = attr.ib()
+
+
+THINGS = [
+    Thing("FIREBLAST", "Fire Blast", 1),
+    Thing("FIREPUNCH", "Fire Punch", 2),
+    Thing("FIREFANG", "Fire Punch", 3),
+    Thing("FLY", "Fly", 2),
+    Thing("Fly", "Flight", 4),
+]
+
+
+@pytest.fixture
+def index() -> LookupIndex[Thing]:
+    return LookupIndex(
+        THINGS,
+        name=lambda it: it.name,
+        display_name=lambda it: it.display_name,
+        id=lambda it: it.id,
+    )
+
+
+def test_exact_lookups(index: LookupIndex[Thing]):
+    assert len(index) == 5
+    assert "FIREBLAST" in index
+    assert "Fire Blast" not in index
+
+    assert index["FIREPUNCH"] is THINGS[1]
+    assert index.get("NOPE") is None
+    assert index.by_display_name["Fire Blast"] is THINGS[0]
+
+    with pytest.raises(KeyError):
+        index["NOPE"]
+
+
+def test_duplicates_keep_the_first(index: LookupIndex[Thing]):
+    assert index.by_display_name["Fire Punch"] is THINGS[1]
+    assert index.by_id[2] is THINGS[1]
+
+
+def test_find_ignores_case(index: LookupIndex[Thing]):
+    assert index.find("fire blast") is THINGS[0]
+    assert index.find("FIRE BLAST") is THINGS[0]
+    assert index.find("firefang") is THINGS[2]
+    assert index.find("nope") is None
+
+    # exact internal names win over case-folded matches.
+    assert index.find("Fly") is THINGS[4]
+    assert index.find("fly") is THINGS[3]
+
+
+def test_with_prefix(index: LookupIndex[Thing]):
+    # sorted by the first matching name, "fire blast" < "fire punch" < "firefang".
+    assert index.with_prefix("fire") == [THINGS[0], THINGS[1], THINGS[2]]
+    assert index.with_prefix("FIRE P") == [THINGS[1]]
+    assert index.with_prefix("z") == []
+
+
+def test_index_is_read_only(index: LookupIndex[Thing]):
+    with pytest.raises(TypeError):
+        index.by_name["NEW"] = THINGS[0]  # type: ignore
+
+
+def test_catalog_indexes_match_scans():
+    catalog = EssentialsCatalog.load_from_toml(DATA_DIR, use_cache=False)
+
+    for move in catalog.moves:
+        assert catalog.move_mapping[move.internal_name] is next(
+            it for it in catalog.moves if it.internal_name == move.internal_name
+        )
+        assert catalog.move_index.find(move.display_name.lower()) is not None
+
+    for item in catalog.items:
+        assert catalog.item_index.by_id[item.id] is next(
+            it for it in catalog.items if it.id == item.id
+        )
+
+    assert len(catalog.ability_index) == len({it.name for it in catalog.abilities})
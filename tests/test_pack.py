@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import pytest
+from reborn_rebalance.pbs.cache import catalog_input_files
+from reborn_rebalance.pbs.catalog import EssentialsCatalog
+from reborn_rebalance.pbs.pack import PackReader, write_pack
+
+from .conftest import DATA_DIR
+
+
+@pytest.fixture(scope="module")
+def catalog() -> EssentialsCatalog:
+    return EssentialsCatalog.load_from_toml(DATA_DIR, use_cache=False)
+
+
+@pytest.fixture(scope="module")
+def pack(catalog: EssentialsCatalog, tmp_path_factory: pytest.TempPathFactory) -> Path:
+    path = tmp_path_factory.mktemp("pack") / "data.pack"
+    write_pack(catalog, DATA_DIR, path)
+    return path
+
+
+def _contents(data_dir: Path) -> dict[str, bytes]:
+    return {
+        file.relative_to(data_dir).as_posix(): file.read_bytes()
+        for file in catalog_input_files(data_dir)
+    }
+
+
+def test_unpack_is_byte_identical(pack: Path, tmp_path: Path):
+    with PackReader(pack) as reader:
+        assert not reader.corrupt_sources()
+        assert not reader.diff_against(DATA_DIR)
+
+        reader.unpack_sources(tmp_path)
+
+    assert _contents(tmp_path) == _contents(DATA_DIR)
+
+
+def test_repacking_is_byte_identical(pack: Path, tmp_path: Path):
+    with PackReader(pack) as reader:
+        reader.unpack_sources(tmp_path / "data")
+
+    unpacked = EssentialsCatalog.load_from_toml(tmp_path / "data", use_cache=False)
+    write_pack(unpacked, tmp_path / "data", tmp_path / "again.pack")
+
+    assert (tmp_path / "again.pack").read_bytes() == pack.read_bytes()
+
+
+def test_pack_loads_same_catalog(pack: Path, catalog: EssentialsCatalog):
+    loaded = EssentialsCatalog.load_from_pack(pack)
+
+    assert loaded == catalog
+    assert list(loaded.forms) == list(catalog.forms)
+
+
+def test_single_entity_lookup(pack: Path, catalog: EssentialsCatalog):
+    with PackReader(pack) as reader:
+        assert reader.get("species", "EEVEE") == catalog.species_mapping["EEVEE"]
+        assert reader.get("species", 0) == catalog.species[0]
+        assert reader.get("forms", "DEOXYS") == catalog.forms["DEOXYS"]
+
+
+def test_diff_against_notices_changes(pack: Path, data_copy: Path):
+    moves = data_copy / "moves.toml"
+    moves.write_bytes(moves.read_bytes() + b"\n")
+    (data_copy / "trainers" / "Aaron.toml").unlink()
+
+    with PackReader(pack) as reader:
+        assert reader.diff_against(data_copy) == {"moves.toml", "trainers/Aaron.toml"}
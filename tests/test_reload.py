@@ -0,0 +1,133 @@
+import shutil
+from collections.abc import Callable
+from pathlib import Path
+
+from reborn_rebalance.pbs.catalog import EssentialsCatalog
+
+LAST_SPECIES = Path("species/gen_9/1035-drekeon.toml")
+
+
+def _reload(data_dir: Path, cache_dir: Path, edit: Callable[[], None]) -> EssentialsCatalog:
+    # the first load writes the snapshot, the second one patches it with the edited files.
+    EssentialsCatalog.load_from_toml(data_dir, cache_dir=cache_dir)
+    edit()
+    return EssentialsCatalog.load_from_toml(data_dir, cache_dir=cache_dir)
+
+
+def _assert_same_as_fresh(reloaded: EssentialsCatalog, data_dir: Path):
+    fresh = EssentialsCatalog.load_from_toml(data_dir, use_cache=False)
+
+    assert reloaded == fresh
+
+    # dict equality doesn't care about order, but the PBS output does.
+    assert list(reloaded.forms) == list(fresh.forms)
+    assert list(reloaded.encounters) == list(fresh.encounters)
+    assert list(reloaded.trainers) == list(fresh.trainers)
+    assert reloaded.species_mapping.keys() == fresh.species_mapping.keys()
+
+
+def _replace(path: Path, old: str, new: str):
+    text = path.read_text(encoding="utf-8")
+    assert old in text
+    path.write_text(text.replace(old, new, 1), encoding="utf-8")
+
+
+def test_reload_edited_species(data_copy: Path, tmp_path: Path):
+    reloaded = _reload(
+        data_copy,
+        tmp_path,
+        lambda: _replace(data_copy / LAST_SPECIES, "exp_yield = 184", "exp_yield = 185"),
+    )
+
+    assert reloaded.species[-1].exp_yield == 185
+    _assert_same_as_fresh(reloaded, data_copy)
+
+
+def test_reload_added_species(data_copy: Path, tmp_path: Path):
+    def edit():
+        added = data_copy / "species/gen_9/1036-wyrmeon.toml"
+        shutil.copy(data_copy / LAST_SPECIES, added)
+        _replace(added, "dex_number = 1035", "dex_number = 1036")
+        _replace(added, 'name = "Drekeon"', 'name = "Wyrmeon"')
+
+    reloaded = _reload(data_copy, tmp_path, edit)
+
+    assert reloaded.species[-1].internal_name == "WYRMEON"
+    _assert_same_as_fresh(reloaded, data_copy)
+
+
+def test_reload_deleted_species(data_copy: Path, tmp_path: Path):
+    def edit():
+        (data_copy / LAST_SPECIES).unlink()
+
+        # otherwise eevee fails to validate.
+        _replace(
+            data_copy / "species/gen_1/0133-eevee.toml",
+            '[[evolutions]]\ninto_name = "DREKEON"\ncondition = "TradeItem"\n'
+            'parameter = "DRAGONSCALE"\n\n',
+            "",
+        )
+
+    reloaded = _reload(data_copy, tmp_path, edit)
+
+    assert "DREKEON" not in reloaded.species_mapping
+    _assert_same_as_fresh(reloaded, data_copy)
+
+
+def test_reload_renamed_species(data_copy: Path, tmp_path: Path):
+    def edit():
+        _replace(data_copy / LAST_SPECIES, 'name = "Drekeon"', 'name = "Wyrmeon"')
+        _replace(data_copy / "species/gen_1/0133-eevee.toml", '"DREKEON"', '"WYRMEON"')
+
+    reloaded = _reload(data_copy, tmp_path, edit)
+
+    assert "WYRMEON" in reloaded.species_mapping
+    assert "DREKEON" not in reloaded.species_mapping
+    _assert_same_as_fresh(reloaded, data_copy)
+
+
+def test_reload_renamed_species_file(data_copy: Path, tmp_path: Path):
+    def edit():
+        (data_copy / LAST_SPECIES).rename(data_copy / "species/gen_9/1035-drekeon-2.toml")
+
+    _assert_same_as_fresh(_reload(data_copy, tmp_path, edit), data_copy)
+
+
+def test_reload_deleted_forms_with_explicit_name(data_copy: Path, tmp_path: Path):
+    reloaded = _reload(data_copy, tmp_path, lambda: (data_copy / "forms/deoxys.toml").unlink())
+
+    assert "DEOXYS" not in reloaded.forms
+    _assert_same_as_fresh(reloaded, data_copy)
+
+
+def test_reload_moved_forms(data_copy: Path, tmp_path: Path):
+    def edit():
+        (data_copy / "forms/deoxys.toml").rename(data_copy / "forms/aaa_deoxys.toml")
+
+    reloaded = _reload(data_copy, tmp_path, edit)
+
+    assert reloaded.form_files["forms/aaa_deoxys.toml"] == "DEOXYS"
+    _assert_same_as_fresh(reloaded, data_copy)
+
+
+def test_reload_added_encounters(data_copy: Path, tmp_path: Path):
+    def edit():
+        shutil.copy(
+            data_copy / "encounters/014_coral_ward.toml",
+            data_copy / "encounters/001_copied_ward.toml",
+        )
+
+    reloaded = _reload(data_copy, tmp_path, edit)
+
+    assert 1 in reloaded.encounters
+    _assert_same_as_fresh(reloaded, data_copy)
+
+
+def test_reload_added_trainers(data_copy: Path, tmp_path: Path):
+    def edit():
+        shutil.copy(data_copy / "trainers/Aaron.toml", data_copy / "trainers/Aardvark.toml")
+
+    reloaded = _reload(data_copy, tmp_path, edit)
+
+    assert "Aardvark" in reloaded.trainers
+    _assert_same_as_fresh(reloaded, data_copy)